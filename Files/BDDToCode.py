@@ -9,6 +9,12 @@ from datetime import datetime
 import pandas as pd
 import requests
 import streamlit as st
+from FrameworkTemplates import render_templates
+from IncrementalMerge import plan_incremental_content, merge_generated_files, remove_scenarios
+from GeneratedFiles import get_files_from_result
+from ProjectWriter import write_project_files
+from ScaffoldCache import stamp_playwright_project
+from FileMapParser import extract_file_map
 
 load_dotenv()
 database_name = os.getenv("LOCAL_DB_NAME")
@@ -22,6 +28,15 @@ base_url = None
 login_username = None
 login_password = None
 
+BACKEND_URL = "http://127.0.0.1:8000"
+LONG_POLL_SECONDS = 25
+MAX_CONNECTION_FAILURES = 5
+STREAM_REPAINT_SECONDS = 0.25
+STREAM_PREVIEW_CHARS = 3000
+
+# One pooled session so polling reuses the same keep-alive connection
+http_session = requests.Session()
+
 
 def init_db():
     conn = sqlite3.connect(DB_FILE)
@@ -44,6 +59,17 @@ def init_db():
             project_id   INTEGER
         )
     """)
+    # The BDD each file's code on disk was last generated from; BDDDetails also holds
+    # versions whose generation failed or was never saved
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS BDDGenerated (
+            project_id     INTEGER,
+            file_name      TEXT,
+            file_content   TEXT,
+            generated_date TEXT,
+            PRIMARY KEY (project_id, file_name)
+        )
+    """)
     conn.commit()
     conn.close()
 
@@ -54,100 +80,102 @@ def get_db():
     return conn
 
 
-def extract_files_from_generated_code(content):
-    files = {}
-    match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
-    if match:
-        try:
-            json_content = match.group(1)
-            files = json.loads(json_content)
-            return files
-        except:
-            pass
-    pattern = r"(?:#\s*File:\s*|###\s*|--\s*filename:\s*)([^\n]+)\n"
-    matches = list(re.finditer(pattern, content))
-    if not matches:
-        return {"generated_code.py": content}
-    for i in range(len(matches)):
-        filename = matches[i].group(1).strip()
-        start = matches[i].end()
-        if i + 1 < len(matches):
-            end = matches[i + 1].start()
-            file_content = content[start:end].strip()
-        else:
-            file_content = content[start:].strip()
-        files[filename] = file_content
-    return files if files else {"generated_code.py": content}
-
-
-def safe_parse_result(result):
-    if isinstance(result, dict):
-        return result
-    elif isinstance(result, str):
-        try:
-            return json.loads(result)
-        except:
-            return {"generated_code.py": result}
-    return result
-
-
-def get_files_from_result(result):
-    files = {}
-    parsed = safe_parse_result(result)
-    if isinstance(parsed, dict):
-        for fname, fdata in parsed.items():
-            if isinstance(fdata, str):
-                files[fname] = fdata
-            elif isinstance(fdata, dict):
-                files[fname] = fdata.get("content") or fdata.get("code") or fdata.get("file_content")
-    if "generated_code.py" in files and len(files) == 1:
-        extracted = extract_files_from_generated_code(files["generated_code.py"])
-        if extracted:
-            files = extracted
-    if not files:
-        files = {"generated_code.py": str(result)}
-    return files
-
-
-def save_files_to_folder(files_dict, base_folder):
-    saved_files = []
-    failed_files = []
+def check_task_status(task_id):
     try:
-        os.makedirs(base_folder, exist_ok=True)
-        for filename, content in files_dict.items():
-            try:
-                full_path = os.path.join(base_folder, filename)
-                os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                with open(full_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-                saved_files.append(full_path)
-            except Exception as e:
-                failed_files.append(f"{filename}: {str(e)}")
-        return saved_files, failed_files
-    except Exception as e:
-        return [], [f"Base folder error: {str(e)}"]
+        response = http_session.get(f"{BACKEND_URL}/task-result/{task_id}", timeout=10)
+        return response.json()
+    except:
+        return None
 
 
-def check_task_status(task_id):
+def wait_for_task(task_id, timeout=LONG_POLL_SECONDS):
     try:
-        response = requests.get(f"http://127.0.0.1:8000/task-result/{task_id}", timeout=10)
+        response = http_session.get(
+            f"{BACKEND_URL}/task-result/{task_id}/wait",
+            params={"timeout": timeout},
+            timeout=timeout + 10
+        )
         return response.json()
     except:
         return None
 
 
 def poll_task(task_id):
-    for _ in range(60):
-        result = check_task_status(task_id)
-        if result:
-            if result.get("status") == "done":
-                return result.get("result")
-            elif result.get("status") == "error":
-                st.error(result.get("result"))
+    status_placeholder = st.empty()
+    failures = 0
+    while True:
+        result = wait_for_task(task_id)
+        if not result or "status" not in result:
+            failures += 1
+            if failures >= MAX_CONNECTION_FAILURES:
+                status_placeholder.empty()
+                st.error("❌ Lost connection to the backend while waiting for the task.")
                 return None
-        time.sleep(2)
-    st.warning("Task timed out.")
-    return None
+            time.sleep(2)
+            continue
+        failures = 0
+        status = result.get("status")
+        if status == "done":
+            status_placeholder.empty()
+            return result.get("result")
+        elif status == "error":
+            status_placeholder.empty()
+            st.error(result.get("result"))
+            return None
+        elif status == "pending" and result.get("queue_position"):
+            status_placeholder.info(f"⏳ Waiting in queue (position {result['queue_position']})")
+        else:
+            status_placeholder.info("⚙️ Generating code...")
+
+
+def render_file_previews(files, placeholder):
+    with placeholder.container():
+        st.markdown(f"**📄 {len(files)} file(s) ready so far**")
+        for path, content in files.items():
+            with st.expander(path, expanded=False):
+                st.code(content)
+
+
+def stream_task(task_id):
+    token_placeholder = st.empty()
+    files_placeholder = st.empty()
+    streamed_text = []
+    streamed_files = {}
+    last_paint = 0.0
+    try:
+        with http_session.get(f"{BACKEND_URL}/task-events/{task_id}", stream=True, timeout=(10, None)) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                kind = event.get("type")
+                if kind == "token":
+                    streamed_text.append(event["text"])
+                    # Repaint at a fixed rate instead of once per token
+                    if time.monotonic() - last_paint >= STREAM_REPAINT_SECONDS:
+                        token_placeholder.code("".join(streamed_text)[-STREAM_PREVIEW_CHARS:], language="json")
+                        last_paint = time.monotonic()
+                elif kind == "file":
+                    streamed_files[event["path"]] = event["content"]
+                    render_file_previews(streamed_files, files_placeholder)
+                elif kind == "status":
+                    if event.get("partial_files"):
+                        streamed_files.update(event["partial_files"])
+                        render_file_previews(streamed_files, files_placeholder)
+                    status = event.get("status")
+                    if status == "done":
+                        token_placeholder.empty()
+                        files_placeholder.empty()
+                        return event.get("result")
+                    elif status == "error":
+                        token_placeholder.empty()
+                        st.error(event.get("result"))
+                        return None
+    except (requests.exceptions.RequestException, json.JSONDecodeError):
+        pass
+    # Stream dropped before the task finished; fall back to long-polling
+    token_placeholder.empty()
+    return poll_task(task_id)
 
 
 def get_projects():
@@ -172,106 +200,27 @@ def get_unique_latest_bdd_files(project_id):
     return [dict(r) for r in latest_files]
 
 
-def create_static_framework_files(project_dir, tool, lang, fw):
-    files_to_create = {}
-
-    # ==========================
-    # SELENIUM + PYTHON + PYTEST
-    # ==========================
-    if tool == "Selenium" and lang == "Python" and fw == "Pytest":
-
-        files_to_create = {
-
-            "config/config.py": """
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-BASE_URL = os.getenv("BASE_URL")
-USERNAME = os.getenv("LOGIN_USERNAME")
-PASSWORD = os.getenv("LOGIN_PASSWORD")
-""",
-
-            "conftest.py": """
-import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-
-@pytest.fixture(scope="session")
-def browser():
-    options = Options()
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
-    yield driver
-    driver.quit()
-""",
-
-            "requirements.txt": """
-pytest
-selenium
-python-dotenv
-"""
-        }
-
-    # ==========================
-    # SELENIUM + PYTHON + BEHAVE
-    # ==========================
-
-    elif tool == "Selenium" and lang == "Python" and fw == "Behave":
-
-        files_to_create = {
-
-            "features/environment.py": """
-from selenium import webdriver
-
-def before_scenario(context, scenario):
-    context.driver = webdriver.Chrome()
-
-def after_scenario(context, scenario):
-    context.driver.quit()
-""",
-
-            "requirements.txt": """
-behave
-selenium
-python-dotenv
-"""
-        }
-
-    # ==========================
-    # SELENIUM + JAVA + TESTNG
-    # ==========================
-
-    elif tool == "Selenium" and lang == "Java" and fw == "TestNG":
-
-        files_to_create = {
+def get_generated_bdd_version(project_id, file_name):
+    db = get_db()
+    row = db.execute("""
+        SELECT file_content FROM BDDGenerated
+        WHERE project_id = ? AND file_name = ?
+    """, (project_id, file_name)).fetchone()
+    return row["file_content"] if row else None
 
-            "pom.xml": """
-<project>
-  <dependencies>
 
-    <dependency>
-      <groupId>org.seleniumhq.selenium</groupId>
-      <artifactId>selenium-java</artifactId>
-      <version>4.18.1</version>
-    </dependency>
+def record_generated_bdd_version(project_id, file_name, file_content):
+    # Called once the generated code is on disk, so the next incremental run diffs against it
+    db = get_db()
+    db.execute("""
+        INSERT OR REPLACE INTO BDDGenerated (project_id, file_name, file_content, generated_date)
+        VALUES (?,?,?,?)
+    """, (project_id, file_name, file_content, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    db.commit()
 
-    <dependency>
-      <groupId>org.testng</groupId>
-      <artifactId>testng</artifactId>
-      <version>7.8.0</version>
-    </dependency>
 
-  </dependencies>
-</project>
-"""
-        }
+def create_static_framework_files(project_dir, tool, lang, fw):
+    files_to_create = render_templates(tool, lang, fw)
 
     # ==========================
     # FILE CREATION
@@ -296,7 +245,7 @@ def create_project_structure(project_dir,tool, lang, fw, base_url, login_usernam
 
         try:
 
-            st.info("Installing Playwright framework...")
+            st.info("Creating Playwright framework from the local scaffold cache...")
 
             lang_map = {
                 "TypeScript": "ts",
@@ -308,24 +257,12 @@ def create_project_structure(project_dir,tool, lang, fw, base_url, login_usernam
 
             selected_lang = lang_map.get(lang, "ts")
 
-            cmd = [
-                "npx",
-                "create-playwright@latest",
-                ".",
-                "--",
-                f"--lang={selected_lang}"
-            ]
-
-            process = subprocess.run(
-                cmd,
-                cwd=project_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if process.returncode != 0:
+            # The first project per language builds the skeleton with create-playwright; later ones are copied
+            try:
+                stamp_playwright_project(project_dir, selected_lang)
+            except subprocess.CalledProcessError as e:
                 st.error("Playwright installation failed")
-                st.code(process.stderr)
+                st.code(e.stderr)
                 return False
 
             st.success("Playwright framework created successfully!")
@@ -722,7 +659,37 @@ def handle_select_project():
 
         col1, col2 = st.columns([3, 1])
         with col1:
+            stream_output = st.checkbox("⚡ Stream generated files as they arrive", value=True, key="stream_output")
+            fan_out = st.checkbox("🧩 Split large feature files into parallel requests", value=False,
+                                  key="fan_out", help="Generates each feature concurrently; steps and page "
+                                                      "objects once per feature, tests per group of scenarios")
+            previous_version = get_generated_bdd_version(proj["project_id"], bdd_filename)
+            incremental = False
+            if previous_version is not None:
+                incremental = st.checkbox("♻️ Only regenerate added or changed scenarios", value=True,
+                                          key="incremental", help="Compares with the version this file's code was "
+                                                                  "last generated from and merges new code into the "
+                                                                  "project files")
             if st.button("🤖 **GENERATE CODE NOW**", type="primary", use_container_width=True):
+                generation_content = bdd_content
+                removed_scenarios = []
+                removal_only = False
+                if incremental:
+                    plan = plan_incremental_content(previous_version, bdd_content)
+                    removed_scenarios = plan["removed"]
+                    if plan["content"] is None and not removed_scenarios:
+                        st.info("♻️ **No added or changed scenarios** since the code was last generated - nothing to regenerate.")
+                        return
+                    if plan["content"] is None:
+                        removal_only = True
+                    elif plan["full"]:
+                        incremental = False
+                        st.info("♻️ Feature header, background or most scenarios changed - regenerating everything.")
+                    else:
+                        generation_content = plan["content"]
+                        st.info(f"♻️ Regenerating {len(plan['diff']['added'])} added and "
+                                f"{len(plan['diff']['changed'])} changed scenario(s) only.")
+
                 db = get_db()
                 db.execute(
                     """
@@ -739,23 +706,46 @@ def handle_select_project():
                 db.commit()
                 st.success(f"✅ **BDD file '{bdd_filename}' saved to database!**")
 
+                if removal_only:
+                    # Scenarios were only deleted: no code to generate, just drop them from the project
+                    project_dir = proj.get("project_path", "")
+                    merged, merge_notes = remove_scenarios(
+                        project_dir, previous_version, removed_scenarios, bdd_filename
+                    ) if project_dir else ({}, ["No project path set - remove the scenarios by hand."])
+                    written = write_project_files(project_dir, merged) if merged else {"updated": [], "failed": []}
+                    st.info(f"♻️ **{len(removed_scenarios)} scenario(s) removed** - updated "
+                            f"{len(written['updated'])} feature file(s) without regenerating code.")
+                    for note in merge_notes + written["failed"]:
+                        st.warning(note)
+                    if merged and not written["failed"]:
+                        record_generated_bdd_version(proj["project_id"], bdd_filename, bdd_content)
+                    return
+
                 with st.spinner("Generating code... This may take a few minutes."):
                     payload = {
                         "project_name": proj["project_name"],
                         "language": proj["project_lang"],
                         "framework": proj["project_fw"],
                         "project_path": proj.get("project_path", ""),
-                        "bdd_content": bdd_content,
-                        "support_content": support_content
+                        "bdd_content": generation_content,
+                        "support_content": support_content,
+                        "stream": stream_output,
+                        "fan_out": fan_out
                     }
                     try:
-                        res = requests.post("http://127.0.0.1:8000/generate-agent-code", json=payload, timeout=300)
+                        res = http_session.post(f"{BACKEND_URL}/generate-agent-code", json=payload, timeout=300)
+                        if res.status_code == 429:
+                            st.warning(f"⏳ **Backend is busy** - {res.json().get('detail')} Please try again shortly.")
+                            return
                         task_id = res.json()["task_id"]
-                        result = poll_task(task_id)
+                        result = stream_task(task_id) if stream_output else poll_task(task_id)
                         if result:
                             st.session_state.generated_result = result
                             st.session_state.show_save_section = True
                             st.session_state.selected_project = proj
+                            st.session_state.incremental_mode = incremental
+                            st.session_state.removed_scenarios = removed_scenarios
+                            st.session_state.generated_bdd = (proj["project_id"], bdd_filename, bdd_content)
                             st.success("✅ **Code generated successfully!**")
                     except Exception as e:
                         st.error(f"❌ **Backend error**")
@@ -789,36 +779,27 @@ def show_save_ui():
     selected_files = {}
     file_paths = {}
 
-    def extract_files_from_generated_test(content):
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', content)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_match = re.search(r'(\{[\s\S]*\})', content)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                return None
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            return None
-
     expanded_files = {}
     for fname, content in files.items():
         if "generated_test" in fname:
             st.write("..................Received Content might be incorrect. Please read the AI comment given below.")
             st.write(content)
-            extracted = extract_files_from_generated_test(content)
-            if extracted and isinstance(extracted, dict):
-                for extracted_fname, extracted_content in extracted.items():
-                    if isinstance(extracted_content, str):
-                        expanded_files[extracted_fname] = extracted_content
+            extracted = extract_file_map(content)
+            if extracted:
+                expanded_files.update(extracted)
             else:
                 st.warning(f"⚠️ Could not extract JSON from `{fname}`. Skipping.")
         else:
             expanded_files[fname] = content
 
+    if st.session_state.get("incremental_mode"):
+        expanded_files, merge_notes = merge_generated_files(
+            folder_path.strip(), expanded_files, st.session_state.get("removed_scenarios") or []
+        )
+        st.info(f"♻️ **Incremental mode** - {len(expanded_files)} file(s) merged with the existing project files.")
+        for note in merge_notes:
+            st.warning(note)
+
     for fname in expanded_files.keys():
         #---Removed code for filename with timestamp
         # name_parts = fname.rsplit(".", 1)
@@ -844,7 +825,8 @@ def show_save_ui():
 
     any_selected = any(selected_files.values())
     if st.button("💾 **SAVE SELECTED FILES**", type="primary", use_container_width=True, disabled=not any_selected):
-        saved, failed = [], []
+        failed = []
+        by_folder = {}
 
         for fname, is_checked in selected_files.items():
             if not is_checked:
@@ -856,14 +838,27 @@ def show_save_ui():
                 failed.append(f"{ts_name}: No folder path provided.")
                 continue
 
-            single_file = {ts_name: expanded_files[fname]}  # Use expanded_files here
-            s, f = save_files_to_folder(single_file, dest_folder.strip())
-            saved.extend(s)
-            failed.extend(f)
+            by_folder.setdefault(dest_folder.strip(), {})[ts_name] = expanded_files[fname]  # Use expanded_files here
+
+        manifest = {"created": [], "updated": [], "unchanged": []}
+        for dest_folder, folder_files in by_folder.items():
+            written = write_project_files(dest_folder, folder_files)
+            for status in manifest:
+                manifest[status].extend(written[status])
+            failed.extend(written["failed"])
+        saved = manifest["created"] + manifest["updated"] + manifest["unchanged"]
+
+        if saved and not failed and st.session_state.get("generated_bdd"):
+            record_generated_bdd_version(*st.session_state.generated_bdd)
 
         if saved:
-            st.success(f"✅ {len(saved)} file(s) saved successfully!")
-            for key in ["generated_result", "show_save_section", "selected_project"]:
+            st.success(
+                f"✅ {len(saved)} file(s) saved successfully! "
+                f"({len(manifest['created'])} new, {len(manifest['updated'])} updated, "
+                f"{len(manifest['unchanged'])} unchanged and left untouched)"
+            )
+            for key in ["generated_result", "show_save_section", "selected_project", "incremental_mode",
+                        "removed_scenarios", "generated_bdd"]:
                 if key in st.session_state:
                     del st.session_state[key]
             st.cache_data.clear()
@@ -887,7 +882,7 @@ def run_app():
     st.markdown("### **Backend Health Status**")
     if st.button("Check Backend Health"):
         try:
-            res = requests.get("http://127.0.0.1:8000/health", timeout=5)
+            res = http_session.get(f"{BACKEND_URL}/health", timeout=5)
             if res.status_code == 200:
                 st.markdown(f"""
                     <div style="
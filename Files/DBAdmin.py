@@ -2,7 +2,7 @@ import os
 import streamlit as st
 import sqlite3
 import pandas as pd
-import openai
+from LLMProvider import create_provider
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -18,12 +18,11 @@ def run_sqlite_admin_portal():
     st.markdown(f"**Database:** `{DB_FILE}`")
 
     load_dotenv()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    try:
+        provider = create_provider()
+    except ValueError:
         st.error("OpenAI API key not found. Please check your .env file.")
         st.stop()
-    openai.api_key = api_key
-    client = openai
 
     def quote_ident(name: str) -> str:
         safe = name.replace('"', '""')
@@ -109,16 +108,15 @@ def run_sqlite_admin_portal():
         - Provide only the SQL query without explanation.
         """
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            sql_query = provider.complete(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": question}
                 ],
+                model="gpt-3.5-turbo",
                 temperature=0,
                 max_tokens=300
-            )
-            sql_query = response.choices[0].message.content.strip()
+            ).strip()
             sql_query = sql_query.strip('`').strip("'").strip('"')
             return sql_query
         except Exception as e:
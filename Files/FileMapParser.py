@@ -0,0 +1,279 @@
+import json
+import re
+
+SEEK_OBJECT = 0
+SEEK_KEY = 1
+IN_KEY = 2
+SEEK_COLON = 3
+SEEK_VALUE = 4
+IN_STRING = 5
+IN_NESTED = 6
+IN_SCALAR = 7
+DONE = 8
+SEEK_FENCE = 9
+
+JSON_FENCE = "```json"
+
+STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+# Not strict: models often put raw newlines and tabs inside JSON strings
+STRING_DECODER = json.JSONDecoder(strict=False)
+NESTED_SPECIAL = re.compile(r'["\\{}\[\]]')
+SCALAR_END = re.compile(r'[,}]')
+
+
+def file_content_from_value(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return value.get("content") or value.get("code") or value.get("file_content")
+    return None
+
+
+# =========================
+# INCREMENTAL {path: content} PARSER
+# =========================
+class FileMapParser:
+    """Parses a JSON object of {path: content} as it streams in, yielding each member once it closes.
+
+    Text around the object (code fences, prose) is skipped, and `finish()` marks
+    output that stopped before the object closed as truncated. Objects in leading
+    prose that hold no files are passed over; once a ```json fence is seen, the
+    object after it is the file map, even if an unfenced one came first.
+    """
+
+    def __init__(self):
+        self.state = SEEK_OBJECT
+        self.files = {}
+        self.truncated = False
+        self.partial = None
+        self._key = None
+        self._raw = []
+        self._escape = False
+        self._depth = 0
+        self._nested_in_string = False
+        self._fenced = False
+        self._window = ""
+        self._unfenced = {}
+
+    def feed(self, chunk: str) -> list:
+        completed = []
+        i = 0
+        n = len(chunk)
+        while i < n and self.state != DONE:
+            state = self.state
+
+            if state == SEEK_OBJECT:
+                found = chunk.find("{", i)
+                if not self._fenced:
+                    self._fenced = self._saw_fence(chunk[i:found if found >= 0 else n])
+                if found < 0:
+                    return completed
+                self.state = SEEK_KEY
+                self._key = None
+                i = found + 1
+
+            elif state == SEEK_FENCE:
+                # An unfenced object closed; a ```json fence after it holds the real file map
+                text = self._window + chunk[i:]
+                found = text.find(JSON_FENCE)
+                if found < 0:
+                    self._window = text[-(len(JSON_FENCE) - 1):]
+                    return completed
+                self._unfenced = self.files
+                self.files = {}
+                self._fenced = True
+                self._window = ""
+                self.state = SEEK_OBJECT
+                i += found + len(JSON_FENCE) - (len(text) - (n - i))
+
+            elif state == SEEK_KEY:
+                ch = chunk[i]
+                if ch == '"':
+                    self.state = IN_KEY
+                    self._raw = []
+                elif ch == "}":
+                    # An empty object is prose ({} or {"x": 1}); keep looking for the file map
+                    if not self.files:
+                        self.state = SEEK_OBJECT
+                    elif self._fenced:
+                        self.state = DONE
+                    else:
+                        self.state = SEEK_FENCE
+                        self._window = ""
+                elif not (ch.isspace() or ch == "," or self.files):
+                    # A brace in leading prose, not the file map: keep looking
+                    self.state = SEEK_OBJECT
+                    continue
+                i += 1
+
+            elif state in (IN_KEY, IN_STRING):
+                i, closed = self._scan_string(chunk, i)
+                if closed:
+                    text = self._decode_string()
+                    if state == IN_KEY:
+                        self._key = text
+                        self.state = SEEK_COLON
+                    else:
+                        self._emit(self._key, text, completed)
+                        self.state = SEEK_KEY
+
+            elif state == SEEK_COLON:
+                ch = chunk[i]
+                if ch == ":":
+                    self.state = SEEK_VALUE
+                elif not (ch.isspace() or self.files):
+                    # A quoted word in prose ({"BASE_URL"}), not a key
+                    self.state = SEEK_OBJECT
+                    continue
+                i += 1
+
+            elif state == SEEK_VALUE:
+                ch = chunk[i]
+                if ch == '"':
+                    self.state = IN_STRING
+                    self._raw = []
+                    i += 1
+                elif ch in "{[":
+                    self.state = IN_NESTED
+                    self._raw = [ch]
+                    self._depth = 1
+                    self._nested_in_string = False
+                    i += 1
+                elif ch.isspace():
+                    i += 1
+                else:
+                    self.state = IN_SCALAR
+                    self._raw = []
+
+            elif state == IN_NESTED:
+                i = self._scan_nested(chunk, i, completed)
+
+            elif state == IN_SCALAR:
+                match = SCALAR_END.search(chunk, i)
+                end = match.start() if match else n
+                self._raw.append(chunk[i:end])
+                i = end
+                if match:
+                    self._emit_raw(completed)
+                    self.state = SEEK_KEY
+
+        return completed
+
+    def finish(self) -> list:
+        """Call once the input has ended; flushes a trailing scalar and records truncation."""
+        completed = []
+        if self.state == IN_SCALAR:
+            self._emit_raw(completed)
+            self.state = SEEK_KEY
+        if self.state == SEEK_FENCE:
+            self.state = DONE
+        if self.state == IN_STRING and self._key is not None:
+            if self._escape:
+                # Drop the dangling backslash so the cut-off content still decodes
+                self._raw.pop()
+                self._escape = False
+            self.partial = (self._key, self._decode_string())
+        self.truncated = self.state not in (SEEK_OBJECT, DONE)
+        if self._unfenced and not self.files:
+            # The fence held no file map after all; fall back to the object before it
+            self.files = self._unfenced
+            self.state = DONE
+            self.truncated = False
+            self.partial = None
+        return completed
+
+    @property
+    def complete(self) -> bool:
+        return self.state in (DONE, SEEK_FENCE) and bool(self.files)
+
+    def _saw_fence(self, text: str) -> bool:
+        # Keeps the last few characters so a fence split across chunks is still found
+        text = self._window + text
+        self._window = text[-(len(JSON_FENCE) - 1):]
+        return JSON_FENCE in text
+
+    def _scan_string(self, chunk: str, i: int):
+        # One regex match per string body; escapes are left for json to decode in one go
+        n = len(chunk)
+        if self._escape:
+            self._raw.append(chunk[i])
+            self._escape = False
+            i += 1
+        end = STRING_BODY.match(chunk, i).end()
+        self._raw.append(chunk[i:end])
+        if end < n and chunk[end] == '"':
+            return end + 1, True
+        if end < n:
+            # A backslash is the chunk's last character; it escapes the first one of the next chunk
+            self._raw.append("\\")
+            self._escape = True
+        return n, False
+
+    def _scan_nested(self, chunk: str, i: int, completed: list) -> int:
+        n = len(chunk)
+        if self._escape:
+            self._raw.append(chunk[i])
+            self._escape = False
+            i += 1
+        while i < n:
+            match = NESTED_SPECIAL.search(chunk, i)
+            if not match:
+                self._raw.append(chunk[i:])
+                return n
+            pos = match.start()
+            ch = chunk[pos]
+            self._raw.append(chunk[i:pos + 1])
+            i = pos + 1
+            if ch == "\\":
+                if i < n:
+                    self._raw.append(chunk[i])
+                    i += 1
+                else:
+                    self._escape = True
+            elif ch == '"':
+                self._nested_in_string = not self._nested_in_string
+            elif not self._nested_in_string:
+                self._depth += 1 if ch in "{[" else -1
+                if self._depth == 0:
+                    self._emit_raw(completed)
+                    self.state = SEEK_KEY
+                    return i
+        return n
+
+    def _decode_string(self) -> str:
+        raw = "".join(self._raw)
+        self._raw = []
+        if "\\" not in raw:
+            return raw
+        try:
+            return STRING_DECODER.decode('"' + raw + '"')
+        except json.JSONDecodeError:
+            return raw
+
+    def _emit_raw(self, completed: list):
+        raw = "".join(self._raw).strip()
+        self._raw = []
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        self._emit(self._key, value, completed)
+
+    def _emit(self, key, value, completed: list):
+        content = file_content_from_value(value)
+        if key is None or content is None:
+            return
+        self.files[key] = content
+        completed.append((key, content))
+
+
+def parse_file_map(text: str) -> FileMapParser:
+    parser = FileMapParser()
+    parser.feed(text or "")
+    parser.finish()
+    return parser
+
+
+def extract_file_map(text: str) -> dict:
+    """Single pass over fenced, unfenced, prose-wrapped or truncated output; complete members only."""
+    return parse_file_map(text).files
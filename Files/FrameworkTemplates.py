@@ -0,0 +1,340 @@
+TOOL_ALIASES = {"": "selenium"}
+FRAMEWORK_ALIASES = {"playwright": "playwright test"}
+
+
+# =========================
+# SELENIUM + PYTHON + PYTEST
+# =========================
+PYTEST_TEMPLATES = {
+    "config/config.py": """
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_URL = os.getenv("BASE_URL")
+USERNAME = os.getenv("LOGIN_USERNAME")
+PASSWORD = os.getenv("LOGIN_PASSWORD")
+""",
+
+    "conftest.py": """
+import pytest
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+@pytest.fixture(scope="session")
+def browser():
+    options = Options()
+    options.add_argument("--start-maximized")
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=options
+    )
+    yield driver
+    driver.quit()
+""",
+
+    "requirements.txt": """
+selenium>=4.0.0
+pytest
+pytest-bdd
+pytest-html
+webdriver-manager
+python-dotenv
+""",
+}
+
+# =========================
+# SELENIUM + PYTHON + BEHAVE
+# =========================
+BEHAVE_TEMPLATES = {
+    "features/environment.py": """
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+def before_scenario(context, scenario):
+    options = Options()
+    options.add_argument("--start-maximized")
+    context.driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=options
+    )
+
+def after_scenario(context, scenario):
+    context.driver.quit()
+""",
+
+    "requirements.txt": """
+behave
+selenium>=4.0.0
+webdriver-manager
+python-dotenv
+""",
+}
+
+# =========================
+# SELENIUM + JAVA (shared pom parts)
+# =========================
+POM_TEMPLATE = """
+<project xmlns="http://maven.apache.org/POM/4.0.0"
+         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>com.qa</groupId>
+  <artifactId>qa-automation</artifactId>
+  <version>1.0-SNAPSHOT</version>
+
+  <properties>
+    <maven.compiler.source>11</maven.compiler.source>
+    <maven.compiler.target>11</maven.compiler.target>
+    <project.build.sourceEncoding>UTF-8</project.build.sourceEncoding>
+  </properties>
+
+  <dependencies>
+
+    <dependency>
+      <groupId>org.seleniumhq.selenium</groupId>
+      <artifactId>selenium-java</artifactId>
+      <version>4.18.1</version>
+    </dependency>
+
+    <dependency>
+      <groupId>io.github.bonigarcia</groupId>
+      <artifactId>webdrivermanager</artifactId>
+      <version>5.7.0</version>
+    </dependency>
+{extra_dependencies}
+  </dependencies>
+
+  <build>
+    <plugins>
+      <plugin>
+        <groupId>org.apache.maven.plugins</groupId>
+        <artifactId>maven-surefire-plugin</artifactId>
+        <version>3.2.5</version>
+{surefire_configuration}
+      </plugin>
+    </plugins>
+  </build>
+</project>
+"""
+
+TESTNG_DEPENDENCIES = """
+    <dependency>
+      <groupId>org.testng</groupId>
+      <artifactId>testng</artifactId>
+      <version>7.8.0</version>
+    </dependency>
+"""
+
+TESTNG_SUREFIRE = """        <configuration>
+          <suiteXmlFiles>
+            <suiteXmlFile>src/test/resources/testng.xml</suiteXmlFile>
+          </suiteXmlFiles>
+        </configuration>"""
+
+CUCUMBER_DEPENDENCIES = """
+    <dependency>
+      <groupId>io.cucumber</groupId>
+      <artifactId>cucumber-java</artifactId>
+      <version>7.15.0</version>
+    </dependency>
+
+    <dependency>
+      <groupId>io.cucumber</groupId>
+      <artifactId>cucumber-junit</artifactId>
+      <version>7.15.0</version>
+      <scope>test</scope>
+    </dependency>
+
+    <dependency>
+      <groupId>junit</groupId>
+      <artifactId>junit</artifactId>
+      <version>4.13.2</version>
+      <scope>test</scope>
+    </dependency>
+"""
+
+# =========================
+# SELENIUM + JAVA + TESTNG
+# =========================
+TESTNG_TEMPLATES = {
+    "pom.xml": POM_TEMPLATE.replace("{extra_dependencies}", TESTNG_DEPENDENCIES)
+                           .replace("{surefire_configuration}", TESTNG_SUREFIRE),
+
+    "src/test/java/utils/BaseTest.java": """
+package utils;
+
+import io.github.bonigarcia.wdm.WebDriverManager;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.openqa.selenium.chrome.ChromeOptions;
+import org.testng.annotations.AfterMethod;
+import org.testng.annotations.BeforeMethod;
+
+public class BaseTest {
+    protected WebDriver driver;
+
+    @BeforeMethod
+    public void setUp() {
+        WebDriverManager.chromedriver().setup();
+        ChromeOptions options = new ChromeOptions();
+        options.addArguments("--start-maximized");
+        driver = new ChromeDriver(options);
+    }
+
+    @AfterMethod(alwaysRun = true)
+    public void tearDown() {
+        if (driver != null) {
+            driver.quit();
+        }
+    }
+}
+""",
+
+    "src/test/resources/testng.xml": """
+<!DOCTYPE suite SYSTEM "https://testng.org/testng-1.0.dtd">
+<suite name="Automation Suite">
+  <test name="All Tests">
+    <packages>
+      <package name="tests"/>
+    </packages>
+  </test>
+</suite>
+""",
+}
+
+# =========================
+# SELENIUM + JAVA + CUCUMBER
+# =========================
+CUCUMBER_TEMPLATES = {
+    "pom.xml": POM_TEMPLATE.replace("{extra_dependencies}", CUCUMBER_DEPENDENCIES)
+                           .replace("{surefire_configuration}", ""),
+
+    "src/test/java/hooks/Hooks.java": """
+package hooks;
+
+import io.cucumber.java.After;
+import io.cucumber.java.Before;
+import io.github.bonigarcia.wdm.WebDriverManager;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.openqa.selenium.chrome.ChromeOptions;
+
+public class Hooks {
+    private static WebDriver driver;
+
+    public static WebDriver getDriver() {
+        return driver;
+    }
+
+    @Before
+    public void setUp() {
+        WebDriverManager.chromedriver().setup();
+        ChromeOptions options = new ChromeOptions();
+        options.addArguments("--start-maximized");
+        driver = new ChromeDriver(options);
+    }
+
+    @After
+    public void tearDown() {
+        if (driver != null) {
+            driver.quit();
+        }
+    }
+}
+""",
+
+    "src/test/java/runner/TestRunner.java": """
+package runner;
+
+import io.cucumber.junit.Cucumber;
+import io.cucumber.junit.CucumberOptions;
+import org.junit.runner.RunWith;
+
+@RunWith(Cucumber.class)
+@CucumberOptions(
+    features = "src/test/resources/features",
+    glue = {"steps", "hooks"},
+    plugin = {"pretty", "html:target/cucumber-report.html"}
+)
+public class TestRunner {
+}
+""",
+}
+
+# =========================
+# PLAYWRIGHT + TYPESCRIPT
+# =========================
+PLAYWRIGHT_TS_TEMPLATES = {
+    "playwright.config.ts": """
+import { defineConfig, devices } from '@playwright/test';
+
+export default defineConfig({
+  testDir: './tests',
+  fullyParallel: true,
+  reporter: 'html',
+  use: {
+    baseURL: process.env.BASE_URL,
+    trace: 'on-first-retry',
+  },
+  projects: [
+    { name: 'chromium', use: { ...devices['Desktop Chrome'] } },
+  ],
+});
+""",
+
+    "package.json": """
+{
+  "dependencies": {
+    "@playwright/test": "^1.40.0",
+    "typescript": "^5.0.0"
+  },
+  "devDependencies": {
+    "@types/node": "^20.0.0"
+  },
+  "scripts": {
+    "test": "playwright test",
+    "test:headed": "playwright test --headed",
+    "test:report": "playwright show-report"
+  }
+}
+""",
+
+    "fixtures/base.ts": """
+import { test as base, expect } from '@playwright/test';
+
+export const test = base.extend({});
+export { expect };
+""",
+}
+
+# =========================
+# REGISTRY
+# =========================
+TEMPLATE_REGISTRY = {
+    ("selenium", "python", "pytest"): PYTEST_TEMPLATES,
+    ("selenium", "python", "behave"): BEHAVE_TEMPLATES,
+    ("selenium", "java", "testng"): TESTNG_TEMPLATES,
+    ("selenium", "java", "cucumber"): CUCUMBER_TEMPLATES,
+    ("playwright", "typescript", "playwright test"): PLAYWRIGHT_TS_TEMPLATES,
+}
+
+
+def template_key(tool: str, language: str, framework: str) -> tuple:
+    tool = (tool or "").strip().lower()
+    framework = (framework or "").strip().lower()
+    return (
+        TOOL_ALIASES.get(tool, tool),
+        (language or "").strip().lower(),
+        FRAMEWORK_ALIASES.get(framework, framework),
+    )
+
+
+def render_templates(tool: str, language: str, framework: str) -> dict:
+    templates = TEMPLATE_REGISTRY.get(template_key(tool, language, framework), {})
+    return {path: content.strip() + "\n" for path, content in templates.items()}
@@ -0,0 +1,47 @@
+import re
+
+from FileMapParser import extract_file_map, file_content_from_value
+from ProjectWriter import write_project_files
+
+FILE_HEADER = re.compile(r"(?:#\s*File:\s*|###\s*|--\s*filename:\s*)([^\n]+)\n")
+
+
+def extract_files_from_headers(content):
+    # Plain-text answers that mark each file with a "# File: path" style header
+    matches = list(FILE_HEADER.finditer(content))
+    files = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        files[match.group(1).strip()] = content[match.end():end].strip()
+    return files
+
+
+def extract_files_from_text(content):
+    return extract_file_map(content) or extract_files_from_headers(content)
+
+
+def get_files_from_result(result):
+    files = {}
+    if isinstance(result, dict):
+        for fname, fdata in result.items():
+            content = file_content_from_value(fdata)
+            if content is not None:
+                files[fname] = content
+    elif isinstance(result, str):
+        files = extract_files_from_text(result)
+
+    # The backend falls back to one "generated" file holding the raw answer, which may still wrap a file map
+    if len(files) == 1 and "generated" in next(iter(files)).lower():
+        extracted = extract_files_from_text(next(iter(files.values())))
+        if extracted:
+            files = extracted
+    if not files:
+        files = {"generated_code.py": str(result)}
+    return files
+
+
+def save_files_to_folder(files_dict, base_folder):
+    """Returns (saved_paths, failed); unchanged files count as saved but are not rewritten."""
+    manifest = write_project_files(base_folder, files_dict)
+    saved_files = manifest["created"] + manifest["updated"] + manifest["unchanged"]
+    return saved_files, manifest["failed"]
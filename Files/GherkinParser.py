@@ -0,0 +1,149 @@
+import re
+
+SCENARIO_KEYWORDS = ("Scenario Outline:", "Scenario Template:", "Scenario:", "Example:")
+STEP_KEYWORDS = ("Given ", "When ", "Then ", "And ", "But ", "* ")
+
+
+def slugify(text: str) -> str:
+    slug = re.sub(r"[^0-9a-zA-Z]+", "_", text).strip("_").lower()
+    return slug or "feature"
+
+
+def _new_feature(name="", header=None):
+    return {"name": name, "header": header or [], "background": [], "scenarios": []}
+
+
+# =========================
+# PARSE FEATURE TEXT
+# =========================
+def parse_features(text: str) -> list:
+    """Splits Gherkin text into features, each with its header, background and scenarios."""
+    features = []
+    feature = None
+    block = None
+    pending = []
+
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip()
+
+        if stripped.startswith("Feature:"):
+            feature = _new_feature(stripped[len("Feature:"):].strip(), pending + [line])
+            features.append(feature)
+            block = feature["header"]
+            pending = []
+            continue
+
+        if feature is None:
+            # Tags / comments above the first Feature line belong to it
+            if stripped:
+                pending.append(line)
+            continue
+
+        if stripped.startswith("@") or (stripped.startswith("#") and block is not feature["header"]):
+            pending.append(line)
+            continue
+
+        if stripped.startswith("Background:"):
+            feature["background"] = pending + [line]
+            block = feature["background"]
+            pending = []
+            continue
+
+        keyword = next((k for k in SCENARIO_KEYWORDS if stripped.startswith(k)), None)
+        if keyword:
+            tags = [t for tag_line in pending if tag_line.strip().startswith("@") for t in tag_line.split()]
+            scenario = {
+                "name": stripped[len(keyword):].strip(),
+                "keyword": keyword.rstrip(":"),
+                "tags": tags,
+                "line": line_no,
+                "lines": pending + [line],
+                "steps": [],
+            }
+            feature["scenarios"].append(scenario)
+            block = scenario["lines"]
+            pending = []
+            continue
+
+        if pending:
+            block.extend(pending)
+            pending = []
+        block.append(line)
+        if stripped.startswith(STEP_KEYWORDS) and feature["scenarios"] and block is feature["scenarios"][-1]["lines"]:
+            feature["scenarios"][-1]["steps"].append(stripped)
+
+    if pending and block is not None:
+        block.extend(pending)
+
+    for scenario in (s for f in features for s in f["scenarios"]):
+        scenario["text"] = "\n".join(scenario["lines"]).rstrip()
+    return features
+
+
+def iter_scenarios(text: str):
+    for feature in parse_features(text):
+        for scenario in feature["scenarios"]:
+            yield feature, scenario
+
+
+def build_feature_text(feature: dict, scenarios: list) -> str:
+    parts = ["\n".join(feature["header"]).rstrip()]
+    if feature["background"]:
+        parts.append("\n".join(feature["background"]).rstrip())
+    parts.extend(scenario["text"] for scenario in scenarios)
+    return "\n\n".join(parts) + "\n"
+
+
+def chunk_features(text: str, scenarios_per_chunk: int) -> list:
+    """Returns (slug, feature_text, parts) per feature; parts are (slug, text) chunks of at most
+    `scenarios_per_chunk` scenarios each, a single part named like the feature when it is small."""
+    chunks = []
+    used = set()
+
+    def unique(slug):
+        while slug in used:
+            slug += "_x"
+        used.add(slug)
+        return slug
+
+    for feature in parse_features(text):
+        scenarios = feature["scenarios"]
+        slug = unique(slugify(feature["name"]))
+        groups = [scenarios[i:i + scenarios_per_chunk] for i in range(0, len(scenarios), scenarios_per_chunk)]
+        if len(groups) > 1:
+            parts = [(unique(f"{slug}_part{index}"), build_feature_text(feature, group))
+                     for index, group in enumerate(groups, start=1)]
+        else:
+            parts = [(slug, build_feature_text(feature, scenarios))]
+        chunks.append((slug, build_feature_text(feature, scenarios), parts))
+    return chunks
+
+
+# =========================
+# SCENARIO-LEVEL DIFF
+# =========================
+def normalize_scenario(scenario: dict) -> str:
+    return "\n".join(line.strip() for line in scenario["lines"] if line.strip())
+
+
+def diff_scenarios(old_text: str, new_text: str) -> dict:
+    """Compares two versions of a feature file by scenario name."""
+    old_features = parse_features(old_text or "")
+    new_features = parse_features(new_text or "")
+    old_scenarios = {s["name"]: s for f in old_features for s in f["scenarios"]}
+    new_scenarios = {s["name"]: s for f in new_features for s in f["scenarios"]}
+
+    def shared_text(features):
+        return [("\n".join(l.strip() for l in f["header"] + f["background"] if l.strip())) for f in features]
+
+    diff = {
+        "added": [s for name, s in new_scenarios.items() if name not in old_scenarios],
+        "changed": [s for name, s in new_scenarios.items()
+                    if name in old_scenarios and normalize_scenario(s) != normalize_scenario(old_scenarios[name])],
+        "removed": [s for name, s in old_scenarios.items() if name not in new_scenarios],
+        "unchanged": [s for name, s in new_scenarios.items()
+                      if name in old_scenarios and normalize_scenario(s) == normalize_scenario(old_scenarios[name])],
+        # Header/background edits affect every scenario, so they force a full regeneration
+        "shared_changed": shared_text(old_features) != shared_text(new_features),
+    }
+    return diff
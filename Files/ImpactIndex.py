@@ -0,0 +1,253 @@
+import ast
+import json
+import os
+import re
+
+from GherkinParser import STEP_KEYWORDS
+
+STATE_DIR = ".aiqa"
+BASELINE_FILE = "impact_baseline.json"
+
+SKIP_DIRS = {".aiqa", ".git", ".venv", "venv", "node_modules", "target", "__pycache__", ".pytest_cache"}
+SOURCE_EXTENSIONS = (".py", ".feature")
+# A change to any of these can affect every test
+GLOBAL_FILES = {"requirements.txt", "pytest.ini", "tox.ini", "setup.cfg", "pyproject.toml", "behave.ini", ".env"}
+STEP_DECORATORS = {"given", "when", "then", "step"}
+PLACEHOLDER = re.compile(r"\{[^}]*\}")
+
+
+# =========================
+# FILE WALK
+# =========================
+def _walk(project_path: str):
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            if name.endswith(SOURCE_EXTENSIONS) or name in GLOBAL_FILES:
+                yield os.path.relpath(os.path.join(root, name), project_path).replace(os.sep, "/")
+
+
+def _module_names(rel_paths: list) -> dict:
+    modules = {}
+    for rel in rel_paths:
+        if not rel.endswith(".py"):
+            continue
+        parts = rel[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        if parts:
+            modules[".".join(parts)] = rel
+    return modules
+
+
+def _resolve_module(name: str, modules: dict):
+    # Generated projects import themselves by their path from the repo root
+    # (Projects.Pytest12March.pages.login_page), so match the longest known suffix
+    parts = name.split(".")
+    for i in range(len(parts)):
+        rel = modules.get(".".join(parts[i:]))
+        if rel:
+            return rel
+    return None
+
+
+# =========================
+# STATIC PARSING
+# =========================
+def _step_pattern(arg):
+    """Regex for a step decorator's first argument: a plain / parse-style string or parsers.re(...)."""
+    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+        text = arg.value
+        pieces = PLACEHOLDER.split(re.escape(text).replace(r"\{", "{").replace(r"\}", "}"))
+        return re.compile("^" + "(.+?)".join(pieces) + "$")
+    if isinstance(arg, ast.Call) and arg.args:
+        func = arg.func.attr if isinstance(arg.func, ast.Attribute) else getattr(arg.func, "id", "")
+        inner = arg.args[0]
+        if isinstance(inner, ast.Constant) and isinstance(inner.value, str):
+            if func in ("re", "compile"):
+                try:
+                    return re.compile(inner.value)
+                except re.error:
+                    return None
+            return _step_pattern(inner)
+    return None
+
+
+def _call_name(node) -> str:
+    func = node.func
+    return (func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")) or ""
+
+
+def parse_python(source: str, rel: str) -> dict:
+    """Imports, referenced feature files and step patterns of one module."""
+    info = {"imports": [], "features": [], "steps": []}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return info
+    package = rel.rsplit("/", 1)[0].replace("/", ".") if "/" in rel else ""
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            info["imports"].extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                anchor = package.split(".")[:len(package.split(".")) - node.level + 1] if package else []
+                base = ".".join([p for p in anchor if p] + ([base] if base else []))
+            # `from pkg import module` imports a module; `from module import Name` the module itself
+            info["imports"].extend(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+            if base:
+                info["imports"].append(base)
+        elif isinstance(node, ast.Assign):
+            targets = [t.id for t in node.targets if isinstance(t, ast.Name)]
+            if "pytest_plugins" in targets and isinstance(node.value, (ast.List, ast.Tuple)):
+                info["imports"].extend(
+                    e.value for e in node.value.elts if isinstance(e, ast.Constant) and isinstance(e.value, str)
+                )
+        elif isinstance(node, ast.Call):
+            name = _call_name(node)
+            if name in ("scenarios", "scenario"):
+                info["features"].extend(
+                    a.value for a in node.args
+                    if isinstance(a, ast.Constant) and isinstance(a.value, str) and a.value.endswith(".feature")
+                )
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                if isinstance(decorator, ast.Call) and decorator.args \
+                        and _call_name(decorator).lower() in STEP_DECORATORS:
+                    pattern = _step_pattern(decorator.args[0])
+                    if pattern:
+                        info["steps"].append(pattern)
+    return info
+
+
+def feature_steps(text: str) -> list:
+    steps = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        keyword = next((k for k in STEP_KEYWORDS if stripped.startswith(k)), None)
+        if keyword:
+            steps.append(stripped[len(keyword):].strip())
+    return steps
+
+
+# =========================
+# INDEX
+# =========================
+class ImpactIndex:
+    """File-level dependency graph of a generated test project.
+
+    Edges run from a file to what it uses: tests -> feature files (pytest-bdd
+    scenarios()), conftest.py / environment.py and imports; feature files -> the
+    step modules defining their steps; steps -> pages -> locators through imports.
+    """
+
+    def __init__(self, project_path: str, framework: str, tests: list, deps: dict):
+        self.project_path = project_path
+        self.framework = framework
+        self.tests = tests
+        self.deps = deps
+
+    @classmethod
+    def build(cls, project_path: str, framework: str, test_files: list):
+        rel_paths = list(_walk(project_path))
+        modules = _module_names(rel_paths)
+        deps = {rel: set() for rel in rel_paths}
+        step_owners = []
+
+        for rel in rel_paths:
+            if not rel.endswith(".py"):
+                continue
+            with open(os.path.join(project_path, rel), "r", encoding="utf-8", errors="replace") as f:
+                info = parse_python(f.read(), rel)
+            for name in info["imports"]:
+                target = _resolve_module(name, modules)
+                if target and target != rel:
+                    deps[rel].add(target)
+            folder = os.path.dirname(rel)
+            for feature in info["features"]:
+                target = os.path.normpath(os.path.join(folder, feature)).replace(os.sep, "/")
+                if target in deps:
+                    deps[rel].add(target)
+            if info["steps"]:
+                step_owners.append((rel, info["steps"]))
+
+        for rel in rel_paths:
+            if not rel.endswith(".feature"):
+                continue
+            with open(os.path.join(project_path, rel), "r", encoding="utf-8", errors="replace") as f:
+                steps = feature_steps(f.read())
+            for owner, patterns in step_owners:
+                if any(p.search(step) for step in steps for p in patterns):
+                    deps[rel].add(owner)
+
+        # Fixtures / hooks files apply to every test below their folder
+        hooks = [rel for rel in rel_paths if os.path.basename(rel) in ("conftest.py", "environment.py")]
+        tests = [os.path.relpath(t, project_path).replace(os.sep, "/") for t in test_files]
+        for test in tests:
+            deps.setdefault(test, set())
+            for hook in hooks:
+                hook_dir = os.path.dirname(hook)
+                if not hook_dir or test.startswith(hook_dir + "/"):
+                    deps[test].add(hook)
+        return cls(project_path, framework, tests, deps)
+
+    def closure(self, rel: str) -> set:
+        seen = set()
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(self.deps.get(current, ()))
+        return seen
+
+    def impacted_tests(self, changed: list) -> dict:
+        """Maps each impacted test (absolute path) to the changed files that reach it."""
+        changed = {c.replace(os.sep, "/") for c in changed}
+        run_all = any(os.path.basename(c) in GLOBAL_FILES or c not in self.deps for c in changed)
+        impacted = {}
+        for test in self.tests:
+            hits = sorted(changed if run_all else changed & self.closure(test))
+            if hits:
+                impacted[os.path.join(self.project_path, test)] = hits
+        return impacted
+
+
+# =========================
+# CHANGE DETECTION
+# =========================
+def _baseline_path(project_path: str) -> str:
+    return os.path.join(project_path, STATE_DIR, BASELINE_FILE)
+
+
+def snapshot(project_path: str) -> dict:
+    result = {}
+    for rel in _walk(project_path):
+        stat = os.stat(os.path.join(project_path, rel))
+        result[rel] = [stat.st_mtime_ns, stat.st_size]
+    return result
+
+
+def changed_since_baseline(project_path: str):
+    """Added, modified and deleted files since the last full or impacted run; None when there is no baseline."""
+    try:
+        with open(_baseline_path(project_path), "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    current = snapshot(project_path)
+    changed = [rel for rel, sig in current.items() if baseline.get(rel) != sig]
+    changed.extend(rel for rel in baseline if rel not in current)
+    return sorted(changed)
+
+
+def save_baseline(project_path: str, state: dict = None):
+    path = _baseline_path(project_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state if state is not None else snapshot(project_path), f)
+    os.replace(temp_path, path)
@@ -0,0 +1,216 @@
+import ast
+import os
+
+from GherkinParser import parse_features, build_feature_text, diff_scenarios
+
+SKIP_DIRS = {".aiqa", ".git", ".venv", "venv", "node_modules", "target", "__pycache__"}
+DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+IMPORTS = (ast.Import, ast.ImportFrom)
+
+
+# =========================
+# WHAT TO SEND
+# =========================
+def plan_incremental_content(previous: str, current: str) -> dict:
+    """Decides whether `current` can be generated as a delta against `previous`."""
+    diff = diff_scenarios(previous, current)
+    features = parse_features(current)
+    removed = [s["name"] for s in diff["removed"]]
+    if diff["shared_changed"] or len(features) != 1 or not diff["unchanged"]:
+        return {"content": current, "full": True, "removed": removed, "diff": diff}
+
+    wanted = {s["name"] for s in diff["added"] + diff["changed"]}
+    if not wanted:
+        return {"content": None, "full": False, "removed": removed, "diff": diff}
+    feature = features[0]
+    scenarios = [s for s in feature["scenarios"] if s["name"] in wanted]
+    return {"content": build_feature_text(feature, scenarios), "full": False, "removed": removed, "diff": diff}
+
+
+# =========================
+# FEATURE FILES
+# =========================
+def merge_feature_text(existing: str, generated: str, removed_names=()) -> str:
+    existing_features = parse_features(existing)
+    if not existing_features:
+        return generated
+    feature = existing_features[0]
+    scenarios = [s for s in feature["scenarios"] if s["name"] not in removed_names]
+    positions = {s["name"]: i for i, s in enumerate(scenarios)}
+    for scenario in (s for f in parse_features(generated) for s in f["scenarios"]):
+        if scenario["name"] in positions:
+            scenarios[positions[scenario["name"]]] = scenario
+        else:
+            positions[scenario["name"]] = len(scenarios)
+            scenarios.append(scenario)
+    return build_feature_text(feature, scenarios)
+
+
+# =========================
+# PYTHON MODULES
+# =========================
+def definition_key(node, source: str) -> str:
+    # Step functions are often all called step_impl, so the decorator identifies them
+    if node.decorator_list:
+        return " ".join(ast.get_source_segment(source, node.decorator_list[0]).split())
+    return node.name
+
+
+def node_lines(node, lines: list) -> list:
+    start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+    return lines[start - 1:node.end_lineno]
+
+
+def _same_definition(a, a_lines: list, b, b_lines: list) -> bool:
+    return "\n".join(node_lines(a, a_lines)).strip() == "\n".join(node_lines(b, b_lines)).strip()
+
+
+def merge_python_source(existing: str, generated: str, conflicts: list = None):
+    """Adds imports, functions, classes and methods from `generated` that `existing` lacks.
+
+    Definitions both sides have keep the existing code; when `conflicts` is given, the
+    keys of those whose generated code differs are appended to it.
+    """
+    try:
+        existing_tree = ast.parse(existing)
+        generated_tree = ast.parse(generated)
+    except SyntaxError:
+        return None
+
+    existing_lines = existing.splitlines()
+    generated_lines = generated.splitlines()
+    existing_imports = {ast.get_source_segment(existing, n).strip() for n in existing_tree.body if isinstance(n, IMPORTS)}
+    existing_statements = {ast.get_source_segment(existing, n).strip() for n in existing_tree.body}
+    existing_defs = {definition_key(n, existing): n for n in existing_tree.body if isinstance(n, DEFINITIONS)}
+
+    new_imports = []
+    appended = []
+    insertions = {}
+    for node in generated_tree.body:
+        segment = ast.get_source_segment(generated, node).strip()
+        if isinstance(node, IMPORTS):
+            if segment not in existing_imports:
+                new_imports.append(segment)
+        elif isinstance(node, DEFINITIONS):
+            key = definition_key(node, generated)
+            target = existing_defs.get(key)
+            if target is None:
+                appended.append("\n".join(node_lines(node, generated_lines)))
+            elif isinstance(node, ast.ClassDef) and isinstance(target, ast.ClassDef):
+                known = {definition_key(m, existing): m for m in target.body if isinstance(m, DEFINITIONS)}
+                methods = []
+                for m in node.body:
+                    if not isinstance(m, DEFINITIONS):
+                        continue
+                    method_key = definition_key(m, generated)
+                    if method_key not in known:
+                        methods.append(m)
+                    elif conflicts is not None and not _same_definition(
+                            known[method_key], existing_lines, m, generated_lines):
+                        conflicts.append(f"{key}.{method_key}")
+                if methods:
+                    insertions[target.end_lineno] = [""] + [
+                        line for m in methods for line in node_lines(m, generated_lines) + [""]
+                    ]
+            elif conflicts is not None and not _same_definition(target, existing_lines, node, generated_lines):
+                conflicts.append(key)
+        elif segment not in existing_statements:
+            appended.append("\n".join(node_lines(node, generated_lines)))
+
+    if not (new_imports or appended or insertions):
+        return existing
+
+    merged = list(existing_lines)
+    for line_no in sorted(insertions, reverse=True):
+        merged[line_no:line_no] = insertions[line_no][:-1]
+
+    if new_imports:
+        import_end = max((n.end_lineno for n in existing_tree.body if isinstance(n, IMPORTS)), default=0)
+        merged[import_end:import_end] = new_imports
+
+    text = "\n".join(merged).rstrip() + "\n"
+    for block in appended:
+        text += "\n\n" + block.rstrip() + "\n"
+    return text
+
+
+# =========================
+# PROJECT-LEVEL MERGE
+# =========================
+def merge_generated_files(project_dir: str, files: dict, removed_names=()):
+    """Merges partial generation output into what is already on disk under project_dir."""
+    merged = {}
+    notes = []
+    for path, content in files.items():
+        full_path = os.path.join(project_dir, path)
+        if not os.path.exists(full_path):
+            merged[path] = content
+            continue
+        with open(full_path, "r", encoding="utf-8") as f:
+            existing = f.read()
+        if existing.strip() == content.strip():
+            continue
+
+        if path.endswith(".feature"):
+            merged[path] = merge_feature_text(existing, content, removed_names)
+        elif path.endswith(".py"):
+            conflicts = []
+            result = merge_python_source(existing, content, conflicts)
+            if result is None:
+                merged[path + ".incremental"] = content
+                notes.append(f"{path}: could not parse, new code saved as {path}.incremental")
+                continue
+            if result != existing:
+                merged[path] = result
+            if conflicts:
+                # Changed scenarios often rewrite steps other scenarios share, so never overwrite silently
+                merged[path + ".incremental"] = content
+                notes.append(f"{path}: regenerated code differs for {', '.join(conflicts)}; the existing "
+                             f"definitions were kept and the new ones saved in {path}.incremental")
+        else:
+            merged[path + ".incremental"] = content
+            notes.append(f"{path}: merge manually from {path}.incremental")
+
+    if removed_names:
+        notes.append("Removed scenarios were dropped from feature files; review their step code: "
+                     + ", ".join(removed_names))
+    return merged, notes
+
+
+def remove_scenarios(project_dir: str, feature_text: str, removed_names, file_name: str = None) -> tuple:
+    """Drops removed scenarios from the edited feature's file when nothing needs regenerating.
+
+    Only feature files declaring the same Feature as `feature_text` are candidates; when
+    several do, the one named `file_name` is used, and otherwise none is touched, so
+    other features reusing a scenario name keep it. Returns ({relative path: new
+    feature text}, notes).
+    """
+    removed_names = set(removed_names)
+    wanted = {feature["name"] for feature in parse_features(feature_text)}
+    candidates = {}
+    for root, dirs, names in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in names:
+            if not name.endswith(".feature"):
+                continue
+            full_path = os.path.join(root, name)
+            with open(full_path, "r", encoding="utf-8") as f:
+                existing = f.read()
+            features = parse_features(existing)
+            if features and features[0]["name"] in wanted:
+                candidates[os.path.relpath(full_path, project_dir)] = existing
+
+    if len(candidates) > 1:
+        named = {rel: text for rel, text in candidates.items() if os.path.basename(rel) == file_name}
+        if len(named) != 1:
+            return {}, ["Several feature files declare this feature; remove these scenarios by hand: "
+                        + ", ".join(sorted(removed_names))]
+        candidates = named
+    if not candidates:
+        return {}, ["No feature file for this feature was found in the project; remove these scenarios by hand: "
+                    + ", ".join(sorted(removed_names))]
+
+    (rel, existing), = candidates.items()
+    return {rel: merge_feature_text(existing, "", removed_names)}, [
+        f"Removed scenarios were dropped from {rel}; review their step code: " + ", ".join(sorted(removed_names))
+    ]
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# =========================
+# FAIR ASYNC JOB SCHEDULER
+# =========================
+class JobScheduler:
+    """Runs queued jobs on a fixed number of async workers, round-robin across tenants.
+
+    A job that raises is logged and passed to `on_error(job_id, error)`; the worker keeps running.
+    """
+
+    def __init__(self, handler, workers: int = 4, max_queue_depth: int = 100, on_error=None):
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._signal = None
+        self._worker_tasks = []
+
+    async def start(self):
+        self._signal = asyncio.Queue()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def capacity(self) -> int:
+        return self.max_queue_depth - self._queued
+
+    def submit(self, job_id: str, tenant: str, *args) -> int:
+        if self._queued >= self.max_queue_depth:
+            raise QueueFullError(f"Generation queue is full ({self.max_queue_depth} jobs waiting).")
+        self._queues.setdefault(tenant or "default", deque()).append((job_id, args))
+        self._queued += 1
+        self._signal.put_nowait(None)
+        return self.position(job_id)
+
+    def _next_job(self):
+        # Take one job from the tenant at the front, then rotate that tenant to the back
+        tenant, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        del self._queues[tenant]
+        if jobs:
+            self._queues[tenant] = jobs
+        self._queued -= 1
+        return job
+
+    def _dispatch_order(self):
+        queues = [list(jobs) for jobs in self._queues.values()]
+        depth = max((len(jobs) for jobs in queues), default=0)
+        for i in range(depth):
+            for jobs in queues:
+                if i < len(jobs):
+                    yield jobs[i][0]
+
+    def position(self, job_id: str):
+        for index, queued_id in enumerate(self._dispatch_order()):
+            if queued_id == job_id:
+                return index + 1
+        return None
+
+    async def _worker(self):
+        while True:
+            await self._signal.get()
+            job_id, args = self._next_job()
+            self._active += 1
+            try:
+                await self.handler(job_id, *args)
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                if self.on_error:
+                    try:
+                        self.on_error(job_id, e)
+                    except Exception:
+                        logger.exception("Error handler failed for job %s", job_id)
+            finally:
+                self._active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "active": self._active,
+            "queued": self._queued,
+            "max_queue_depth": self.max_queue_depth,
+            "tenants": len(self._queues),
+        }
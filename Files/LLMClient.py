@@ -0,0 +1,259 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+RETRYABLE_ERROR_NAMES = (
+    "RateLimitError", "ServiceUnavailableError", "APIConnectionError", "Timeout", "APITimeoutError", "TryAgain",
+)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LLMTimeoutError(Exception):
+    pass
+
+
+class StreamInterruptedError(Exception):
+    """Raised when a stream fails after tokens were already sent, so it must not be retried."""
+    pass
+
+
+class StreamCancelled(Exception):
+    """Raised from the token callback to stop a stream whose caller has gone away."""
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (LLMTimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "http_status", None) or getattr(error, "status_code", None)
+    if status == 429 or (isinstance(status, int) and status >= 500):
+        return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(error: Exception):
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+async def stream_in_thread(stream, on_token, progress: dict) -> str:
+    """Runs the blocking `stream(emit)` in a worker thread, forwarding each chunk to `on_token` on this loop.
+
+    `progress["delivered"]` counts the chunks `on_token` has actually received. Once the
+    awaiting coroutine is cancelled (e.g. by a deadline), queued chunks are dropped and the
+    worker stops at its next chunk instead of streaming into the void.
+    """
+    loop = asyncio.get_running_loop()
+    cancelled = threading.Event()
+    progress.setdefault("delivered", 0)
+
+    def _deliver(delta):
+        if not cancelled.is_set():
+            progress["delivered"] += 1
+            on_token(delta)
+
+    def _call():
+        sent = 0
+
+        def _emit(delta):
+            nonlocal sent
+            if cancelled.is_set():
+                raise StreamCancelled()
+            sent += 1
+            loop.call_soon_threadsafe(_deliver, delta)
+
+        try:
+            return stream(_emit)
+        except StreamCancelled:
+            return None
+        except Exception as e:
+            # Clients already rendered the partial output, so a retry would duplicate it
+            if sent:
+                raise StreamInterruptedError(f"Stream interrupted after {sent} chunks: {e}") from e
+            raise
+
+    try:
+        return await asyncio.to_thread(_call)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+
+
+# =========================
+# CIRCUIT BREAKER
+# =========================
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one probe through after `reset_seconds`."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+# =========================
+# RESILIENT CLIENT
+# =========================
+class ResilientLLMClient:
+    """Runs provider calls with a deadline, jittered retries, optional hedging and a circuit breaker.
+
+    `attempt` passed to `run()` is any zero-argument coroutine function, so a fake
+    provider can be swapped in for the real one.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = 120,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        hedge_enabled: bool = False,
+        hedge_min_samples: int = 20,
+        breaker: CircuitBreaker = None,
+        latency_window: int = 200
+    ):
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "rejected": 0}
+
+    def p95_latency(self):
+        if len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def backoff(self, attempt_no: int, error: Exception) -> float:
+        # Full jitter keeps many workers that hit the same 429 from retrying in lockstep
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt_no))
+        return max(delay, retry_after_seconds(error) or 0)
+
+    async def _timed(self, attempt, interrupted=None):
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(attempt(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            if interrupted and interrupted():
+                raise StreamInterruptedError(
+                    f"Stream exceeded {self.timeout_seconds:g}s deadline after output was sent."
+                )
+            raise LLMTimeoutError(f"LLM call exceeded {self.timeout_seconds:g}s deadline.")
+        self.latencies.append(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, attempt):
+        threshold = self.p95_latency()
+        primary = asyncio.ensure_future(self._timed(attempt))
+        if threshold is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result()
+
+        self.counters["hedged"] += 1
+        backup = asyncio.ensure_future(self._timed(attempt))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run(self, attempt, hedge: bool = True, interrupted=None):
+        """`interrupted()` tells whether a timed-out attempt already sent output; such a timeout is not retried."""
+        self.counters["calls"] += 1
+        for attempt_no in range(self.max_retries + 1):
+            probe = self.breaker.state == "half_open"
+            if not self.breaker.allow():
+                self.counters["rejected"] += 1
+                raise CircuitOpenError(
+                    f"LLM provider is unavailable; retrying after {self.breaker.reset_seconds:g}s cool-down."
+                )
+            try:
+                if hedge and self.hedge_enabled:
+                    result = await self._hedged(attempt)
+                else:
+                    result = await self._timed(attempt, interrupted)
+            except Exception as e:
+                if isinstance(e, StreamInterruptedError):
+                    self.breaker.record_failure()
+                    raise
+                if not is_retryable(e):
+                    # The provider answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt_no == self.max_retries:
+                    raise
+                self.counters["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt_no, e))
+                continue
+            except BaseException:
+                # A cancelled probe says nothing about the provider; let the next call probe instead
+                if probe:
+                    self.breaker.probing = False
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        p95 = self.p95_latency()
+        return {
+            **self.counters,
+            "circuit": self.breaker.state,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+        }
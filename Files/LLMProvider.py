@@ -0,0 +1,171 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+
+DEFAULT_FAKE_RESPONSE = {
+    "features/generated.feature": "Feature: Generated\n  Scenario: Placeholder\n    Given the application is open\n",
+    "steps/generated_steps.py": "from pytest_bdd import given\n\n\n@given('the application is open')\ndef open_application(browser):\n    pass\n",
+}
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+# =========================
+# PROVIDER INTERFACE
+# =========================
+class LLMProvider:
+    """Blocking chat-completion interface; callers run it in a worker thread."""
+
+    name = ""
+
+    def complete(self, messages: list, model: str, temperature: float = 0, max_tokens: int = None,
+                 timeout: float = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: list, model: str, on_token, temperature: float = 0, max_tokens: int = None,
+               timeout: float = None) -> str:
+        # Providers without streaming deliver the whole answer as one chunk
+        result = self.complete(messages, model, temperature, max_tokens, timeout)
+        on_token(result)
+        return result
+
+
+# =========================
+# OPENAI
+# =========================
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str = None):
+        import openai
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not set!")
+        self.client = openai.OpenAI(api_key=api_key)
+
+    def _options(self, model, temperature, max_tokens, timeout):
+        options = {"model": model, "temperature": temperature}
+        if max_tokens:
+            options["max_tokens"] = max_tokens
+        if timeout:
+            options["timeout"] = timeout
+        return options
+
+    def complete(self, messages, model, temperature=0, max_tokens=None, timeout=None):
+        response = self.client.chat.completions.create(
+            messages=messages,
+            **self._options(model, temperature, max_tokens, timeout)
+        )
+        return response.choices[0].message.content
+
+    def stream(self, messages, model, on_token, temperature=0, max_tokens=None, timeout=None):
+        response = self.client.chat.completions.create(
+            messages=messages,
+            stream=True,
+            **self._options(model, temperature, max_tokens, timeout)
+        )
+        parts = []
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    on_token(delta)
+        finally:
+            # Drops the HTTP connection when on_token stops the stream early
+            response.close()
+        return "".join(parts)
+
+
+# =========================
+# OFFLINE FAKE
+# =========================
+class FakeProvider(LLMProvider):
+    """Deterministic stand-in with configurable latency, token rate, responses and error rate.
+
+    Responses come from, in order: a fixture file named after the prompt hash in
+    `fixtures_dir`, a fixture picked by that hash from the directory, `response`,
+    or DEFAULT_FAKE_RESPONSE. Injected errors depend on the seed, the prompt and the
+    call number, so a sequence of calls is reproducible while a retry can succeed.
+    """
+
+    name = "fake"
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, latency_seconds: float = 0.5, tokens_per_second: float = 0, response: str = None,
+                 fixtures_dir: str = None, error_rate: float = 0, seed: int = 0):
+        self.latency_seconds = latency_seconds
+        self.tokens_per_second = tokens_per_second
+        self.response = response if response is not None else json.dumps(DEFAULT_FAKE_RESPONSE, indent=2)
+        self.fixtures_dir = fixtures_dir
+        self.error_rate = error_rate
+        self.seed = seed
+        self._calls = itertools.count()
+        self.fixtures = sorted(
+            f for f in os.listdir(fixtures_dir) if os.path.isfile(os.path.join(fixtures_dir, f))
+        ) if fixtures_dir else []
+
+    @staticmethod
+    def prompt_hash(messages: list) -> str:
+        return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def pick_response(self, digest: str) -> str:
+        if not self.fixtures:
+            return self.response
+        exact = f"{digest}.txt"
+        name = exact if exact in self.fixtures else self.fixtures[int(digest, 16) % len(self.fixtures)]
+        with open(os.path.join(self.fixtures_dir, name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _respond(self, messages, max_tokens, on_token=None):
+        digest = self.prompt_hash(messages)
+        rng = random.Random(f"{self.seed}:{digest}:{next(self._calls)}")
+        time.sleep(self.latency_seconds)
+        if rng.random() < self.error_rate:
+            raise FakeRateLimitError("Fake provider rate limit.")
+
+        text = self.pick_response(digest)
+        if max_tokens:
+            text = text[:max_tokens * self.CHARS_PER_TOKEN]
+        if not (on_token or self.tokens_per_second):
+            return text
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0
+        for i in range(0, len(text), self.CHARS_PER_TOKEN):
+            if delay:
+                time.sleep(delay)
+            if on_token:
+                on_token(text[i:i + self.CHARS_PER_TOKEN])
+        return text
+
+    def complete(self, messages, model, temperature=0, max_tokens=None, timeout=None):
+        return self._respond(messages, max_tokens)
+
+    def stream(self, messages, model, on_token, temperature=0, max_tokens=None, timeout=None):
+        return self._respond(messages, max_tokens, on_token)
+
+
+def create_provider(name: str = None) -> LLMProvider:
+    name = (name or os.getenv("LLM_PROVIDER", "openai")).strip().lower()
+    if name == "fake":
+        response_file = os.getenv("FAKE_LLM_RESPONSE_FILE")
+        response = None
+        if response_file:
+            with open(response_file, "r", encoding="utf-8") as f:
+                response = f.read()
+        return FakeProvider(
+            latency_seconds=float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+            response=response,
+            fixtures_dir=os.getenv("FAKE_LLM_FIXTURES_DIR") or None,
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0"))
+        )
+    if name == "openai":
+        return OpenAIProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER '{name}'. Use 'openai' or 'fake'.")
@@ -0,0 +1,113 @@
+import collections
+import os
+import subprocess
+import threading
+import time
+
+TAIL_LINES = int(os.getenv("SCRIPT_RUNNER_LOG_TAIL_LINES", "500"))
+FRAMES_PER_SECOND = float(os.getenv("SCRIPT_RUNNER_LOG_FPS", "4"))
+
+
+class LogStreamer:
+    """Runs a command, reading its output on a background thread.
+
+    Only the last `tail_lines` lines are kept in memory for display; the full log
+    is spooled to `spool_path` (when given) for download once the process ends.
+    """
+
+    def __init__(self, cmd: list, spool_path: str = None, env: dict = None, tail_lines: int = TAIL_LINES,
+                 index: int = 0):
+        self.cmd = cmd
+        self.spool_path = spool_path
+        self.env = env
+        self.index = index
+        self.line_count = 0
+        self.returncode = None
+        self.started = None
+        self.finished = None
+        self._tail = collections.deque(maxlen=tail_lines)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.started = time.time()
+        # Test output is not guaranteed to be valid in any encoding; a strict decode
+        # would kill the reader and leave the child blocked on a full pipe
+        process = subprocess.Popen(
+            self.cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8",
+            errors="replace", bufsize=1, env=self.env
+        )
+        self._thread = threading.Thread(target=self._pump, args=(process,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _pump(self, process):
+        spool = None
+        try:
+            spool = open(self.spool_path, "w", encoding="utf-8") if self.spool_path else None
+            for line in process.stdout:
+                if spool:
+                    spool.write(line)
+                with self._lock:
+                    self._tail.append(line)
+                    self.line_count += 1
+        except Exception as e:
+            with self._lock:
+                self._tail.append(f"[log reader error: {e}]\n")
+                self.line_count += 1
+            # Keep draining so the child never blocks on a full pipe
+            for _ in iter(lambda: process.stdout.read(65536), ""):
+                pass
+        finally:
+            if spool:
+                spool.close()
+            process.stdout.close()
+            self.returncode = process.wait()
+            self.finished = time.time()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.time()) - (self.started or time.time())
+
+    def tail(self, lines: int = None) -> str:
+        with self._lock:
+            window = list(self._tail)
+        return "".join(window[-lines:] if lines else window)
+
+    def wait(self, on_frame=None, fps: float = FRAMES_PER_SECOND):
+        """Blocks until the process ends, calling on_frame(self) at most `fps` times a second."""
+        wait_for([self], lambda streams: on_frame(self) if on_frame else None, fps)
+        return self.returncode
+
+
+def wait_for(streams: list, on_frame=None, fps: float = FRAMES_PER_SECOND, max_parallel: int = None):
+    """Waits for several streams, repainting only when one of them produced output.
+
+    Streams not started yet are started as slots free up, at most `max_parallel` at once.
+    """
+    limit = max_parallel or len(streams)
+    interval = 1.0 / fps
+    painted = None
+    while True:
+        active = sum(1 for stream in streams if stream.running)
+        for stream in streams:
+            if active >= limit:
+                break
+            if stream._thread is None:
+                stream.start()
+                active += 1
+        if not active:
+            break
+        seen = tuple(stream.line_count for stream in streams)
+        if on_frame and seen != painted:
+            on_frame(streams)
+            painted = seen
+        time.sleep(interval)
+    for stream in streams:
+        stream._thread.join()
+    if on_frame:
+        on_frame(streams)
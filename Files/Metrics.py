@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# =========================
+# METRIC TYPES
+# =========================
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge:
+    """Read at scrape time from `callback`, which returns a number or a {label_tuple: value} dict."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, callback):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+
+    def samples(self):
+        value = self.callback()
+        if isinstance(value, dict):
+            return [(self.name, key, v) for key, v in value.items()]
+        return [(self.name, (), value)]
+
+
+class CallbackCounter(Gauge):
+    """A Gauge-style callback for totals another component already keeps; the values must only increase."""
+
+    kind = "counter"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series["counts"]):
+                    samples.append((f"{self.name}_bucket", key + (("le", _number(bound)),), count))
+                samples.append((f"{self.name}_bucket", key + (("le", "+Inf"),), series["count"]))
+                samples.append((f"{self.name}_sum", key, round(series["sum"], 6)))
+                samples.append((f"{self.name}_count", key, series["count"]))
+        return samples
+
+
+# =========================
+# REGISTRY
+# =========================
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str, callback) -> Gauge:
+        return self._register(Gauge(name, help_text, callback))
+
+    def callback_counter(self, name: str, help_text: str, callback) -> CallbackCounter:
+        return self._register(CallbackCounter(name, help_text, callback))
+
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# =========================
+# TRACE EXPORT
+# =========================
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class TraceExporter:
+    """Appends one OTLP/JSON `resourceSpans` document per task to a file, one document per line.
+
+    The file can be replayed into an OpenTelemetry Collector with its otlpjsonfile receiver.
+    """
+
+    def __init__(self, path: str, service_name: str = "ai-qa-backend"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, name: str, start_ns: int, end_ns: int, spans: list, attributes: dict = None, error: str = ""):
+        trace_id = os.urandom(16).hex()
+        root_id = os.urandom(8).hex()
+        status = {"code": 2, "message": error} if error else {"code": 1}
+        otlp_spans = [{
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": name,
+            "kind": 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_attribute(k, v) for k, v in (attributes or {}).items()],
+            "status": status,
+        }]
+        for span in spans:
+            otlp_spans.append({
+                "traceId": trace_id,
+                "spanId": os.urandom(8).hex(),
+                "parentSpanId": root_id,
+                "name": span["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span["end_ns"]),
+                "attributes": [_attribute(k, v) for k, v in span.get("attributes", {}).items()],
+            })
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "ai-qa-backend"}, "spans": otlp_spans}],
+        }]}
+        line = json.dumps(document, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
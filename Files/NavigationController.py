@@ -148,7 +148,8 @@ def sidebar_navigationQA():
 
     st.sidebar.title("Navigation Panel")
     page = st.sidebar.radio("Choose a page",
-                            ["Home", "Locator Extractor", "BDD to Code", "File Merger", "Code Helper", "Script Runner"])
+                            ["Home", "Locator Extractor", "BDD to Code", "File Merger", "Code Helper", "Script Runner",
+                             "Run History"])
 
     color = st.sidebar.color_picker("Change buttons color?", "#ea6c0b")
     if result[0]["ButtonColor"] is None:
@@ -200,6 +201,9 @@ def sidebar_navigationQA():
     elif page == "Script Runner":
         from ScriptRunner import run_app
         run_app()
+    elif page == "Run History":
+        from RunHistoryDashboard import run_app
+        run_app()
 
 def sidebar_navigationAdmin():
     global minutes_difference, current_datetime, GetSessionTime
@@ -0,0 +1,195 @@
+import heapq
+import html
+import os
+import subprocess
+import sys
+
+from GherkinParser import iter_scenarios
+from LogStreamer import LogStreamer, wait_for
+
+
+# =========================
+# SHARDING
+# =========================
+def collect_pytest_ids(files: list, python: str = None) -> list:
+    # Node ids are relative to rootdir; pin it so they can be made absolute for the workers
+    rootdir = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    result = subprocess.run(
+        [python or sys.executable, "-m", "pytest", "--collect-only", "-q", f"--rootdir={rootdir}"] + files,
+        capture_output=True,
+        text=True
+    )
+    return [os.path.join(rootdir, line.strip()) for line in result.stdout.splitlines() if "::" in line]
+
+
+def collect_behave_scenarios(files: list) -> list:
+    units = []
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        units.extend(f"{path}:{scenario['line']}" for _, scenario in iter_scenarios(text))
+    return units
+
+
+def expand_units(framework: str, files: list, workers: int, python: str = None, catalog: dict = None) -> list:
+    """Test files are the unit of work; with fewer files than workers, split into tests or scenarios.
+
+    Behave scenarios come from the discovery catalog when given; pytest ids are always
+    collected by pytest itself, since fixtures and parametrisation decide them.
+    """
+    if len(files) >= workers:
+        return list(files)
+    if framework == "Pytest":
+        units = collect_pytest_ids(files, python)
+    elif framework == "Behave" and catalog:
+        units = [test["id"] for path in files for test in catalog.get(path, [])]
+    elif framework == "Behave":
+        units = collect_behave_scenarios(files)
+    else:
+        units = []
+    return units or list(files)
+
+
+def _unit_parts(unit: str):
+    """Splits a unit into (file, test name or None, is_scenario)."""
+    if "::" in unit:
+        path, *names = unit.split("::")
+        return path, names[-1], False
+    path, _, line = unit.rpartition(":")
+    if path and line.isdigit():
+        return path, None, True
+    return unit, None, False
+
+
+def estimate_units(units: list, case_stats: list) -> dict:
+    """Maps each unit to (estimated_seconds, last_failed_run) from historical per-test stats.
+
+    Tests are tied to files by module name: pytest and Behave both put the file's
+    dotted path (without extension) into the JUnit classname. Scenario units share
+    their feature file's time evenly. Units without history get the median.
+    """
+    by_module = {}
+    for case in case_stats:
+        for part in case["suite"].split("."):
+            by_module.setdefault(part, []).append(case)
+
+    scenarios_per_file = {}
+    for unit in units:
+        path, _, is_scenario = _unit_parts(unit)
+        if is_scenario:
+            scenarios_per_file[path] = scenarios_per_file.get(path, 0) + 1
+
+    estimates = {}
+    for unit in units:
+        path, test_name, is_scenario = _unit_parts(unit)
+        module = os.path.splitext(os.path.basename(path))[0]
+        matches = [c for c in by_module.get(module, []) if test_name is None or c["name"] == test_name]
+        if not matches:
+            estimates[unit] = (None, 0)
+            continue
+        seconds = sum(c["avg_seconds"] or 0 for c in matches)
+        if is_scenario:
+            seconds /= scenarios_per_file[path]
+        estimates[unit] = (seconds, max(c["last_failed_run"] or 0 for c in matches))
+
+    known = sorted(seconds for seconds, _ in estimates.values() if seconds is not None)
+    default = known[len(known) // 2] if known else 1.0
+    return {unit: (default if seconds is None else seconds, failed) for unit, (seconds, failed) in estimates.items()}
+
+
+def plan_shards(units: list, workers: int, estimates: dict = None) -> list:
+    """Longest-processing-time-first bin packing; returns [(units, estimated_seconds)] per worker.
+
+    Each unit goes to the currently least-loaded worker, longest first. Within a
+    worker, tests that failed most recently run first so regressions show up early.
+    """
+    estimates = estimates or {}
+    count = min(workers, len(units))
+    if count == 0:
+        return []
+    loads = [(0.0, i) for i in range(count)]
+    shards = [[] for _ in range(count)]
+    for unit in sorted(units, key=lambda u: estimates.get(u, (1.0, 0))[0], reverse=True):
+        load, index = heapq.heappop(loads)
+        shards[index].append(unit)
+        heapq.heappush(loads, (load + estimates.get(unit, (1.0, 0))[0], index))
+
+    planned = []
+    for shard in shards:
+        shard.sort(key=lambda u: -estimates.get(u, (1.0, 0))[1])
+        planned.append((shard, sum(estimates.get(u, (1.0, 0))[0] for u in shard)))
+    return planned
+
+
+# =========================
+# EXECUTION
+# =========================
+def run_shards(commands: list, on_progress=None, envs: list = None, spool_paths: list = None,
+               max_parallel: int = None) -> list:
+    """Runs the commands, at most max_parallel at once (default: all); on_progress(runs) is called from this thread."""
+    envs = envs or [None] * len(commands)
+    spool_paths = spool_paths or [None] * len(commands)
+    runs = [
+        LogStreamer(cmd, spool_path, env, index=i + 1)
+        for i, (cmd, env, spool_path) in enumerate(zip(commands, envs, spool_paths))
+    ]
+    wait_for(runs, on_progress, max_parallel=max_parallel)
+    return runs
+
+
+def worker_tails(runs: list, max_lines: int = 400) -> str:
+    """The last lines of every worker, so one chatty worker cannot hide the others."""
+    per_worker = max(5, max_lines // max(1, len(runs)))
+    lines = []
+    for run in runs:
+        lines.extend(f"[w{run.index}] {line}" for line in run.tail(per_worker).splitlines(keepends=True))
+    return "".join(lines)
+
+
+# =========================
+# MERGED REPORT
+# =========================
+def merge_html_reports(runs: list, worker_reports: list, merged_path: str, totals: dict):
+    """Writes one self-contained HTML page with the combined totals and every worker's report inlined.
+
+    Worker reports are self-contained too, so each goes into an iframe's srcdoc and
+    the merged file still renders after it is downloaded on its own.
+    """
+    rows = []
+    frames = []
+    for run, report in zip(runs, worker_reports):
+        status = "passed" if run.returncode == 0 else f"exit code {run.returncode}"
+        content = None
+        if os.path.exists(report):
+            with open(report, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        link = f'<a href="#worker-{run.index}">report</a>' if content else "no report"
+        rows.append(
+            f"<tr><td>Worker {run.index}</td><td>{html.escape(status)}</td>"
+            f"<td>{run.duration:.1f}s</td><td>{link}</td></tr>"
+        )
+        if content:
+            frames.append(
+                f'<h2 id="worker-{run.index}">Worker {run.index}</h2>'
+                f'<iframe srcdoc="{html.escape(content, quote=True)}"></iframe>'
+            )
+
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Parallel test report</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+table {{ border-collapse: collapse; margin-bottom: 24px; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 12px; }}
+iframe {{ width: 100%; height: 70vh; border: 1px solid #ccc; }}
+</style></head><body>
+<h1>Parallel test report</h1>
+<p>Total: {totals['total']} &middot; Passed: {totals['passed']} &middot; Failed: {totals['failed']}
+&middot; Workers: {len(runs)} &middot; Wall time: {totals['wall_seconds']:.1f}s</p>
+<table><tr><th>Worker</th><th>Status</th><th>Duration</th><th>Report</th></tr>
+{''.join(rows)}
+</table>
+{''.join(frames)}
+</body></html>
+"""
+    with open(merged_path, "w", encoding="utf-8") as f:
+        f.write(page)
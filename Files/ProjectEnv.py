@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from ScaffoldCache import pip_install
+
+STATE_DIR = ".aiqa"
+STATE_FILE = "environment.json"
+VENV_DIR = "venv"
+USE_VENV_DEFAULT = os.getenv("SCRIPT_RUNNER_USE_VENV", "false").lower() == "true"
+
+
+# =========================
+# PER-PROJECT STATE
+# =========================
+def state_path(project_path: str) -> str:
+    return os.path.join(project_path, STATE_DIR, STATE_FILE)
+
+
+def load_state(project_path: str) -> dict:
+    try:
+        with open(state_path(project_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"use_venv": USE_VENV_DEFAULT}
+
+
+def save_state(project_path: str, state: dict):
+    path = state_path(project_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, path)
+
+
+# =========================
+# INTERPRETER
+# =========================
+def venv_python(project_path: str) -> str:
+    venv = os.path.join(project_path, STATE_DIR, VENV_DIR)
+    if os.name == "nt":
+        return os.path.join(venv, "Scripts", "python.exe")
+    return os.path.join(venv, "bin", "python")
+
+
+def ensure_venv(project_path: str) -> str:
+    """Creates the project's virtualenv the first time and returns its interpreter."""
+    python = venv_python(project_path)
+    if not os.path.exists(python):
+        subprocess.run([sys.executable, "-m", "venv", os.path.dirname(os.path.dirname(python))],
+                       check=True, capture_output=True, text=True)
+    return python
+
+
+def project_python(project_path: str, use_venv: bool) -> str:
+    return ensure_venv(project_path) if use_venv else sys.executable
+
+
+# =========================
+# DEPENDENCY FINGERPRINT
+# =========================
+def dependency_fingerprint(req_file: str, python: str) -> str:
+    # The resolved interpreter's mtime changes when the venv is recreated or the base Python upgraded
+    real_python = os.path.realpath(python)
+    digest = hashlib.sha256()
+    with open(req_file, "rb") as f:
+        digest.update(f.read())
+    digest.update(f"\0{os.path.abspath(python)}\0{real_python}\0{os.path.getmtime(real_python)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def install_requirements_if_changed(project_path: str, use_venv: bool, force: bool = False):
+    """Returns (status, python, log); status is missing, up_to_date, installed or failed."""
+    try:
+        python = project_python(project_path, use_venv)
+    except subprocess.CalledProcessError as e:
+        return "failed", sys.executable, f"Could not create virtualenv:\n{e.stdout}{e.stderr}"
+    req_file = os.path.join(project_path, "requirements.txt")
+    if not os.path.exists(req_file):
+        return "missing", python, ""
+
+    state = load_state(project_path)
+    fingerprint = dependency_fingerprint(req_file, python)
+    if not force and state.get("fingerprint") == fingerprint:
+        return "up_to_date", python, ""
+
+    try:
+        result = pip_install(["-r", req_file], python=python)
+    except subprocess.CalledProcessError as e:
+        return "failed", python, (e.stdout or "") + (e.stderr or "")
+
+    state.update(fingerprint=fingerprint, python=python, installed_at=time.strftime("%Y-%m-%d %H:%M:%S"))
+    save_state(project_path, state)
+    return "installed", python, result.stdout + result.stderr
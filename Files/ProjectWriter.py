@@ -0,0 +1,112 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+PARALLEL_THRESHOLD = 16
+MAX_WORKERS = 8
+# mkstemp creates 0600 files; new project files get the usual rw-r--r-- instead
+NEW_FILE_MODE = 0o644
+
+
+def _encode(content: str) -> bytes:
+    # Same bytes that open(path, "w") used to produce, so unchanged files really compare equal
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode("utf-8")
+
+
+def _same_content(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def atomic_write(path: str, data: bytes, durable: bool = False):
+    """Writes to a temp file in the same folder and renames it over `path`."""
+    folder = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_one(root: str, rel_path: str, content, durable: bool):
+    full_path = os.path.join(root, rel_path)
+    if content is None:
+        return "failed", full_path, "no content"
+    data = _encode(content if isinstance(content, str) else str(content))
+    existed = os.path.exists(full_path)
+    if existed and _same_content(full_path, data):
+        return "unchanged", full_path, ""
+    try:
+        atomic_write(full_path, data, durable)
+    except OSError as e:
+        return "failed", full_path, str(e)
+    return ("updated" if existed else "created"), full_path, ""
+
+
+# =========================
+# PROJECT WRITE
+# =========================
+def write_project_files(base_folder: str, files: dict, durable: bool = False) -> dict:
+    """Writes {relative_path: content} under base_folder, skipping files whose content is unchanged.
+
+    Returns a manifest with full paths under created / updated / unchanged and
+    "path: reason" entries under failed.
+    """
+    manifest = {"created": [], "updated": [], "unchanged": [], "failed": []}
+    root = os.path.abspath(base_folder)
+
+    entries = []
+    for rel_path, content in files.items():
+        full_path = os.path.abspath(os.path.join(root, rel_path))
+        if os.path.commonpath([root, full_path]) != root or full_path == root:
+            manifest["failed"].append(f"{rel_path}: path is outside {base_folder}")
+            continue
+        entries.append((os.path.relpath(full_path, root), content))
+
+    # One makedirs per distinct folder instead of one per file
+    bad_folders = {}
+    for folder in sorted({os.path.dirname(os.path.join(root, rel_path)) for rel_path, _ in entries}):
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            bad_folders[folder] = str(e)
+    if bad_folders:
+        kept = []
+        for rel_path, content in entries:
+            folder = os.path.dirname(os.path.join(root, rel_path))
+            if folder in bad_folders:
+                manifest["failed"].append(f"{os.path.join(root, rel_path)}: {bad_folders[folder]}")
+            else:
+                kept.append((rel_path, content))
+        entries = kept
+
+    if len(entries) >= PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            results = list(pool.map(lambda entry: _write_one(root, *entry, durable), entries))
+    else:
+        results = [_write_one(root, rel_path, content, durable) for rel_path, content in entries]
+
+    for status, full_path, error in results:
+        manifest[status].append(f"{full_path}: {error}" if status == "failed" else full_path)
+    return manifest
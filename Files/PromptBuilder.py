@@ -0,0 +1,163 @@
+import difflib
+import re
+from functools import lru_cache
+
+import tiktoken
+
+from GherkinParser import parse_features
+
+LOCATOR_HEADER = "Element Locators:"
+LOCATOR_LINE = re.compile(r"^(?P<name>.+?)\s*(?:\(Type:\s*(?P<type>[^)]*)\))?:\s*(?P<value>.+?),?$")
+WORD_SPLIT = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+STOP_WORDS = {"the", "a", "an", "on", "in", "to", "of", "and", "or", "is", "i", "field", "element", "xpath"}
+MATCH_THRESHOLD = 0.5
+# Matched locators sent even when the BDD alone fills the budget; without them the model invents selectors
+MIN_MATCHED_LOCATORS = 5
+
+
+# =========================
+# TOKEN COUNTING
+# =========================
+@lru_cache(maxsize=8)
+def get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    return len(get_encoding(model).encode(text or ""))
+
+
+# =========================
+# SUPPORT CONTENT PARSING
+# =========================
+def parse_support_content(support_content: str):
+    """Splits support content into plain lines (URL, credentials) and locator entries."""
+    fields = []
+    locators = []
+    in_locators = False
+    for line in (support_content or "").splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped == LOCATOR_HEADER:
+            in_locators = True
+            continue
+        if not in_locators:
+            fields.append(stripped.rstrip(","))
+            continue
+        match = LOCATOR_LINE.match(stripped)
+        if match:
+            locators.append({
+                "name": match.group("name").strip(),
+                "type": (match.group("type") or "").strip(),
+                "value": match.group("value").strip(),
+            })
+    return fields, locators
+
+
+def dedupe_locators(locators: list) -> list:
+    seen_names = set()
+    seen_values = set()
+    unique = []
+    for locator in locators:
+        name_key = locator["name"].lower()
+        value_key = (locator["type"].lower(), locator["value"])
+        if name_key in seen_names or value_key in seen_values:
+            continue
+        seen_names.add(name_key)
+        seen_values.add(value_key)
+        unique.append(locator)
+    return unique
+
+
+# =========================
+# FUZZY STEP <-> ELEMENT MATCHING
+# =========================
+def words(text: str) -> list:
+    return [w.lower() for w in WORD_SPLIT.findall(text) if w.lower() not in STOP_WORDS]
+
+
+def bdd_words(bdd_content: str) -> set:
+    step_text = []
+    for feature in parse_features(bdd_content):
+        step_text.extend(feature["background"])
+        for scenario in feature["scenarios"]:
+            step_text.extend(scenario["lines"])
+    return set(words(" ".join(step_text) if step_text else bdd_content))
+
+
+def locator_score(locator: dict, vocabulary: set) -> float:
+    name_words = words(locator["name"])
+    if not name_words:
+        return 0.0
+    matched = sum(
+        1 for word in name_words
+        if word in vocabulary or difflib.get_close_matches(word, vocabulary, n=1, cutoff=0.8)
+    )
+    return matched / len(name_words)
+
+
+def format_locator(locator: dict) -> str:
+    if locator["type"]:
+        return f"{locator['name']} (Type: {locator['type']}): {locator['value']}"
+    return f"{locator['name']}: {locator['value']}"
+
+
+def format_support_content(fields: list, locators: list) -> str:
+    content = ",\n".join(fields) + "\n" if fields else ""
+    if locators:
+        content += f"\n{LOCATOR_HEADER}\n" + ",\n".join(format_locator(l) for l in locators) + "\n"
+    return content
+
+
+# =========================
+# BUDGETED SUPPORT CONTENT
+# =========================
+def build_support_content(support_content: str, bdd_content: str, budget_tokens: int, model: str = "gpt-4"):
+    """Dedupes locators, keeps those the BDD steps refer to and trims to `budget_tokens`."""
+    fields, locators = parse_support_content(support_content)
+    unique = dedupe_locators(locators)
+    vocabulary = bdd_words(bdd_content)
+    scored = sorted(((locator_score(l, vocabulary), i, l) for i, l in enumerate(unique)), key=lambda x: (-x[0], x[1]))
+
+    selected = [item for item in scored if item[0] >= MATCH_THRESHOLD]
+    # Nothing matched: the step wording is too vague to filter on, so fall back to every locator
+    fallback_to_all = bool(unique) and not selected
+    if fallback_to_all:
+        selected = scored
+
+    # Count each formatted locator once and keep the strongest matches while their running sum fits
+    floor = 0 if fallback_to_all else MIN_MATCHED_LOCATORS
+    remaining = budget_tokens - count_tokens(format_support_content(fields, []), model) \
+        - count_tokens(f"\n{LOCATOR_HEADER}\n", model)
+    kept = []
+    for item in selected:
+        cost = count_tokens(format_locator(item[2]) + ",\n", model)
+        if cost > remaining and len(kept) >= floor:
+            break
+        kept.append(item)
+        remaining -= cost
+    kept.sort(key=lambda x: x[1])
+    compact = format_support_content(fields, [l for _, _, l in kept])
+    dropped = len(selected) - len(kept)
+
+    report = {
+        "budget_tokens": budget_tokens,
+        "support_tokens_before": count_tokens(support_content or "", model),
+        "support_tokens_after": count_tokens(compact, model),
+        "locators_received": len(locators),
+        "locators_after_dedupe": len(unique),
+        "locators_matched": 0 if fallback_to_all else len(selected),
+        "locators_sent": len(kept),
+        "fallback_to_all_locators": fallback_to_all,
+        "locators_dropped_for_budget": dropped,
+    }
+    if dropped:
+        report["warning"] = (
+            f"{dropped} of {len(selected)} {'' if fallback_to_all else 'matched '}locators were left out "
+            f"to fit the {budget_tokens}-token support budget."
+        )
+    return compact, report
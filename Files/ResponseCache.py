@@ -0,0 +1,170 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(language: str, framework: str, model: str, temperature: float, prompt: str) -> str:
+    payload = json.dumps(
+        [language.strip().lower(), framework.strip().lower(), model, temperature, prompt],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =========================
+# TWO-TIER LLM RESPONSE CACHE
+# =========================
+class ResponseCache:
+    """Memory tier in front of an on-disk tier, both evicted by total size in bytes."""
+
+    def __init__(self, cache_dir: str = ".llm_cache", memory_max_bytes: int = 32 * 1024 * 1024,
+                 disk_max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = self._scan_disk_bytes()
+
+    # ---------- lookups ----------
+    def get(self, key: str):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, value)
+        return value
+
+    def set(self, key: str, value: str):
+        """Blocks on disk I/O and may walk the cache to evict; async callers run it in a thread."""
+        with self._lock:
+            self._put_memory(key, value)
+        try:
+            self._write_disk(key, value)
+        except OSError as e:
+            # The answer is already paid for and in memory; a full or read-only disk must not fail the task
+            with self._lock:
+                self.disk_errors += 1
+            logger.warning("Response cache write failed for %s: %s", key[:12], e)
+
+    # ---------- memory tier ----------
+    def _put_memory(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key).encode("utf-8"))
+        self._memory[key] = value
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.encode("utf-8"))
+
+    # ---------- disk tier ----------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _read_disk(self, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, value: str):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += os.path.getsize(path) - old_size
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _list_disk(self):
+        entries = []
+        for root, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if name.endswith(".txt"):
+                    full_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, full_path))
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._list_disk())
+
+    def _evict_disk(self):
+        # Least recently used first; reads touch the mtime
+        entries = sorted(self._list_disk())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        for _, size, full_path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(full_path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes or 0,
+                "disk_errors": self.disk_errors,
+            }
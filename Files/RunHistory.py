@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_FILE = os.getenv("LOCAL_DB_NAME", "local_database") + ".db"
+DEFAULT_WINDOW_RUNS = 30
+
+FAILED_STATUSES = ("failed", "error")
+# Restricts per-test queries to the last N runs of a project: params (project_name, last_runs)
+WINDOW_FILTER = "run_id IN (SELECT run_id FROM TestRuns WHERE project_name = ? ORDER BY run_id DESC LIMIT ?)"
+
+
+class RunHistory:
+    """Persistent store of Script Runner runs and per-test outcomes in the app's SQLite DB.
+
+    TestRuns keeps one row per run with its counts denormalised, so trends never
+    touch TestResults. Per-test analytics only scan the results of the last N runs
+    through the (case_id, run_id) / (run_id) indexes.
+    """
+
+    def __init__(self, db_path: str = DB_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # Journal mode is left alone: it persists in the file and the DB is shared with the rest of the app
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS TestRuns (
+                run_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name  TEXT,
+                framework     TEXT,
+                target        TEXT,
+                workers       INTEGER,
+                started_at    TEXT,
+                wall_seconds  REAL,
+                total         INTEGER,
+                passed        INTEGER,
+                failed        INTEGER,
+                skipped       INTEGER,
+                results_dir   TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS TestCases (
+                case_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name  TEXT,
+                suite         TEXT,
+                name          TEXT,
+                file          TEXT,
+                UNIQUE (project_name, suite, name)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS TestResults (
+                run_id    INTEGER,
+                case_id   INTEGER,
+                status    TEXT,
+                duration  REAL,
+                message   TEXT,
+                PRIMARY KEY (run_id, case_id)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_project ON TestRuns (project_name, run_id)")
+        # Covers the per-test aggregates without reading the message column
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_case ON TestResults (case_id, run_id, status, duration)"
+        )
+
+    # =========================
+    # WRITE
+    # =========================
+    def record_run(self, project_name: str, framework: str, target: str, cases: list, meta: dict = None) -> int:
+        meta = meta or {}
+        counts = {"passed": 0, "failed": 0, "skipped": 0}
+        for case in cases:
+            key = "failed" if case["status"] in FAILED_STATUSES else case["status"]
+            counts[key] = counts.get(key, 0) + 1
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                run_id = self._conn.execute(
+                    "INSERT INTO TestRuns (project_name, framework, target, workers, started_at, wall_seconds, "
+                    "total, passed, failed, skipped, results_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (project_name, framework, target, meta.get("workers", 1),
+                     meta.get("started") or time.strftime("%Y-%m-%dT%H:%M:%S"), meta.get("wall_seconds"),
+                     len(cases), counts["passed"], counts["failed"], counts["skipped"], meta.get("results_dir"))
+                ).lastrowid
+
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO TestCases (project_name, suite, name, file) VALUES (?, ?, ?, ?)",
+                    [(project_name, c["classname"], c["name"], c.get("file", "")) for c in cases]
+                )
+                case_ids = self._case_ids(project_name, cases)
+                # INSERT OR REPLACE: a test id reported twice in one run keeps its last outcome
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO TestResults (run_id, case_id, status, duration, message) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (run_id, case_ids[(c["classname"], c["name"])], c["status"], c.get("duration", 0),
+                         c.get("message") or None)
+                        for c in cases
+                    ]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return run_id
+
+    def _case_ids(self, project_name: str, cases: list) -> dict:
+        wanted = {(c["classname"], c["name"]) for c in cases}
+        ids = {}
+        rows = self._conn.execute(
+            "SELECT case_id, suite, name FROM TestCases WHERE project_name = ?", (project_name,)
+        )
+        for row in rows:
+            key = (row["suite"], row["name"])
+            if key in wanted:
+                ids[key] = row["case_id"]
+        return ids
+
+    # =========================
+    # READ
+    # =========================
+    def _query(self, sql: str, params: tuple) -> list:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def projects(self) -> list:
+        return [row["project_name"] for row in self._query(
+            "SELECT DISTINCT project_name FROM TestRuns ORDER BY project_name", ()
+        )]
+
+    def recent_runs(self, project_name: str, limit: int = 50) -> list:
+        """Newest first; pass_rate is over the tests that ran (skips excluded)."""
+        return self._query(
+            """
+            SELECT run_id, started_at, target, framework, workers, wall_seconds, total, passed, failed, skipped,
+                   ROUND(100.0 * passed / NULLIF(passed + failed, 0), 1) AS pass_rate
+            FROM TestRuns
+            WHERE project_name = ?
+            ORDER BY run_id DESC
+            LIMIT ?
+            """,
+            (project_name, limit)
+        )
+
+    def slowest_tests(self, project_name: str, last_runs: int = DEFAULT_WINDOW_RUNS, limit: int = 20) -> list:
+        return self._query(
+            f"""
+            SELECT c.suite, c.name, COUNT(*) AS runs,
+                   ROUND(AVG(r.duration), 3) AS avg_seconds, ROUND(MAX(r.duration), 3) AS max_seconds
+            FROM TestResults r
+            JOIN TestCases c ON c.case_id = r.case_id
+            WHERE r.{WINDOW_FILTER} AND r.status != 'skipped'
+            GROUP BY r.case_id
+            ORDER BY avg_seconds DESC
+            LIMIT ?
+            """,
+            (project_name, last_runs, limit)
+        )
+
+    def flaky_tests(self, project_name: str, last_runs: int = DEFAULT_WINDOW_RUNS, limit: int = 20) -> list:
+        """Tests that both passed and failed in the window, ranked by how often their outcome flipped."""
+        return self._query(
+            f"""
+            WITH outcomes AS (
+                SELECT case_id, run_id,
+                       CASE WHEN status IN ('failed', 'error') THEN 1 ELSE 0 END AS failed
+                FROM TestResults
+                WHERE {WINDOW_FILTER} AND status != 'skipped'
+            ),
+            flips AS (
+                SELECT case_id, failed,
+                       failed != LAG(failed) OVER (PARTITION BY case_id ORDER BY run_id) AS flipped
+                FROM outcomes
+            )
+            SELECT c.suite, c.name, COUNT(*) AS runs, SUM(f.failed) AS failures,
+                   SUM(COALESCE(f.flipped, 0)) AS flips,
+                   ROUND(100.0 * SUM(f.failed) / COUNT(*), 1) AS fail_rate
+            FROM flips f
+            JOIN TestCases c ON c.case_id = f.case_id
+            GROUP BY f.case_id
+            HAVING SUM(f.failed) > 0 AND SUM(f.failed) < COUNT(*)
+            ORDER BY flips DESC, fail_rate DESC
+            LIMIT ?
+            """,
+            (project_name, last_runs, limit)
+        )
+
+    def failing_tests(self, project_name: str, last_runs: int = DEFAULT_WINDOW_RUNS, limit: int = 20) -> list:
+        return self._query(
+            f"""
+            SELECT c.suite, c.name, COUNT(*) AS failures, MAX(r.run_id) AS last_failed_run
+            FROM TestResults r
+            JOIN TestCases c ON c.case_id = r.case_id
+            WHERE r.{WINDOW_FILTER} AND r.status IN ('failed', 'error')
+            GROUP BY r.case_id
+            ORDER BY failures DESC, last_failed_run DESC
+            LIMIT ?
+            """,
+            (project_name, last_runs, limit)
+        )
+
+    def case_stats(self, project_name: str, last_runs: int = DEFAULT_WINDOW_RUNS) -> list:
+        """Average duration and last failing run per test, for scheduling the next run."""
+        return self._query(
+            f"""
+            SELECT c.suite, c.name, c.file, AVG(r.duration) AS avg_seconds,
+                   MAX(CASE WHEN r.status IN ('failed', 'error') THEN r.run_id END) AS last_failed_run
+            FROM TestResults r
+            JOIN TestCases c ON c.case_id = r.case_id
+            WHERE r.{WINDOW_FILTER} AND r.status != 'skipped'
+            GROUP BY r.case_id
+            """,
+            (project_name, last_runs)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_history = None
+
+
+def get_history() -> RunHistory:
+    global _history
+    if _history is None:
+        _history = RunHistory()
+    return _history
@@ -0,0 +1,70 @@
+import pandas as pd
+import streamlit as st
+
+from RunHistory import DEFAULT_WINDOW_RUNS, get_history
+
+
+# -------------------------
+# MAIN APP
+# -------------------------
+
+def run_app():
+
+    st.title("Run History")
+
+    history = get_history()
+    projects = history.projects()
+
+    if not projects:
+        st.info("No runs recorded yet. Results are stored here each time Script Runner finishes a run.")
+        return
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        project_name = st.selectbox("Select Project", projects)
+    with c2:
+        window = st.number_input(
+            "Last N runs", min_value=2, max_value=500, value=DEFAULT_WINDOW_RUNS,
+            help="Slowest, failing and flaky tests are computed over this many of the latest runs."
+        )
+
+    runs = history.recent_runs(project_name, limit=window)
+
+    # -------------------------
+    # TRENDS
+    # -------------------------
+
+    st.markdown("### Pass Rate Trend")
+
+    trend = pd.DataFrame(list(reversed(runs))).set_index("run_id")
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Runs", len(runs))
+    m2.metric("Latest pass rate", f"{runs[0]['pass_rate'] or 0}%")
+    m3.metric("Latest duration", f"{runs[0]['wall_seconds'] or 0:.0f}s")
+
+    st.line_chart(trend[["pass_rate"]])
+    st.bar_chart(trend[["passed", "failed", "skipped"]])
+
+    # -------------------------
+    # TESTS
+    # -------------------------
+
+    st.markdown("### Flaky Tests")
+    flaky = history.flaky_tests(project_name, last_runs=window)
+    if flaky:
+        st.dataframe(flaky, use_container_width=True)
+    else:
+        st.caption("No test both passed and failed in this window.")
+
+    st.markdown("### Most Failing Tests")
+    failing = history.failing_tests(project_name, last_runs=window)
+    if failing:
+        st.dataframe(failing, use_container_width=True)
+    else:
+        st.caption("No failures in this window.")
+
+    st.markdown("### Slowest Tests")
+    st.dataframe(history.slowest_tests(project_name, last_runs=window), use_container_width=True)
+
+    st.markdown("### Runs")
+    st.dataframe(runs, use_container_width=True)
@@ -0,0 +1,134 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+CACHE_ROOT = os.path.abspath(os.path.expanduser(os.getenv("AIQA_CACHE_DIR", "~/.aiqa_cache")))
+SKELETON_DIR = os.path.join(CACHE_ROOT, "skeletons")
+WHEELHOUSE_DIR = os.path.join(CACHE_ROOT, "pip-wheels")
+SKELETON_MAX_AGE_DAYS = float(os.getenv("AIQA_SKELETON_MAX_AGE_DAYS", "30"))
+
+COMPLETE_MARKER = ".aiqa-skeleton-complete"
+# Dependency trees are never edited by hand, so they can share inodes with the cache
+HARDLINK_DIRS = ("node_modules",)
+
+
+def run(cmd: list, cwd: str = None, check: bool = True):
+    # .cmd shims (npm, npx, mvn) only resolve through the shell on Windows
+    return subprocess.run(cmd, cwd=cwd, check=check, shell=os.name == "nt", capture_output=True, text=True)
+
+
+# =========================
+# PROJECT SKELETONS
+# =========================
+def skeleton_path(key: str) -> str:
+    return os.path.join(SKELETON_DIR, key)
+
+
+def skeleton_is_fresh(path: str) -> bool:
+    marker = os.path.join(path, COMPLETE_MARKER)
+    if not os.path.exists(marker):
+        return False
+    return time.time() - os.path.getmtime(marker) < SKELETON_MAX_AGE_DAYS * 86400
+
+
+def ensure_skeleton(key: str, build) -> str:
+    """Returns the cached skeleton for `key`, building it with build(folder) when missing or stale."""
+    path = skeleton_path(key)
+    if skeleton_is_fresh(path):
+        return path
+
+    os.makedirs(SKELETON_DIR, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=SKELETON_DIR)
+    try:
+        build(build_dir)
+        open(os.path.join(build_dir, COMPLETE_MARKER), "w").close()
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(build_dir, path)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    return path
+
+
+def _link_or_copy(src: str, dst: str, hardlink: bool):
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            # Different drive, or a filesystem without hardlinks
+            pass
+    shutil.copy2(src, dst)
+
+
+def stamp_out(skeleton: str, project_dir: str) -> int:
+    """Copies a skeleton into project_dir without overwriting existing files; returns files placed."""
+    placed = 0
+    for root, dirs, files in os.walk(skeleton):
+        rel_root = os.path.relpath(root, skeleton)
+        parts = rel_root.split(os.sep)
+        hardlink = any(part in HARDLINK_DIRS for part in parts)
+        target_root = os.path.normpath(os.path.join(project_dir, rel_root))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            if rel_root == "." and name == COMPLETE_MARKER:
+                continue
+            target = os.path.join(target_root, name)
+            if os.path.lexists(target):
+                continue
+            src = os.path.join(root, name)
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), target)
+            else:
+                _link_or_copy(src, target, hardlink)
+            placed += 1
+    return placed
+
+
+def playwright_skeleton(lang: str) -> str:
+    def build(folder):
+        run(["npx", "--yes", "create-playwright@latest", ".", "--", f"--lang={lang}", "--quiet"], cwd=folder)
+    return ensure_skeleton(f"playwright_{lang}", build)
+
+
+def stamp_playwright_project(project_dir: str, lang: str) -> int:
+    return stamp_out(playwright_skeleton(lang), project_dir)
+
+
+# =========================
+# SHARED DEPENDENCY CACHES
+# =========================
+# npm (~/.npm), Maven (~/.m2) and Playwright browsers already default to one per-user
+# cache, so their installs only prefer it over the network; moving those caches would
+# make later test runs miss them. pip gets a wheelhouse so installs can run with --no-index.
+def pip_install(args: list, refresh: bool = False, python: str = None):
+    """Installs from the shared wheelhouse, downloading into it only for what is missing.
+
+    `args` are pip requirement arguments, e.g. ["selenium", "pytest"] or ["-r", "requirements.txt"].
+    """
+    python = python or sys.executable
+    os.makedirs(WHEELHOUSE_DIR, exist_ok=True)
+    offline = [python, "-m", "pip", "install", "--no-index", "--find-links", WHEELHOUSE_DIR] + args
+    if not refresh:
+        result = run(offline, check=False)
+        if result.returncode == 0:
+            return result
+    # pip download always resolves the newest matching versions, which is also how a refresh upgrades
+    run([python, "-m", "pip", "download", "--dest", WHEELHOUSE_DIR] + args)
+    return run(offline)
+
+
+def npm_install(project_dir: str):
+    return run(["npm", "install", "--prefer-offline", "--no-audit", "--no-fund"], cwd=project_dir)
+
+
+def maven(goals: list, project_dir: str):
+    """Runs Maven offline against the local repository, going online only when something is missing."""
+    result = run(["mvn", "-o"] + goals, cwd=project_dir, check=False)
+    if result.returncode == 0:
+        return result
+    return run(["mvn"] + goals, cwd=project_dir)
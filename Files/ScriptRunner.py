@@ -1,11 +1,20 @@
 import os
-import subprocess
 import sqlite3
 import streamlit as st
 from dotenv import load_dotenv
 from datetime import datetime
-import re
+import sys
 import webbrowser
+from ImpactIndex import ImpactIndex, changed_since_baseline, save_baseline, snapshot
+from TestDiscovery import discover
+from LogStreamer import LogStreamer
+from RunHistory import get_history
+from ProjectEnv import install_requirements_if_changed, load_state, save_state
+from ParallelRunner import estimate_units, expand_units, merge_html_reports, plan_shards, run_shards, worker_tails
+from TestResults import (
+    EVENTS_FILE, LOG_FILE, MAX_MESSAGE_CHARS, EventTail, collect_results, new_results_dir, result_args, result_env,
+    save_results, summarize
+)
 
 load_dotenv()
 
@@ -33,23 +42,21 @@ def get_projects():
 # INSTALL REQUIREMENTS
 # -------------------------
 
-def install_requirements(project_path):
-    req_file = os.path.join(project_path, "requirements.txt")
-    if os.path.exists(req_file):
-        st.info("📦 Installing requirements.txt...")
-        result = subprocess.run(
-            ["pip", "install", "-r", req_file],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            st.success("✅ Requirements installed successfully!")
-        else:
-            st.error(f"❌ Failed to install requirements:\n{result.stderr}")
-        with st.expander("📋 Installation Logs", expanded=False):
-            st.code(result.stdout + result.stderr)
-    else:
+def install_requirements(project_path, use_venv=False, force=False):
+    # Runs pip only when requirements.txt or the interpreter changed since the last install
+    status, python, log = install_requirements_if_changed(project_path, use_venv, force)
+    if status == "missing":
         st.warning(f"⚠️ No requirements.txt found at: {project_path}")
+    elif status == "up_to_date":
+        st.caption("📦 Requirements unchanged since the last install - skipped.")
+    elif status == "installed":
+        st.success("✅ Requirements installed successfully!")
+    else:
+        st.error("❌ Failed to install requirements")
+    if log:
+        with st.expander("📋 Installation Logs", expanded=status == "failed"):
+            st.code(log)
+    return python
 
 
 # -------------------------
@@ -57,106 +64,246 @@ def install_requirements(project_path):
 # -------------------------
 
 def get_test_files(project_path, framework):
-
-    if framework == "Behave":
-        tests_dir = os.path.join(project_path, "features")
-    else:
-        tests_dir = os.path.join(project_path, "tests")
-
-    if not os.path.exists(tests_dir):
-        return []
-
-    files = []
-
-    for root, dirs, filenames in os.walk(tests_dir):
-
-        for f in filenames:
-
-            if framework == "Pytest":
-
-                if f.startswith("test_") and f.endswith(".py"):
-                    files.append(os.path.join(root, f))
-
-            elif framework == "Behave":
-
-                if f.endswith(".feature"):
-                    files.append(os.path.join(root, f))
-
-            else:
-
-                if f.endswith(".py") and f != "__init__.py":
-                    files.append(os.path.join(root, f))
-
-    return files
+    # Served from the per-project discovery index; only changed folders and files are re-read
+    return list(discover(project_path, framework))
 
 
 # -------------------------
 # COMMAND BUILDER
 # -------------------------
 
-def build_test_command(framework, path, report_file=None):
+def build_test_command(framework, path, report_file=None, python=None, results_dir=None):
+    # Run through the project's interpreter so a per-project venv is honoured
+    python = python or sys.executable
+    # A parallel worker gets its shard as a list of files / test ids
+    paths = path if isinstance(path, list) else [path]
 
     if framework == "Pytest":
 
-        cmd = ["pytest", path, "-v"]
+        cmd = [python, "-m", "pytest"] + paths + ["-v"]
 
         if report_file:
             cmd += ["--html", report_file, "--self-contained-html"]
 
+        if results_dir:
+            cmd += result_args(framework, results_dir)
+
         return cmd
 
     elif framework == "Behave":
 
-        cmd = ["behave", path]
+        cmd = [python, "-m", "behave"] + paths
 
         if report_file:
             cmd += ["-f", "html", "-o", report_file]
 
+        if results_dir:
+            cmd += result_args(framework, results_dir)
+
         return cmd
 
     else:
 
-        return ["python", path]
+        return [python] + paths
 
 
 # -------------------------
-# METRICS PARSER
+# RESULTS
 # -------------------------
 
-def parse_results(output):
+def script_case(path, returncode, duration, output):
+    # Plain scripts have no report format; the exit code is the result
+    return {
+        "name": os.path.basename(path),
+        "classname": os.path.splitext(os.path.basename(path))[0],
+        "file": path,
+        "status": "passed" if returncode == 0 else "failed",
+        "duration": round(duration, 3),
+        "message": output[-MAX_MESSAGE_CHARS:] if returncode else ""
+    }
+
+
+def record_results(results_dir, cases, meta):
+    # results.json stays next to the raw reports; the DB row feeds the Run History page
+    save_results(results_dir, cases, meta)
+    get_history().record_run(
+        meta["project"], meta["framework"], meta["target"], cases, dict(meta, results_dir=results_dir)
+    )
+
 
-    passed = len(re.findall(r"PASSED", output))
-    failed = len(re.findall(r"FAILED", output))
-    skipped = len(re.findall(r"SKIPPED", output))
+def show_metrics(summary, total_ph, passed_ph, failed_ph):
+    total_ph.metric("Total", summary["total"])
+    passed_ph.metric("✅ Passed", summary["passed"])
+    failed_ph.metric("❌ Failed", summary["failed"] + summary["error"])
 
-    total = passed + failed + skipped
 
-    return total, passed, failed
+def show_cases(cases):
+    if not cases:
+        st.info("No per-test results were reported.")
+        return
+
+    st.dataframe(
+        [
+            {"Test": c["name"], "Suite": c["classname"], "Status": c["status"], "Duration (s)": c["duration"]}
+            for c in cases
+        ],
+        use_container_width=True
+    )
+
+    failures = [c for c in cases if c["status"] in ("failed", "error")]
+    if failures:
+        with st.expander(f"❌ {len(failures)} failures", expanded=True):
+            for c in failures:
+                st.markdown(f"**{c['classname']}::{c['name']}**" if c["classname"] else f"**{c['name']}**")
+                st.code(c["message"] or "(no message)")
 
 
 # -------------------------
 # LIVE COMMAND RUNNER
 # -------------------------
 
-def run_live_command(cmd, log_placeholder):
+def run_live_command(cmd, log_placeholder, env=None, on_poll=None, spool_path=None):
+    # Output is read on a background thread; only the tail window is repainted, a few times a second
+    streamer = LogStreamer(cmd, spool_path, env).start()
+
+    def on_frame(stream):
+        log_placeholder.code(stream.tail(), language="bash")
+        if on_poll:
+            on_poll()
+
+    streamer.wait(on_frame)
+    return streamer
+
+
+def run_with_results(framework, path, report_file, python, results_dir, log_placeholder, cmd_placeholder, on_cases):
+    # Results come from the plugin events while running and from JUnit XML once finished
+    cmd = build_test_command(framework, path, report_file, python, results_dir)
+    cmd_placeholder.code(" ".join(cmd))
+
+    events = EventTail(os.path.join(results_dir, EVENTS_FILE))
+
+    def on_poll():
+        if events.poll():
+            on_cases(events.cases)
+
+    log_file = os.path.join(results_dir, LOG_FILE)
+    streamer = run_live_command(cmd, log_placeholder, result_env(results_dir), on_poll, log_file)
+
+    fallback = []
+    if framework not in ("Pytest", "Behave"):
+        fallback = [script_case(path, streamer.returncode, streamer.duration, streamer.tail())]
+    return collect_results(results_dir, fallback), [log_file]
+
+
+def show_log_downloads(log_files):
+    for log_file in log_files:
+        if not os.path.exists(log_file):
+            continue
+        label = os.path.basename(os.path.dirname(log_file))
+        with open(log_file, "rb") as f:
+            st.download_button(
+                f"⬇ Download full log ({label})",
+                f,
+                file_name=f"{label}.log",
+                mime="text/plain",
+                key=f"log_{log_file}"
+            )
 
-    process = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
-    )
 
-    output_lines = []
+# -------------------------
+# IMPACTED TESTS
+# -------------------------
+
+def show_impact(project_path, framework, test_files):
+    # Changes are measured against the snapshot taken when the last full or impacted run started
+    changed = changed_since_baseline(project_path)
+    if changed is None:
+        st.info("ℹ️ No previous full run recorded for this project - every test counts as impacted.")
+        return {f: ["(no baseline)"] for f in test_files}
+
+    impacted = ImpactIndex.build(project_path, framework, test_files).impacted_tests(changed)
+
+    with st.expander(f"🎯 {len(changed)} changed files → {len(impacted)} of {len(test_files)} tests impacted",
+                     expanded=bool(changed)):
+        if changed:
+            st.markdown("**Changed since the last run**")
+            st.code("\n".join(changed))
+        if impacted:
+            st.markdown("**Impacted tests**")
+            st.dataframe(
+                [
+                    {"Test": os.path.relpath(test, project_path), "Reached from": ", ".join(hits)}
+                    for test, hits in impacted.items()
+                ],
+                use_container_width=True
+            )
+    return impacted
 
-    for line in process.stdout:
-        output_lines.append(line)
-        log_placeholder.code("".join(output_lines), language="bash")
 
-    process.wait()
+# -------------------------
+# PARALLEL RUNNER
+# -------------------------
 
-    return "".join(output_lines)
+def run_parallel(framework, test_files, workers, report_file, python, log_placeholder, results_dir, on_cases=None,
+                 case_stats=None, catalog=None):
+    # Each worker is its own process, so session-scoped browser fixtures give one browser per worker
+    units = expand_units(framework, test_files, workers, python, catalog)
+    # Historical durations balance the shards; recently failed tests run first in each
+    estimates = estimate_units(units, case_stats or [])
+    plan = plan_shards(units, workers, estimates)
+    shards = [shard_units for shard_units, _ in plan]
+
+    stem, ext = os.path.splitext(report_file)
+    worker_dir = stem + "_workers"
+    os.makedirs(worker_dir, exist_ok=True)
+    worker_reports = [os.path.join(worker_dir, f"worker_{i + 1}{ext}") for i in range(len(shards))]
+
+    if framework in ("Pytest", "Behave"):
+        worker_dirs = [os.path.join(results_dir, f"worker_{i + 1}") for i in range(len(shards))]
+        commands = [
+            build_test_command(framework, units, worker_report, python, worker_dir)
+            for units, worker_report, worker_dir in zip(shards, worker_reports, worker_dirs)
+        ]
+    else:
+        # Plain scripts take one file per process; `workers` of them run at a time, longest first
+        plan = [([f], estimates[f][0]) for f in sorted(units, key=lambda u: (-estimates[u][1], -estimates[u][0]))]
+        shards = [shard_units for shard_units, _ in plan]
+        worker_dirs = [os.path.join(results_dir, f"worker_{i + 1}") for i in range(len(shards))]
+        commands = [build_test_command(framework, f, None, python) for f, in shards]
+        worker_reports = []
+    for worker_dir in worker_dirs:
+        os.makedirs(worker_dir, exist_ok=True)
+    tails = [EventTail(os.path.join(worker_dir, EVENTS_FILE)) for worker_dir in worker_dirs]
+
+    def show_progress(runs):
+        done = sum(1 for run in runs if run.returncode is not None)
+        log_placeholder.code(f"# {done}/{len(runs)} processes finished\n" + worker_tails(runs), language="bash")
+        if on_cases and any([tail.poll() for tail in tails]):
+            on_cases([case for tail in tails for case in tail.cases])
+
+    start = datetime.now()
+    log_files = [os.path.join(d, LOG_FILE) for d in worker_dirs]
+    runs = run_shards(
+        commands, on_progress=show_progress, envs=[result_env(d) for d in worker_dirs], spool_paths=log_files,
+        max_parallel=workers
+    )
+
+    cases = []
+    for run, units, worker_dir in zip(runs, shards, worker_dirs):
+        fallback = [] if worker_reports else [script_case(units[0], run.returncode, run.duration, run.tail())]
+        cases.extend(collect_results(worker_dir, fallback))
+    summary = summarize(cases)
+
+    if worker_reports:
+        totals = {
+            "total": summary["total"],
+            "passed": summary["passed"],
+            "failed": summary["failed"] + summary["error"],
+            "wall_seconds": (datetime.now() - start).total_seconds()
+        }
+        merge_html_reports(runs, worker_reports, report_file, totals)
+
+    return runs, cases, log_files, [seconds for _, seconds in plan]
 
 
 # -------------------------
@@ -169,9 +316,6 @@ def run_app():
 
     st.title("Test Execution Dashboard")
 
-    if "history" not in st.session_state:
-        st.session_state.history = []
-
     projects = get_projects()
 
     if not projects:
@@ -191,7 +335,22 @@ def run_app():
     # INSTALL REQUIREMENTS
     # -------------------------
 
-    install_requirements(project_path)
+    env_state = load_state(project_path)
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        use_venv = st.checkbox(
+            "🧪 Use an isolated virtualenv for this project",
+            value=env_state.get("use_venv", False),
+            key=f"use_venv_{selected_project_name}",
+            help="Created once under <project>/.aiqa/venv and reused on every run."
+        )
+    with c2:
+        force_install = st.button("🔄 Reinstall requirements", use_container_width=True)
+    if use_venv != env_state.get("use_venv", False):
+        env_state["use_venv"] = use_venv
+        save_state(project_path, env_state)
+
+    python = install_requirements(project_path, use_venv, force_install)
 
     st.markdown("---")
 
@@ -199,7 +358,8 @@ def run_app():
     # LOAD TEST FILES
     # -------------------------
 
-    test_files = get_test_files(project_path, project_fw)
+    catalog = discover(project_path, project_fw)
+    test_files = list(catalog)
 
     if not test_files:
         st.warning("No tests found.")
@@ -210,6 +370,19 @@ def run_app():
     selected_test_name = st.selectbox("Select Test File", list(file_map.keys()))
 
     selected_test = file_map[selected_test_name]
+
+    # Individual tests / scenarios of the selected file; none selected runs the whole file
+    cases_in_file = catalog[selected_test] if project_fw in ("Pytest", "Behave") else []
+    if cases_in_file:
+        case_labels = {f"{c['name']} (line {c['line']})": c["id"] for c in cases_in_file}
+        selected_cases = st.multiselect(
+            f"Select Test Cases ({len(cases_in_file)} in file)",
+            list(case_labels),
+            help="Leave empty to run the whole file."
+        )
+        if selected_cases:
+            selected_test = [case_labels[label] for label in selected_cases]
+            selected_test_name = f"{selected_test_name} ({len(selected_cases)} cases)"
     report_name = "report.html"
 
     if project_fw == "Pytest":
@@ -225,14 +398,37 @@ def run_app():
 
     run_mode = st.radio(
         "Select Run Mode",
-        options=["▶ Run Selected Test", "🚀 Run All Tests"],
+        options=[
+            "▶ Run Selected Test", "🚀 Run All Tests", "⚡ Run All Tests in Parallel", "🎯 Run Impacted Tests Only"
+        ],
         horizontal=True
     )
 
+    workers = 1
+    if run_mode in ("⚡ Run All Tests in Parallel", "🎯 Run Impacted Tests Only"):
+        cpu_count = os.cpu_count() or 2
+        min_workers = 2 if run_mode == "⚡ Run All Tests in Parallel" else 1
+        workers = st.slider(
+            "Workers",
+            min_value=min_workers,
+            max_value=max(2, cpu_count),
+            value=max(min_workers, min(4, cpu_count)),
+            help="Test files (or scenarios, when there are fewer files than workers) are "
+                 "sharded across this many processes, each with its own browser."
+        )
+
+    impacted = {}
+    if run_mode == "🎯 Run Impacted Tests Only":
+        impacted = show_impact(project_path, project_fw, test_files)
+
     run_button = st.button("▶ Run", use_container_width=True)
 
     run_single = run_button and run_mode == "▶ Run Selected Test"
     run_all = run_button and run_mode == "🚀 Run All Tests"
+    run_all_parallel = run_button and run_mode == "⚡ Run All Tests in Parallel"
+    run_impacted = run_button and run_mode == "🎯 Run Impacted Tests Only"
+    # Taken before the run so edits made while it runs count as changes next time
+    baseline = snapshot(project_path) if run_all or run_all_parallel or run_impacted else None
 
     # ===================================================
     # FULL WIDTH CONTAINER
@@ -255,6 +451,12 @@ def run_app():
         spinner_placeholder = st.empty()
         log_placeholder = st.empty()
 
+        cases = None
+        log_files = []
+
+        def live_metrics(partial_cases):
+            show_metrics(summarize(partial_cases), total_ph, passed_ph, failed_ph)
+
         # -------------------------
         # RUN SINGLE TEST
         # -------------------------
@@ -265,34 +467,27 @@ def run_app():
             start_time = datetime.now()
             start_time_str = start_time.strftime("%H:%M:%S")
 
-            if st.session_state.history:
-                if "history" in st.session_state:
-                    st.session_state.history = []
-
-            cmd = build_test_command(project_fw, selected_test, report_path)
-            cmd_placeholder.code(" ".join(cmd))
+            results_dir = new_results_dir(project_path, "single")
 
             with spinner_placeholder.container():
                 with st.spinner("Running test..."):
-                    output = run_live_command(cmd, log_placeholder)
+                    cases, log_files = run_with_results(
+                        project_fw, selected_test, report_path, python, results_dir,
+                        log_placeholder, cmd_placeholder, live_metrics
+                    )
 
-            total, passed, failed = parse_results(output)
-
-            total_ph.metric("Total", total)
-            passed_ph.metric("✅ Passed", passed)
-            failed_ph.metric("❌ Failed", failed)
+            summary = summarize(cases)
+            show_metrics(summary, total_ph, passed_ph, failed_ph)
 
             end_time = datetime.now()
             total_runtime = end_time - start_time
-            runtime_str = str(total_runtime).split(".")[0]
-
-            st.session_state.history.append({
-                "Project": selected_project_name,
-                "Test": selected_test_name,
-                "Total": total,
-                "Passed": passed,
-                "Failed": failed,
-                "Time": runtime_str
+
+            record_results(results_dir, cases, {
+                "project": selected_project_name,
+                "framework": project_fw,
+                "target": selected_test_name,
+                "started": start_time.isoformat(timespec="seconds"),
+                "wall_seconds": total_runtime.total_seconds()
             })
 
         # -------------------------
@@ -300,36 +495,82 @@ def run_app():
         # -------------------------
 
         if run_all:
-            if st.session_state.history:
-                if "history" in st.session_state:
-                    st.session_state.history = []
-
+            start_time = datetime.now()
             if project_fw == "Behave":
                 tests_dir = os.path.join(project_path, "features")
             else:
                 tests_dir = os.path.join(project_path, "tests")
 
-            cmd = build_test_command(project_fw, tests_dir, report_path)
-            cmd_placeholder.code(" ".join(cmd))
+            results_dir = new_results_dir(project_path, "all")
 
             with spinner_placeholder.container():
                 with st.spinner("Running full suite..."):
-                    output = run_live_command(cmd, log_placeholder)
+                    cases, log_files = run_with_results(
+                        project_fw, tests_dir, report_path, python, results_dir,
+                        log_placeholder, cmd_placeholder, live_metrics
+                    )
+
+            summary = summarize(cases)
+            show_metrics(summary, total_ph, passed_ph, failed_ph)
+
+            record_results(results_dir, cases, {
+                "project": selected_project_name,
+                "framework": project_fw,
+                "target": "ALL_TESTS",
+                "started": start_time.isoformat(timespec="seconds"),
+                "wall_seconds": (datetime.now() - start_time).total_seconds()
+            })
+            save_baseline(project_path, baseline)
 
-            total, passed, failed = parse_results(output)
+        # -------------------------
+        # RUN ALL TESTS IN PARALLEL
+        # -------------------------
 
-            total_ph.metric("Total", total)
-            passed_ph.metric("✅ Passed", passed)
-            failed_ph.metric("❌ Failed", failed)
+        if run_impacted and not impacted:
+            st.success("✅ No tests are impacted by the changes since the last run.")
+            save_baseline(project_path, baseline)
+
+        if run_all_parallel or (run_impacted and impacted):
+            start_time = datetime.now()
+            run_files = test_files if run_all_parallel else list(impacted)
+            target = "ALL_TESTS" if run_all_parallel else "IMPACTED_TESTS"
+            cmd_placeholder.code(f"{len(run_files)} test files across {workers} workers")
+            results_dir = new_results_dir(project_path, "parallel" if run_all_parallel else "impacted")
 
-            st.session_state.history.append({
-                "Project": selected_project_name,
-                "Test": "ALL_TESTS",
-                "Total": total,
-                "Passed": passed,
-                "Failed": failed,
-                "Time": datetime.now().strftime("%H:%M:%S")
+            with spinner_placeholder.container():
+                with st.spinner(f"Running {len(run_files)} test files on {workers} workers..."):
+                    runs, cases, log_files, planned_seconds = run_parallel(
+                        project_fw, run_files, workers, report_path, python, log_placeholder,
+                        results_dir, live_metrics, get_history().case_stats(selected_project_name), catalog
+                    )
+
+            summary = summarize(cases)
+            show_metrics(summary, total_ph, passed_ph, failed_ph)
+
+            with cmd_placeholder.expander(f"🧵 {len(runs)} worker commands"):
+                for run, planned in zip(runs, planned_seconds):
+                    st.code(
+                        f"[w{run.index}] {run.duration:.1f}s (planned {planned:.1f}s) exit={run.returncode}\n"
+                        + " ".join(run.cmd)
+                    )
+
+            total_runtime = datetime.now() - start_time
+
+            record_results(results_dir, cases, {
+                "project": selected_project_name,
+                "framework": project_fw,
+                "target": target,
+                "workers": len(runs),
+                "started": start_time.isoformat(timespec="seconds"),
+                "wall_seconds": total_runtime.total_seconds()
             })
+            save_baseline(project_path, baseline)
+
+        show_log_downloads(log_files)
+
+        if cases is not None:
+            st.markdown("### Test Cases")
+            show_cases(cases)
 
         # -------------------------
         # HTML REPORT VIEWER
@@ -362,14 +603,17 @@ def run_app():
         # RUN HISTORY
         # -------------------------
 
-        if st.session_state.history:
+        recent_runs = get_history().recent_runs(selected_project_name, limit=10)
+
+        if recent_runs:
 
             st.markdown("---")
             st.markdown("### Run History")
             st.dataframe(
-                st.session_state.history,
+                recent_runs,
                 use_container_width=True
             )
+            st.caption("Trends, slowest and flaky tests are on the Run History page.")
 
 
 # -------------------------
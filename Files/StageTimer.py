@@ -0,0 +1,34 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_timings = ContextVar("stage_timings", default=None)
+_current_spans = ContextVar("stage_spans", default=None)
+
+
+def start_timings(record_spans: bool = False) -> dict:
+    """Starts collecting stage durations for the current task; child asyncio tasks share the dict."""
+    timings = {}
+    _current_timings.set(timings)
+    _current_spans.set([] if record_spans else None)
+    return timings
+
+
+def current_spans() -> list:
+    return _current_spans.get() or []
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    # Repeated stages (fan-out chunks) add up, so `llm` is total LLM time, not wall time
+    started = time.perf_counter()
+    started_ns = time.time_ns()
+    try:
+        yield
+    finally:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0) + time.perf_counter() - started, 4)
+        spans = _current_spans.get()
+        if spans is not None:
+            spans.append({"name": name, "start_ns": started_ns, "end_ns": time.time_ns(), "attributes": attributes})
@@ -0,0 +1,31 @@
+import asyncio
+
+
+# =========================
+# IN-PROCESS TASK EVENT BUS
+# =========================
+class TaskEventBus:
+    """Fans task state transitions out to long-poll and SSE listeners."""
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        listeners = self._subscribers.get(task_id)
+        if not listeners:
+            return
+        listeners.discard(queue)
+        if not listeners:
+            del self._subscribers[task_id]
+
+    def publish(self, task_id: str, event: dict):
+        for queue in self._subscribers.get(task_id, ()):
+            queue.put_nowait(event)
+
+    def listener_count(self) -> int:
+        return sum(len(listeners) for listeners in self._subscribers.values())
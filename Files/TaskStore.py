@@ -0,0 +1,250 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+FINISHED_STATUSES = ("done", "error")
+# Identifies this process in stored tasks; the token tells it apart from an earlier process with the same PID
+OWNER = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class TaskStoreFullError(Exception):
+    pass
+
+
+def owner_alive(owner: str) -> bool:
+    if not owner:
+        return False
+    if owner == OWNER:
+        return True
+    pid = int(owner.split(":", 1)[0])
+    if pid == os.getpid():
+        return False
+    if os.name == "nt":
+        import ctypes
+
+        # os.kill on Windows terminates the process, so ask for a handle instead
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+# =========================
+# BASE STORE
+# =========================
+class TaskStore(abc.ABC):
+    """Keeps generation task records keyed by task_id."""
+
+    @abc.abstractmethod
+    def create(self, task_id: str, record: dict):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, task_id: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, task_id: str, **fields):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    def fail_interrupted(self, message: str) -> int:
+        return 0
+
+    def has_room(self, count: int = 1) -> bool:
+        return True
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+# =========================
+# IN-MEMORY LRU / TTL STORE
+# =========================
+class MemoryTaskStore(TaskStore):
+    def __init__(self, max_items: int = 1000, retention_seconds: float = 86400):
+        self.max_items = max_items
+        self.retention_seconds = retention_seconds
+        self._records = OrderedDict()
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, task_id: str, record: dict):
+        now = time.time()
+        with self._lock:
+            self._purge_locked(now)
+            if task_id not in self._records and not self._has_room_locked(1):
+                raise TaskStoreFullError(f"Task store is full ({self.max_items} tasks in flight).")
+            self._records[task_id] = dict(record, created_at=now, updated_at=now)
+            self._records.move_to_end(task_id)
+            self._evict_locked()
+
+    def get(self, task_id: str):
+        with self._lock:
+            record = self._records.get(task_id)
+            if record is None:
+                return None
+            self._records.move_to_end(task_id)
+            return dict(record)
+
+    def update(self, task_id: str, **fields):
+        now = time.time()
+        with self._lock:
+            record = self._records.get(task_id)
+            if record is None:
+                return
+            record.update(fields, updated_at=now)
+            if record.get("status") in FINISHED_STATUSES:
+                self._finished[task_id] = now
+                self._finished.move_to_end(task_id)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge_locked(time.time())
+
+    def _purge_locked(self, now: float) -> int:
+        purged = 0
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at < self.retention_seconds:
+                break
+            self._finished.popitem(last=False)
+            self._records.pop(task_id, None)
+            purged += 1
+        return purged
+
+    def has_room(self, count: int = 1) -> bool:
+        with self._lock:
+            self._purge_locked(time.time())
+            return self._has_room_locked(count)
+
+    def _has_room_locked(self, count: int) -> bool:
+        # Finished tasks can always be evicted; in-flight ones (batch parents included) never are
+        return len(self._records) - len(self._finished) + count <= self.max_items
+
+    def _evict_locked(self):
+        # Oldest finished tasks first
+        while len(self._records) > self.max_items and self._finished:
+            task_id, _ = self._finished.popitem(last=False)
+            self._records.pop(task_id, None)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# =========================
+# SQLITE STORE (WAL)
+# =========================
+class SQLiteTaskStore(TaskStore):
+    def __init__(self, db_path: str = "tasks_store.db", retention_seconds: float = 86400,
+                 purge_interval: float = 60):
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS Tasks (
+                task_id      TEXT PRIMARY KEY,
+                status       TEXT,
+                record       TEXT,
+                created_at   REAL,
+                updated_at   REAL,
+                finished_at  REAL,
+                owner        TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON Tasks (status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_finished ON Tasks (finished_at)")
+
+    def create(self, task_id: str, record: dict):
+        now = time.time()
+        record = dict(record, created_at=now, updated_at=now)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO Tasks (task_id, status, record, created_at, updated_at, finished_at, owner) "
+                "VALUES (?, ?, ?, ?, ?, NULL, ?)",
+                (task_id, record.get("status"), json.dumps(record), now, now, OWNER)
+            )
+        self._maybe_purge(now)
+
+    def get(self, task_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM Tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, task_id: str, **fields):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM Tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return
+            record = json.loads(row[0])
+            record.update(fields, updated_at=now)
+            status = record.get("status")
+            finished_at = now if status in FINISHED_STATUSES else None
+            self._conn.execute(
+                "UPDATE Tasks SET status = ?, record = ?, updated_at = ?, finished_at = ? WHERE task_id = ?",
+                (status, json.dumps(record), now, finished_at, task_id)
+            )
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM Tasks WHERE finished_at IS NOT NULL AND finished_at < ?",
+                                        (cutoff,))
+            return cursor.rowcount
+
+    def _maybe_purge(self, now: float):
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            self.purge_expired()
+
+    def fail_interrupted(self, message: str) -> int:
+        # Tasks left pending/processing by a process that has exited can never finish;
+        # those of sibling workers sharing the database are still running
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, owner FROM Tasks WHERE status IN ('pending', 'processing')"
+            ).fetchall()
+        interrupted = [task_id for task_id, owner in rows if not owner_alive(owner)]
+        for task_id in interrupted:
+            self.update(task_id, status="error", result=message)
+        return len(interrupted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM Tasks").fetchone()[0]
+
+
+def create_task_store(backend: str = "sqlite", db_path: str = "tasks_store.db",
+                      retention_seconds: float = 86400, max_items: int = 1000) -> TaskStore:
+    backend = (backend or "sqlite").strip().lower()
+    if backend == "memory":
+        return MemoryTaskStore(max_items=max_items, retention_seconds=retention_seconds)
+    if backend == "sqlite":
+        return SQLiteTaskStore(db_path=db_path, retention_seconds=retention_seconds)
+    raise ValueError(f"Unsupported task store backend: {backend}")
@@ -0,0 +1,193 @@
+import ast
+import json
+import os
+import re
+
+from GherkinParser import iter_scenarios
+
+STATE_DIR = ".aiqa"
+INDEX_VERSION = 1
+SKIP_DIRS = {".aiqa", ".git", ".venv", "venv", "node_modules", "target", "__pycache__", ".pytest_cache"}
+
+# Same names pytest-bdd gives the tests generated by scenarios()
+NON_WORD = re.compile(r"\W")
+LEADING_DIGITS = re.compile(r"^\d+_*")
+
+# In-process copy so Streamlit reruns do not re-read the JSON
+_indexes = {}
+
+
+def tests_root(project_path: str, framework: str) -> str:
+    return os.path.join(project_path, "features" if framework == "Behave" else "tests")
+
+
+def is_test_file(framework: str, name: str) -> bool:
+    if framework == "Pytest":
+        return name.startswith("test_") and name.endswith(".py")
+    if framework == "Behave":
+        return name.endswith(".feature")
+    return name.endswith(".py") and name != "__init__.py"
+
+
+# =========================
+# PER-FILE PARSING
+# =========================
+def _bdd_test_name(scenario_name: str) -> str:
+    name = NON_WORD.sub("", scenario_name.replace(" ", "_"))
+    return "test_" + LEADING_DIGITS.sub("", name).lower()
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _pytest_tests(path: str):
+    """Returns (tests, feature files the tests were generated from)."""
+    try:
+        tree = ast.parse(_read(path))
+    except SyntaxError:
+        return [], []
+    tests, features = [], []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            tests.append({"id": f"{path}::{node.name}", "name": node.name, "line": node.lineno})
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test"):
+                    tests.append({
+                        "id": f"{path}::{node.name}::{item.name}",
+                        "name": f"{node.name}.{item.name}",
+                        "line": item.lineno
+                    })
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", "")
+        if func != "scenarios":
+            continue
+        for arg in node.args:
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and arg.value.endswith(".feature"):
+                feature = os.path.normpath(os.path.join(os.path.dirname(path), arg.value))
+                features.append(feature)
+                if os.path.isfile(feature):
+                    for _, scenario in iter_scenarios(_read(feature)):
+                        name = _bdd_test_name(scenario["name"])
+                        tests.append({"id": f"{path}::{name}", "name": scenario["name"], "line": node.lineno})
+    return tests, features
+
+
+def parse_tests(path: str, framework: str):
+    if framework == "Pytest":
+        return _pytest_tests(path)
+    if framework == "Behave":
+        tests = [
+            {"id": f"{path}:{scenario['line']}", "name": scenario["name"], "line": scenario["line"]}
+            for _, scenario in iter_scenarios(_read(path))
+        ]
+        return tests, []
+    return [{"id": path, "name": os.path.basename(path), "line": 1}], []
+
+
+def _signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+# =========================
+# INDEX
+# =========================
+def _index_path(project_path: str, framework: str) -> str:
+    return os.path.join(project_path, STATE_DIR, f"discovery_{framework.lower()}.json")
+
+
+def _load(project_path: str, framework: str) -> dict:
+    key = (os.path.abspath(project_path), framework)
+    if key in _indexes:
+        return _indexes[key]
+    try:
+        with open(_index_path(project_path, framework), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError("stale index")
+    except (OSError, ValueError):
+        index = {"version": INDEX_VERSION, "dirs": {}, "files": {}}
+    _indexes[key] = index
+    return index
+
+
+def _save(project_path: str, framework: str, index: dict):
+    path = _index_path(project_path, framework)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(temp_path, path)
+
+
+def _scan_dirs(root: str, framework: str, old_dirs: dict) -> dict:
+    """Lists only folders whose mtime changed; adding, removing or renaming an entry updates it."""
+    dirs = {}
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            continue
+        entry = old_dirs.get(folder)
+        if not entry or entry["mtime"] != mtime:
+            subdirs, files = [], []
+            try:
+                with os.scandir(folder) as it:
+                    for item in it:
+                        if item.is_dir(follow_symlinks=False):
+                            if item.name not in SKIP_DIRS:
+                                subdirs.append(item.name)
+                        elif is_test_file(framework, item.name):
+                            files.append(item.name)
+            except OSError:
+                continue
+            entry = {"mtime": mtime, "subdirs": sorted(subdirs), "files": sorted(files)}
+        dirs[folder] = entry
+        stack.extend(os.path.join(folder, name) for name in entry["subdirs"])
+    return dirs
+
+
+def discover(project_path: str, framework: str) -> dict:
+    """Returns {test file: [{"id", "name", "line"}]}, re-parsing only files that changed since the last call.
+
+    A file's entry is also refreshed when a feature file it generates tests from changes.
+    """
+    index = _load(project_path, framework)
+    root = tests_root(project_path, framework)
+    dirs = _scan_dirs(root, framework, index["dirs"])
+
+    changed = dirs != index["dirs"]
+    files = {}
+    for folder in sorted(dirs):
+        for name in dirs[folder]["files"]:
+            path = os.path.join(folder, name)
+            signature = _signature(path)
+            entry = index["files"].get(path)
+            fresh = (
+                entry is not None
+                and entry["signature"] == signature
+                and all(_signature(dep) == dep_signature for dep, dep_signature in entry["deps"].items())
+            )
+            if not fresh:
+                tests, deps = parse_tests(path, framework)
+                entry = {"signature": signature, "tests": tests, "deps": {dep: _signature(dep) for dep in deps}}
+                changed = True
+            files[path] = entry
+    changed = changed or len(files) != len(index["files"])
+
+    if changed:
+        index["dirs"] = dirs
+        index["files"] = files
+        _save(project_path, framework, index)
+    return {path: entry["tests"] for path, entry in files.items()}
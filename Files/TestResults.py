@@ -0,0 +1,143 @@
+import glob
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+
+RESULTS_DIR = os.path.join(".aiqa", "results")
+EVENTS_FILE = "events.jsonl"
+LOG_FILE = "output.log"
+JUNIT_FILE = "junit.xml"
+PLUGIN_MODULE = "aiqa_pytest_events"
+MAX_MESSAGE_CHARS = 4000
+
+STATUSES = ("passed", "failed", "error", "skipped")
+
+
+# =========================
+# RUNNER ARGUMENTS
+# =========================
+def result_args(framework: str, results_dir: str) -> list:
+    """Extra CLI arguments that make the framework write machine-readable results into results_dir."""
+    if framework == "Pytest":
+        return ["-p", PLUGIN_MODULE, f"--junitxml={os.path.join(results_dir, JUNIT_FILE)}"]
+    if framework == "Behave":
+        return ["--junit", "--junit-directory", results_dir]
+    return []
+
+
+def result_env(results_dir: str) -> dict:
+    # The pytest plugin lives next to this module and is loaded by the project's own interpreter
+    env = dict(os.environ)
+    plugin_dir = os.path.dirname(os.path.abspath(__file__))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (plugin_dir, env.get("PYTHONPATH")) if p)
+    env["AIQA_EVENTS_FILE"] = os.path.join(results_dir, EVENTS_FILE)
+    return env
+
+
+def new_results_dir(project_path: str, label: str = "") -> str:
+    name = time.strftime("%Y%m%d-%H%M%S") + (f"-{label}" if label else "")
+    path = os.path.join(project_path, RESULTS_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# =========================
+# LIVE EVENTS
+# =========================
+class EventTail:
+    """Reads the per-test events appended by the pytest plugin, a complete line at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+        self.cases = []
+
+    def poll(self) -> list:
+        try:
+            if os.path.getsize(self.path) <= self.offset:
+                return []
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except OSError:
+            return []
+        self.offset += len(chunk)
+        *lines, self.partial = (self.partial + chunk).split(b"\n")
+        new = [json.loads(line) for line in lines if line.strip()]
+        self.cases.extend(new)
+        return new
+
+
+# =========================
+# JUNIT XML
+# =========================
+def _case_from_element(element) -> dict:
+    status, message = "passed", ""
+    for tag in ("failure", "error", "skipped"):
+        child = element.find(tag)
+        if child is not None:
+            status = "failed" if tag == "failure" else tag
+            message = (child.get("message") or "") + ("\n" + child.text if child.text else "")
+            break
+    return {
+        "name": element.get("name", ""),
+        "classname": element.get("classname", ""),
+        "file": element.get("file", ""),
+        "status": status,
+        "duration": float(element.get("time") or 0),
+        "message": message.strip()[:MAX_MESSAGE_CHARS],
+    }
+
+
+def parse_junit(path: str) -> list:
+    cases = []
+    try:
+        for _, element in ET.iterparse(path):
+            if element.tag == "testcase":
+                cases.append(_case_from_element(element))
+                element.clear()
+    except (ET.ParseError, OSError):
+        # A worker killed mid-write leaves a truncated file; keep what was read
+        pass
+    return cases
+
+
+def load_junit(results_dir: str) -> list:
+    cases = []
+    for path in sorted(glob.glob(os.path.join(results_dir, "**", "*.xml"), recursive=True)):
+        cases.extend(parse_junit(path))
+    return cases
+
+
+# =========================
+# SUMMARY
+# =========================
+def collect_results(results_dir: str, fallback_cases: list = None) -> list:
+    """JUnit XML is authoritative; plugin events cover runs that died before writing it."""
+    cases = load_junit(results_dir)
+    if cases:
+        return cases
+    events = EventTail(os.path.join(results_dir, EVENTS_FILE))
+    events.poll()
+    return events.cases or list(fallback_cases or [])
+
+
+def summarize(cases: list) -> dict:
+    summary = {status: 0 for status in STATUSES}
+    for case in cases:
+        summary[case["status"]] = summary.get(case["status"], 0) + 1
+    summary["total"] = len(cases)
+    summary["duration"] = round(sum(case.get("duration", 0) for case in cases), 3)
+    return summary
+
+
+def save_results(results_dir: str, cases: list, meta: dict) -> str:
+    """Stores the run next to its raw reports so trends can be computed later."""
+    path = os.path.join(results_dir, "results.json")
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "summary": summarize(cases), "cases": cases}, f, indent=2)
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,68 @@
+"""
+pytest plugin that appends one JSON line per finished test to $AIQA_EVENTS_FILE.
+
+Loaded by Script Runner with `-p aiqa_pytest_events` so results show up while the
+suite is still running; the JUnit XML written at the end remains the final record.
+"""
+import json
+import os
+
+MAX_MESSAGE_CHARS = 4000
+
+_events = None
+# Outcome so far of tests whose teardown has not been reported yet, by nodeid
+_pending = {}
+
+
+def _classname(nodeid: str) -> str:
+    # Same shape as pytest's junitxml classname: dotted module path plus any classes
+    path, *names = nodeid.split("::")
+    module = path[:-3] if path.endswith(".py") else path
+    return ".".join([module.replace("/", ".")] + names[:-1])
+
+
+def _write(case: dict):
+    case["duration"] = round(case["duration"], 3)
+    _events.write(json.dumps(case) + "\n")
+
+
+def pytest_configure(config):
+    global _events
+    path = os.environ.get("AIQA_EVENTS_FILE")
+    # xdist workers inherit the env; only the controlling process reports
+    if path and not hasattr(config, "workerinput"):
+        _events = open(path, "a", encoding="utf-8", buffering=1)
+
+
+def pytest_unconfigure(config):
+    global _events
+    if _events:
+        # Tests cut off before their teardown (e.g. -x or Ctrl+C) still get their event
+        for case in _pending.values():
+            _write(case)
+        _pending.clear()
+        _events.close()
+        _events = None
+
+
+def pytest_runtest_logreport(report):
+    if _events is None:
+        return
+    # One event per test, written after teardown: setup and call decide the outcome,
+    # and a failing teardown turns a pass into an error like it does in the JUnit XML
+    case = _pending.get(report.nodeid)
+    if case is None:
+        case = _pending[report.nodeid] = {
+            "name": report.nodeid.split("::")[-1],
+            "classname": _classname(report.nodeid),
+            "file": report.location[0],
+            "status": "passed",
+            "duration": 0.0,
+            "message": "",
+        }
+    case["duration"] += report.duration
+    if not report.passed and case["status"] == "passed":
+        case["status"] = "error" if report.failed and report.when != "call" else report.outcome
+        case["message"] = report.longreprtext[:MAX_MESSAGE_CHARS]
+    if report.when == "teardown":
+        _write(_pending.pop(report.nodeid))
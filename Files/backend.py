@@ -1,27 +1,50 @@
 import uuid
 import asyncio
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-import openai
 from dotenv import load_dotenv
 import os
 import json
+import sys
+import time
+from TaskStore import create_task_store, FINISHED_STATUSES
+from TaskEvents import TaskEventBus
+from FileMapParser import FileMapParser, parse_file_map
+from GherkinParser import chunk_features
+from FrameworkTemplates import render_templates
+from PromptBuilder import build_support_content, count_tokens
+from IncrementalMerge import merge_python_source
+from ResponseCache import ResponseCache, make_cache_key
+from JobScheduler import JobScheduler, QueueFullError
+from LLMClient import ResilientLLMClient, CircuitBreaker, stream_in_thread
+from LLMProvider import create_provider
+from StageTimer import start_timings, stage, current_spans
+from Metrics import MetricsRegistry, TraceExporter
 
 # =========================
 # LOAD ENV
 # =========================
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not set!")
-
-openai.api_key = OPENAI_API_KEY
+# LLM_PROVIDER=fake runs the whole pipeline offline; OPENAI_API_KEY is only needed for openai
+llm_provider = create_provider()
 
 # =========================
 # FASTAPI INIT
 # =========================
-app = FastAPI(title="AI QA Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker process; only tasks whose owning process is gone are failed
+    tasks_store.fail_interrupted("Task interrupted by backend restart. Please generate again.")
+    await scheduler.start()
+    yield
+    await scheduler.stop()
+
+
+app = FastAPI(title="AI QA Backend", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,7 +53,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-tasks_store = {}
+# =========================
+# TASK STORE
+# =========================
+TASK_STORE_BACKEND = os.getenv("TASK_STORE_BACKEND", "sqlite")
+TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "tasks_store.db")
+TASK_RETENTION_SECONDS = float(os.getenv("TASK_RETENTION_SECONDS", "86400"))
+TASK_STORE_MAX_ITEMS = int(os.getenv("TASK_STORE_MAX_ITEMS", "1000"))
+
+tasks_store = create_task_store(
+    backend=TASK_STORE_BACKEND,
+    db_path=TASK_STORE_PATH,
+    retention_seconds=TASK_RETENTION_SECONDS,
+    max_items=TASK_STORE_MAX_ITEMS
+)
+task_events = TaskEventBus()
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "5000"))
+PROMPT_INSTRUCTION_TOKENS = 400
+
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "500"))
+
+FANOUT_SCENARIOS_PER_CHUNK = int(os.getenv("FANOUT_SCENARIOS_PER_CHUNK", "5"))
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "3"))
+
+LONG_POLL_MAX_SECONDS = 60
+SSE_KEEPALIVE_SECONDS = 15
+
+# =========================
+# LLM SETTINGS & RESPONSE CACHE
+# =========================
+OPENAI_MODEL = "gpt-4"
+OPENAI_TEMPERATURE = 0
+
+llm_client = ResilientLLMClient(
+    timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "180")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+    hedge_enabled=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    )
+)
+
+response_cache = ResponseCache(
+    cache_dir=os.getenv("LLM_CACHE_DIR", ".llm_cache"),
+    memory_max_bytes=int(os.getenv("LLM_CACHE_MEMORY_MB", "32")) * 1024 * 1024,
+    disk_max_bytes=int(os.getenv("LLM_CACHE_DISK_MB", "512")) * 1024 * 1024
+)
 
 
 # =========================
@@ -43,6 +113,24 @@ class GenerateCodeRequest(BaseModel):
     project_path: str
     bdd_content: str
     support_content: str = ""
+    tenant: str = ""
+    stream: bool = False
+    fan_out: bool = False
+
+
+class BatchFile(BaseModel):
+    file_name: str
+    bdd_content: str
+
+
+class GenerateBatchRequest(BaseModel):
+    project_name: str
+    language: str
+    framework: str
+    project_path: str
+    files: list[BatchFile]
+    support_content: str = ""
+    tenant: str = ""
 
 
 # =========================
@@ -91,36 +179,7 @@ NEVER use any of these deprecated Selenium 3 methods:
     find_elements_by_*()
     driver.find_element_by_*()
 
-IMPORTANT - Always generate conftest.py with a 'browser' fixture:
-    import pytest
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-
-    @pytest.fixture(scope="session")
-    def browser():
-        options = Options()
-        options.add_argument("--start-maximized")
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-        yield driver
-        driver.quit()
-
-    Rules:
-    - Fixture name MUST always be 'browser' (never 'driver')
-    - All step definition files must use 'browser' as parameter name
-    - conftest.py must be placed at the project root level
-
-IMPORTANT - Always generate a requirements.txt with ALL required packages:
-    selenium>=4.0.0
-    pytest
-    pytest-bdd
-    webdriver-manager
-    behave
-    python-dotenv
+IMPORTANT - Python step definitions for pytest-bdd must use 'browser' (never 'driver') as the fixture parameter name.
 """
 
 # =========================
@@ -211,22 +270,6 @@ Page Object Model pattern:
         }}
     }}
 
-Always generate a package.json with ALL required dependencies:
-    {{
-        "dependencies": {{
-            "@playwright/test": "^1.40.0",
-            "typescript": "^5.0.0"
-        }},
-        "devDependencies": {{
-            "@types/node": "^20.0.0"
-        }},
-        "scripts": {{
-            "test": "playwright test",
-            "test:headed": "playwright test --headed",
-            "test:report": "playwright show-report"
-        }}
-    }}
-
 NEVER use:
     Selenium-style locators or methods
     document.querySelector() or other DOM methods
@@ -279,73 +322,166 @@ If a locator is provided in Supporting Information, use it exactly as given —
 # =========================
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "AI QA Backend"}
+    return {
+        "status": "healthy",
+        "service": "AI QA Backend",
+        "cache": response_cache.stats(),
+        "scheduler": scheduler.stats(),
+        "llm": {"provider": llm_provider.name, **llm_client.stats()},
+        "task_store": {"backend": TASK_STORE_BACKEND, "tasks": len(tasks_store)},
+        "process": {"rss_bytes": process_rss_bytes()}
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def process_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # No /proc: fall back to peak RSS, which macOS reports in bytes
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
 
 
 # =========================
 # HELPER: Call OpenAI
 # =========================
-async def call_openai(prompt: str) -> str:
+async def call_openai(prompt: str, language: str = "", framework: str = "", on_token=None) -> str:
+    # Provider is part of the key so fake answers never leak into real runs
+    model = f"{llm_provider.name}/{OPENAI_MODEL}"
+    cache_key = make_cache_key(language, framework, model, OPENAI_TEMPERATURE, prompt)
+    # A memory miss falls through to a file read
+    cached = await asyncio.to_thread(response_cache.get, cache_key)
+    if cached is not None:
+        if on_token:
+            on_token(cached)
+        return cached
+
     def _call():
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
+        return llm_provider.complete(
+            messages=[{"role": "user", "content": prompt}],
+            model=OPENAI_MODEL,
+            temperature=OPENAI_TEMPERATURE,
+            timeout=llm_client.timeout_seconds
+        )
+
+    with stage("llm", provider=llm_provider.name, model=OPENAI_MODEL, streamed=bool(on_token)):
+        try:
+            if on_token:
+                # A hedged stream would send every token twice; a timeout after the first token is final
+                progress = {"delivered": 0}
+                result = await llm_client.run(
+                    lambda: stream_openai(prompt, on_token, progress),
+                    hedge=False,
+                    interrupted=lambda: progress["delivered"] > 0
+                )
+            else:
+                result = await llm_client.run(lambda: asyncio.to_thread(_call))
+        except Exception as e:
+            llm_errors.inc(error=type(e).__name__)
+            raise
+    llm_tokens.inc(count_tokens(prompt, OPENAI_MODEL), kind="prompt")
+    llm_tokens.inc(count_tokens(result, OPENAI_MODEL), kind="completion")
+
+    # Only cache answers we can parse, so a malformed response is retried next time
+    if is_json_response(result):
+        await asyncio.to_thread(response_cache.set, cache_key, result)
+    return result
+
+
+async def stream_openai(prompt: str, on_token, progress: dict) -> str:
+    def _stream(emit):
+        return llm_provider.stream(
             messages=[{"role": "user", "content": prompt}],
-            temperature=0
+            model=OPENAI_MODEL,
+            on_token=emit,
+            temperature=OPENAI_TEMPERATURE,
+            timeout=llm_client.timeout_seconds
         )
-        return response.choices[0].message.content
-    return await asyncio.to_thread(_call)
+    return await stream_in_thread(_stream, on_token, progress)
 
 
-def parse_json_result(result: str, fallback_key: str) -> dict:
-    try:
-        return json.loads(result)
-    except json.JSONDecodeError:
-        clean = result.replace("```json", "").replace("```", "").strip()
+@lru_cache(maxsize=32)
+def parsed_response(result: str):
+    # call_openai and parse_json_result both inspect the same answer; parse it once
+    return parse_file_map(result)
+
+
+def is_json_response(result: str) -> bool:
+    return parsed_response(result).complete
 
-        try:
-            return json.loads(clean)
-        except json.JSONDecodeError:
-            # If fallback is failure file, create it
-            if "tests/generated_test" in fallback_key.lower() :
-                with open("FailedOperation.txt", "w", encoding="utf-8") as f:
-                    f.write("❌ Pytest Code Generation Failed\n\n")
-                    f.write("Reason: OpenAI response was not valid JSON.\n\n")
-                    f.write("Raw Response:\n")
-                    f.write(result)
-            return {fallback_key: result}
+
+def locator_standards(support_content: str) -> str:
+    # Locator rules are only worth their tokens when the request actually carries locators
+    return LOCATOR_USAGE_STANDARDS if "Element Locators:" in support_content else ""
+
+
+def compact_support_content(language: str, framework: str, bdd_content: str, support_content: str):
+    key = (language.strip().lower(), framework.strip().lower())
+    standards = FANOUT_SPECS.get(key, {}).get("standards", "")
+    fixed_tokens = (
+        PROMPT_INSTRUCTION_TOKENS
+        + count_tokens(standards, OPENAI_MODEL)
+        + count_tokens(LOCATOR_USAGE_STANDARDS, OPENAI_MODEL)
+        + count_tokens(bdd_content, OPENAI_MODEL)
+    )
+    budget = max(PROMPT_TOKEN_BUDGET - fixed_tokens, 0)
+    compact, report = build_support_content(support_content, bdd_content, budget, OPENAI_MODEL)
+    report["prompt_token_budget"] = PROMPT_TOKEN_BUDGET
+    report["estimated_prompt_tokens"] = fixed_tokens + report["support_tokens_after"]
+    report["over_budget"] = report["estimated_prompt_tokens"] > PROMPT_TOKEN_BUDGET
+    return compact, report
+
+
+def parse_json_result(result: str, fallback_key: str) -> dict:
+    with stage("parse"):
+        parsed = parsed_response(result)
+        if parsed.files:
+            # A truncated answer still yields every file that closed before the cut
+            return dict(parsed.files)
+        # No file map at all: keep the raw answer so the UI can show what the model said instead
+        return {fallback_key: result}
 
 
 # =========================
 # Python - Pytest
 # =========================
-async def generate_python_pytest(bdd_content: str, support_content: str) -> dict:
+async def generate_python_pytest(bdd_content: str, support_content: str, on_token=None) -> dict:
     prompt = f"""
     You are an expert QA automation engineer specialized in Python Pytest framework with Selenium WebDriver.
 
-    Based on the following BDD content, generate a complete Pytest test structure.
+    Based on the following BDD content, generate the scenario-specific Pytest code.
     Use the supporting information provided (base URL, credentials, element locators) in the generated code.
 
-    Return the results as a JSON object containing ALL of these files:
-    - conftest.py              (root level - browser fixture using webdriver_manager)
+    {provided_files_note("python", "pytest")}
+
+    Return the results as a JSON object containing ONLY these files:
     - tests/test_*.py          (test cases using pytest-bdd)
     - features/*.feature       (BDD feature files)
     - steps/*_steps.py         (step definitions)
-    - requirements.txt         (all required packages)
 
     Do not include explanations, only valid code files as JSON.
 
     Example JSON response:
     {{
-        "conftest.py": "...",
         "tests/test_login.py": "...",
         "features/login.feature": "...",
-        "steps/login_steps.py": "...",
-        "requirements.txt": "..."
+        "steps/login_steps.py": "..."
     }}
 
     {SELENIUM_STANDARDS_PYTHON}
 
-    {LOCATOR_USAGE_STANDARDS}
+    {locator_standards(support_content)}
 
     Supporting Information:
     {support_content}
@@ -353,39 +489,37 @@ async def generate_python_pytest(bdd_content: str, support_content: str) -> dict
     BDD Content:
     {bdd_content}
     """
-    result = await call_openai(prompt)
+    result = await call_openai(prompt, "python", "pytest", on_token)
     return parse_json_result(result, "tests/generated_test.py")
 
 
 # =========================
 # Python - Behave
 # =========================
-async def generate_python_behave(bdd_content: str, support_content: str) -> dict:
+async def generate_python_behave(bdd_content: str, support_content: str, on_token=None) -> dict:
     prompt = f"""
     You are an expert QA automation engineer specialized in Python Behave framework with Selenium WebDriver.
 
-    Based on the following BDD content, generate a complete Behave test structure.
+    Based on the following BDD content, generate the scenario-specific Behave code.
     Use the supporting information provided (base URL, credentials, element locators) in the generated code.
 
-    Return the results as a JSON object containing ALL of these files:
+    {provided_files_note("python", "behave")}
+
+    Return the results as a JSON object containing ONLY these files:
     - features/*.feature           (BDD feature files)
-    - features/steps/*_steps.py    (step definitions)
-    - environment.py               (hooks: before_all, after_all, before_scenario, after_scenario)
-    - requirements.txt             (all required packages)
+    - features/steps/*_steps.py    (step definitions using context.driver)
 
     Do not include explanations, only valid code files as JSON.
 
     Example JSON response:
     {{
         "features/login.feature": "...",
-        "features/steps/login_steps.py": "...",
-        "environment.py": "...",
-        "requirements.txt": "..."
+        "features/steps/login_steps.py": "..."
     }}
 
     {SELENIUM_STANDARDS_PYTHON}
 
-    {LOCATOR_USAGE_STANDARDS}
+    {locator_standards(support_content)}
 
     Supporting Information:
     {support_content}
@@ -393,41 +527,37 @@ async def generate_python_behave(bdd_content: str, support_content: str) -> dict
     BDD Content:
     {bdd_content}
     """
-    result = await call_openai(prompt)
+    result = await call_openai(prompt, "python", "behave", on_token)
     return parse_json_result(result, "features/generated.feature")
 
 
 # =========================
 # Java - TestNG
 # =========================
-async def generate_java_testng(bdd_content: str, support_content: str) -> dict:
+async def generate_java_testng(bdd_content: str, support_content: str, on_token=None) -> dict:
     prompt = f"""
     You are an expert QA automation engineer specialized in Java TestNG framework with Selenium WebDriver.
 
-    Based on the following BDD content, generate a complete TestNG test structure.
+    Based on the following BDD content, generate the scenario-specific TestNG code.
     Use the supporting information provided (base URL, credentials, element locators) in the generated code.
 
-    Return the results as a JSON object containing ALL of these files:
+    {provided_files_note("java", "testng")}
+
+    Return the results as a JSON object containing ONLY these files:
     - src/test/java/tests/*.java          (TestNG test classes)
     - src/test/java/pages/*.java          (Page Object Model classes)
-    - src/test/java/utils/BaseTest.java   (base test setup/teardown)
-    - src/test/resources/testng.xml       (TestNG suite configuration)
-    - pom.xml                             (Maven dependencies - Selenium 4, TestNG, WebDriverManager)
 
     Do not include explanations, only valid code files as JSON.
 
     Example JSON response:
     {{
         "src/test/java/tests/LoginTest.java": "...",
-        "src/test/java/pages/LoginPage.java": "...",
-        "src/test/java/utils/BaseTest.java": "...",
-        "src/test/resources/testng.xml": "...",
-        "pom.xml": "..."
+        "src/test/java/pages/LoginPage.java": "..."
     }}
 
     {SELENIUM_STANDARDS_JAVA}
 
-    {LOCATOR_USAGE_STANDARDS}
+    {locator_standards(support_content)}
 
     Supporting Information:
     {support_content}
@@ -435,7 +565,7 @@ async def generate_java_testng(bdd_content: str, support_content: str) -> dict:
     BDD Content:
     {bdd_content}
     """
-    result = await call_openai(prompt)
+    result = await call_openai(prompt, "java", "testng", on_token)
     return parse_json_result(result, "src/test/java/tests/GeneratedTest.java")
 
 
@@ -443,20 +573,19 @@ async def generate_java_testng(bdd_content: str, support_content: str) -> dict:
 # =========================
 # Java - Cucumber
 # =========================
-async def generate_java_cucumber(bdd_content: str, support_content: str) -> dict:
+async def generate_java_cucumber(bdd_content: str, support_content: str, on_token=None) -> dict:
     prompt = f"""
     You are an expert QA automation engineer specialized in Java Cucumber framework with Selenium WebDriver.
 
-    Based on the following BDD content, generate a complete Cucumber-JVM test structure.
+    Based on the following BDD content, generate the scenario-specific Cucumber-JVM code.
     Use the supporting information provided (base URL, credentials, element locators) in the generated code.
 
-    Return the results as a JSON object containing ALL of these files:
+    {provided_files_note("java", "cucumber")}
+
+    Return the results as a JSON object containing ONLY these files:
     - src/test/resources/features/*.feature    (BDD feature files)
     - src/test/java/steps/*Steps.java          (step definitions)
     - src/test/java/pages/*.java               (Page Object Model classes)
-    - src/test/java/hooks/Hooks.java           (before/after hooks)
-    - src/test/java/runner/TestRunner.java     (Cucumber runner)
-    - pom.xml                                  (Maven dependencies - Selenium 4, Cucumber, WebDriverManager)
 
     Do not include explanations, only valid code files as JSON.
 
@@ -464,15 +593,12 @@ async def generate_java_cucumber(bdd_content: str, support_content: str) -> dict
     {{
         "src/test/resources/features/login.feature": "...",
         "src/test/java/steps/LoginSteps.java": "...",
-        "src/test/java/pages/LoginPage.java": "...",
-        "src/test/java/hooks/Hooks.java": "...",
-        "src/test/java/runner/TestRunner.java": "...",
-        "pom.xml": "..."
+        "src/test/java/pages/LoginPage.java": "..."
     }}
 
     {SELENIUM_STANDARDS_JAVA}
 
-    {LOCATOR_USAGE_STANDARDS}
+    {locator_standards(support_content)}
 
     Supporting Information:
     {support_content}
@@ -480,41 +606,37 @@ async def generate_java_cucumber(bdd_content: str, support_content: str) -> dict
     BDD Content:
     {bdd_content}
     """
-    result = await call_openai(prompt)
+    result = await call_openai(prompt, "java", "cucumber", on_token)
     return parse_json_result(result, "src/test/resources/features/generated.feature")
 
 
 # =========================
 # Playwright - TypeScript
 # =========================
-async def generate_playwright_typescript(bdd_content: str, support_content: str) -> dict:
+async def generate_playwright_typescript(bdd_content: str, support_content: str, on_token=None) -> dict:
     prompt = f"""
     You are an expert QA automation engineer specialized in Playwright with TypeScript.
 
-    Based on the following BDD content, generate a complete Playwright TypeScript test structure.
+    Based on the following BDD content, generate the scenario-specific Playwright TypeScript code.
     Use the supporting information provided (base URL, credentials, element locators) in the generated code.
 
-    Return the results as a JSON object containing ALL of these files:
+    {provided_files_note("playwright", "typescript")}
+
+    Return the results as a JSON object containing ONLY these files:
     - tests/*.spec.ts          (Playwright test files)
     - pages/*.ts               (Page Object Model classes)
-    - fixtures/base.ts         (custom fixtures and setup)
-    - playwright.config.ts     (Playwright configuration)
-    - package.json             (all required dependencies)
 
     Do not include explanations, only valid code files as JSON.
 
     Example JSON response:
     {{
         "tests/login.spec.ts": "...",
-        "pages/LoginPage.ts": "...",
-        "fixtures/base.ts": "...",
-        "playwright.config.ts": "...",
-        "package.json": "..."
+        "pages/LoginPage.ts": "..."
     }}
 
     {PLAYWRIGHT_STANDARDS_TS}
 
-    {LOCATOR_USAGE_STANDARDS}
+    {locator_standards(support_content)}
 
     Supporting Information:
     {support_content}
@@ -522,14 +644,15 @@ async def generate_playwright_typescript(bdd_content: str, support_content: str)
     BDD Content:
     {bdd_content}
     """
-    result = await call_openai(prompt)
+    result = await call_openai(prompt, "playwright", "typescript", on_token)
     return parse_json_result(result, "tests/generated.spec.ts")
 
 
 # =========================
 # ROUTER: Pick correct generator
 # =========================
-async def route_code_generation(language: str, framework: str, bdd_content: str, support_content: str) -> dict:
+async def route_code_generation(language: str, framework: str, bdd_content: str, support_content: str,
+                                on_token=None) -> dict:
     key = (language.strip().lower(), framework.strip().lower())
 
     routes = {
@@ -544,7 +667,216 @@ async def route_code_generation(language: str, framework: str, bdd_content: str,
     if not generator:
         raise ValueError(f"Unsupported combination: {language} - {framework}")
 
-    return await generator(bdd_content, support_content)
+    files = await generator(bdd_content, support_content, on_token)
+    return merge_file_maps([backend_templates(language, framework), files])
+
+
+# =========================
+# TEMPLATES: boilerplate rendered locally, never by the LLM
+# =========================
+def backend_templates(language: str, framework: str) -> dict:
+    key = (language.strip().lower(), framework.strip().lower())
+    if key == ("playwright", "typescript"):
+        return render_templates("playwright", "typescript", "playwright test")
+    return render_templates("selenium", *key)
+
+
+TEMPLATE_USAGE = {
+    ("python", "pytest"): "conftest.py provides a session-scoped 'browser' fixture; "
+                          "config/config.py exposes BASE_URL, USERNAME, PASSWORD.",
+    ("python", "behave"): "features/environment.py opens a Chrome driver as context.driver before every "
+                          "scenario and quits it after.",
+    ("java", "testng"): "Test classes must extend utils.BaseTest, which exposes a protected WebDriver driver; "
+                        "testng.xml runs every class in package tests.",
+    ("java", "cucumber"): "Step classes get the driver with hooks.Hooks.getDriver(); "
+                          "the runner uses glue packages steps and hooks.",
+    ("playwright", "typescript"): "Tests import { test, expect } from '../fixtures/base'; "
+                                  "playwright.config.ts sets baseURL from BASE_URL.",
+}
+
+
+def provided_files_note(language: str, framework: str) -> str:
+    key = (language.strip().lower(), framework.strip().lower())
+    paths = "\n".join(f"    - {path}" for path in backend_templates(language, framework))
+    return f"""The following framework files are rendered locally and ALREADY EXIST - do NOT generate them:
+{paths}
+    {TEMPLATE_USAGE.get(key, "")}"""
+
+
+# =========================
+# FAN-OUT: PER-FEATURE FILES GENERATED CONCURRENTLY
+# =========================
+# Step definitions and page objects are shared by all scenarios of a feature, so they are
+# generated once per feature; only "test_files" are generated per group of scenarios.
+# Frameworks without per-scenario test code fan out across features only.
+FANOUT_SPECS = {
+    ("python", "pytest"): {
+        "expert": "Python Pytest framework with Selenium WebDriver",
+        "standards": SELENIUM_STANDARDS_PYTHON,
+        "shared_files": ["tests/test_{slug}.py (pytest-bdd test module loading features/{slug}.feature)",
+                         "features/{slug}.feature (the BDD feature file, unchanged)",
+                         "steps/{slug}_steps.py (step definitions)"],
+        "test_files": [],
+        "fallback": "tests/generated_test.py",
+    },
+    ("python", "behave"): {
+        "expert": "Python Behave framework with Selenium WebDriver",
+        "standards": SELENIUM_STANDARDS_PYTHON,
+        "shared_files": ["features/{slug}.feature (the BDD feature file, unchanged)",
+                         "features/steps/{slug}_steps.py (step definitions)"],
+        "test_files": [],
+        "fallback": "features/generated.feature",
+    },
+    ("java", "testng"): {
+        "expert": "Java TestNG framework with Selenium WebDriver",
+        "standards": SELENIUM_STANDARDS_JAVA,
+        "shared_files": ["src/test/java/pages/{cls}Page.java (Page Object Model class)"],
+        "test_files": ["src/test/java/tests/{cls}Test.java (TestNG test class extending BaseTest)"],
+        "fallback": "src/test/java/tests/GeneratedTest.java",
+    },
+    ("java", "cucumber"): {
+        "expert": "Java Cucumber framework with Selenium WebDriver",
+        "standards": SELENIUM_STANDARDS_JAVA,
+        "shared_files": ["src/test/resources/features/{slug}.feature (the BDD feature file, unchanged)",
+                         "src/test/java/steps/{cls}Steps.java (step definitions)",
+                         "src/test/java/pages/{cls}Page.java (Page Object Model class)"],
+        "test_files": [],
+        "fallback": "src/test/resources/features/generated.feature",
+    },
+    ("playwright", "typescript"): {
+        "expert": "Playwright with TypeScript",
+        "standards": PLAYWRIGHT_STANDARDS_TS,
+        "shared_files": ["pages/{cls}Page.ts (Page Object Model class)"],
+        "test_files": ["tests/{slug}.spec.ts (Playwright test file)"],
+        "fallback": "tests/generated.spec.ts",
+    },
+}
+
+
+def class_name(slug: str) -> str:
+    return "".join(part.capitalize() for part in slug.split("_"))
+
+
+def build_fanout_prompt(spec: dict, task: str, files: list, bdd_content: str, support_content: str) -> str:
+    file_list = "\n".join(f"    - {f}" for f in files)
+    return f"""
+    You are an expert QA automation engineer specialized in {spec["expert"]}.
+
+    {task}
+    Use the supporting information provided (base URL, credentials, element locators) in the generated code.
+
+    Return the results as a JSON object containing ONLY these files, using exactly these paths:
+{file_list}
+
+    Do not include explanations, only valid code files as JSON mapping file path to file content.
+
+    {spec["standards"]}
+
+    {locator_standards(support_content)}
+
+    Supporting Information:
+    {support_content}
+
+    BDD Content:
+    {bdd_content}
+    """
+
+
+def existing_files_note(files: dict) -> str:
+    listing = "\n\n".join(f"    --- {path} ---\n{content}" for path, content in files.items())
+    return f"""The following files were generated for this feature and ALREADY EXIST - use them, do NOT generate them:
+{listing}"""
+
+
+def merge_file_maps(file_maps: list) -> dict:
+    merged = {}
+    for files in file_maps:
+        for path, content in files.items():
+            if path not in merged:
+                merged[path] = content
+            elif merged[path] == content:
+                continue
+            elif path.endswith("requirements.txt"):
+                lines = merged[path].splitlines()
+                lines += [line for line in content.splitlines() if line.strip() and line not in lines]
+                merged[path] = "\n".join(lines) + "\n"
+            elif path.endswith(".py") and isinstance(content, str):
+                # Two sub-results wrote the same module: keep both sets of definitions
+                combined = merge_python_source(merged[path], content)
+                if combined is not None:
+                    merged[path] = combined
+            else:
+                # Never drop a colliding file silently; the user merges the copies by hand
+                copy = 2
+                while f"{path}.conflict{copy}" in merged:
+                    copy += 1
+                merged[f"{path}.conflict{copy}"] = content
+    return merged
+
+
+async def generate_fan_out(language: str, framework: str, bdd_content: str, support_content: str,
+                           on_files=None, on_token=None) -> dict:
+    key = (language.strip().lower(), framework.strip().lower())
+    spec = FANOUT_SPECS.get(key)
+    if not spec:
+        raise ValueError(f"Unsupported combination: {language} - {framework}")
+
+    chunks = chunk_features(bdd_content, FANOUT_SCENARIOS_PER_CHUNK)
+    if len(chunks) <= 1 and (not chunks or len(chunks[0][2]) == 1 or not spec["test_files"]):
+        # Nothing to split: a single streamed request, so listeners still see tokens and files arrive
+        return await route_code_generation(language, framework, bdd_content, support_content, on_token)
+
+    semaphore = asyncio.Semaphore(FANOUT_CONCURRENCY)
+    task_note = provided_files_note(language, framework)
+
+    async def run(prompt: str) -> dict:
+        async with semaphore:
+            result = await call_openai(prompt, language, framework)
+        files = parse_json_result(result, spec["fallback"])
+        if on_files:
+            on_files(files)
+        return files
+
+    def paths(templates: list, slug: str) -> list:
+        return [f.format(slug=slug, cls=class_name(slug)) for f in templates]
+
+    async def generate_feature(slug: str, feature_text: str, parts: list) -> dict:
+        if len(parts) == 1 or not spec["test_files"]:
+            return await run(build_fanout_prompt(
+                spec,
+                "Generate the test code for the feature below.\n    " + task_note,
+                paths(spec["shared_files"], slug) + paths(spec["test_files"], slug),
+                feature_text,
+                support_content
+            ))
+        # Steps and pages first, from the whole feature; then the tests of each scenario group against them
+        shared = await run(build_fanout_prompt(
+            spec,
+            "Generate ONLY the shared page objects for the feature below; tests are generated separately.\n    "
+            + task_note,
+            paths(spec["shared_files"], slug),
+            feature_text,
+            support_content
+        ))
+        tests = await asyncio.gather(*(
+            run(build_fanout_prompt(
+                spec,
+                "Generate the test code for ONLY the scenarios below.\n    " + task_note + "\n    "
+                + existing_files_note(shared),
+                paths(spec["test_files"], part_slug),
+                part_text,
+                support_content
+            ))
+            for part_slug, part_text in parts
+        ))
+        return merge_file_maps([shared] + list(tests))
+
+    # Shared scaffolding comes from the local templates, so only per-feature code hits the LLM
+    scaffold = backend_templates(language, framework)
+    if on_files:
+        on_files(scaffold)
+    results = await asyncio.gather(*(generate_feature(*chunk) for chunk in chunks))
+    return merge_file_maps([scaffold] + list(results))
 
 
 # =========================
@@ -555,43 +887,334 @@ async def async_task_generate_code(
     language: str,
     framework: str,
     bdd_content: str,
-    support_content: str
+    support_content: str,
+    stream: bool = False,
+    fan_out: bool = False,
+    batch_id: str = ""
 ):
+    started = time.time()
+    started_ns = time.time_ns()
+    timings = start_timings(record_spans=trace_exporter is not None)
+    task = tasks_store.get(task_id) or {}
+    timings["queue_wait"] = round(started - task.get("submitted_at", started), 4)
+    error = ""
     try:
-        tasks_store[task_id]["status"] = "processing"
-        files_dict = await route_code_generation(language, framework, bdd_content, support_content)
-        tasks_store[task_id]["status"] = "done"
-        tasks_store[task_id]["result"] = files_dict
+        with stage("prompt_build"):
+            # tiktoken is CPU-bound; large locator sheets would stall every other request on the loop
+            support_content, prompt_report = await asyncio.to_thread(
+                compact_support_content, language, framework, bdd_content, support_content
+            )
+        set_task_state(task_id, status="processing", prompt_report=prompt_report)
+        if fan_out:
+            on_files = make_files_handler(task_id) if stream else None
+            on_token = make_stream_handler(task_id) if stream else None
+            files_dict = await generate_fan_out(language, framework, bdd_content, support_content, on_files, on_token)
+        else:
+            on_token = make_stream_handler(task_id) if stream else None
+            files_dict = await route_code_generation(language, framework, bdd_content, support_content, on_token)
+        timings["run"] = round(time.time() - started, 4)
+        set_task_state(task_id, status="done", result=files_dict, timings=timings)
     except Exception as e:
-        tasks_store[task_id]["status"] = "error"
-        tasks_store[task_id]["result"] = str(e)
+        error = str(e)
+        timings["run"] = round(time.time() - started, 4)
+        task_errors.inc(error=type(e).__name__)
+        set_task_state(task_id, status="error", result=error, timings=timings)
+    record_task_metrics(task_id, timings, started_ns, error, language=language, framework=framework,
+                        stream=stream, fan_out=fan_out)
+    if batch_id:
+        update_batch_progress(batch_id, task_id)
+
+
+def update_batch_progress(batch_id: str, task_id: str):
+    batch = tasks_store.get(batch_id)
+    task = tasks_store.get(task_id)
+    if batch is None or task is None:
+        return
+    files = batch["files"]
+    files[task["file_name"]]["status"] = task["status"]
+    if task["status"] == "error":
+        files[task["file_name"]]["error"] = task["result"]
+    # Finished children can be evicted from the store before the batch ends, so their
+    # results are copied onto the batch record (kept out of the published progress events)
+    results = batch.get("results") or {}
+    if task["status"] == "done":
+        results[task["file_name"]] = task["result"]
+        tasks_store.update(batch_id, results=results)
+    completed = sum(1 for f in files.values() if f["status"] == "done")
+    failed = sum(1 for f in files.values() if f["status"] == "error")
+    fields = {"files": files, "completed": completed, "failed": failed, "status": "processing"}
+
+    if completed + failed == batch["total"]:
+        if results:
+            # Scaffolding is rendered once here instead of being taken from every sub-result
+            merged = merge_file_maps(
+                [backend_templates(batch["language"], batch["framework"])] + [results[name] for name in files
+                                                                              if name in results]
+            )
+            fields.update(status="done", result=merged, results=None)
+        else:
+            fields.update(status="error", result="Every file in the batch failed to generate.")
+    set_task_state(batch_id, **fields)
+
+
+def make_stream_handler(task_id: str):
+    # Forwards raw tokens and every file whose JSON member has closed to SSE listeners
+    parser = FileMapParser()
+
+    def on_token(text: str):
+        task_events.publish(task_id, {"type": "token", "text": text})
+        completed = parser.feed(text)
+        for path, content in completed:
+            task_events.publish(task_id, {"type": "file", "path": path, "content": content})
+        if completed:
+            tasks_store.update(task_id, partial_files=parser.files)
+    return on_token
+
+
+def make_files_handler(task_id: str):
+    # Fan-out sub-requests finish independently; publish each batch of files as it lands
+    partial_files = {}
+
+    def on_files(files: dict):
+        for path, content in files.items():
+            if isinstance(content, str):
+                partial_files[path] = content
+                task_events.publish(task_id, {"type": "file", "path": path, "content": content})
+        tasks_store.update(task_id, partial_files=partial_files)
+    return on_files
+
+
+def set_task_state(task_id: str, **fields):
+    tasks_store.update(task_id, **fields)
+    task_events.publish(task_id, dict(fields, type="status"))
+
+
+def load_task(task_id: str) -> dict:
+    task = tasks_store.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task ID not found")
+    # Per-file results of a running batch are internal; the merged map is its result
+    task.pop("results", None)
+    if task.get("status") == "pending":
+        task["queue_position"] = scheduler.position(task_id)
+    return task
+
+
+# =========================
+# JOB SCHEDULER
+# =========================
+def fail_crashed_task(task_id: str, error: Exception):
+    # async_task_generate_code records its own errors; this catches anything that escaped it
+    task = tasks_store.get(task_id)
+    if task is not None and task.get("status") not in FINISHED_STATUSES:
+        set_task_state(task_id, status="error", result=f"Generation failed: {error}")
+        if task.get("batch_id"):
+            update_batch_progress(task["batch_id"], task_id)
+
+
+scheduler = JobScheduler(
+    async_task_generate_code,
+    workers=int(os.getenv("GENERATION_WORKERS", "4")),
+    max_queue_depth=int(os.getenv("MAX_QUEUE_DEPTH", "100")),
+    on_error=fail_crashed_task
+)
+
+
+# =========================
+# METRICS & TRACING
+# =========================
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+trace_exporter = TraceExporter(TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None
+
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram(
+    "aiqa_stage_duration_seconds", "Time spent per generation stage (queue_wait, prompt_build, llm, parse, run)."
+)
+tasks_finished = metrics.counter("aiqa_tasks_finished_total", "Generation tasks finished, by status.")
+task_errors = metrics.counter("aiqa_task_errors_total", "Failed generation tasks, by exception type.")
+llm_errors = metrics.counter("aiqa_llm_errors_total", "LLM calls that failed after retries, by exception type.")
+llm_tokens = metrics.counter("aiqa_llm_tokens_total", "Tokens sent to and received from the LLM (cache misses only).")
+metrics.gauge("aiqa_queue_depth", "Jobs waiting for a worker.", lambda: scheduler.stats()["queued"])
+metrics.gauge("aiqa_active_workers", "Workers currently running a job.", lambda: scheduler.stats()["active"])
+metrics.gauge("aiqa_workers", "Configured generation workers.", lambda: scheduler.workers)
+metrics.gauge("aiqa_llm_cache_hit_ratio", "Response cache hit ratio since start.",
+              lambda: response_cache.stats()["hit_rate"])
+metrics.callback_counter("aiqa_llm_cache_lookups_total", "Response cache lookups, by result.", lambda: {
+    (("result", name),): response_cache.stats()[key]
+    for name, key in (("memory_hit", "memory_hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))
+})
+metrics.callback_counter("aiqa_llm_client_events_total", "Resilient LLM client events, by kind.", lambda: {
+    (("kind", name),): value for name, value in dict(llm_client.counters).items()
+})
+metrics.gauge("aiqa_llm_circuit_open", "1 while the LLM circuit breaker is open.",
+              lambda: int(llm_client.breaker.state == "open"))
+metrics.gauge("aiqa_task_store_tasks", "Task records held by the task store.", lambda: len(tasks_store))
+metrics.gauge("aiqa_process_resident_memory_bytes", "Backend resident memory.", process_rss_bytes)
+
+
+def record_task_metrics(task_id: str, timings: dict, started_ns: int, error: str, **attributes):
+    tasks_finished.inc(status="error" if error else "done")
+    for name, seconds in timings.items():
+        stage_seconds.observe(seconds, stage=name)
+    if trace_exporter is not None:
+        try:
+            trace_exporter.export(
+                "generate_code", started_ns, time.time_ns(), current_spans(),
+                {"task.id": task_id, **attributes, **{f"timing.{k}": v for k, v in timings.items()}},
+                error
+            )
+        except OSError:
+            # Tracing must never fail a generation
+            pass
 
 
 # =========================
 # API ENDPOINTS
 # =========================
 @app.post("/generate-agent-code")
-async def generate_agent_code(req: GenerateCodeRequest, background_tasks: BackgroundTasks):
+async def generate_agent_code(req: GenerateCodeRequest):
     task_id = str(uuid.uuid4())
-    tasks_store[task_id] = {"status": "pending", "result": None}
-
-    background_tasks.add_task(
-        async_task_generate_code,
-        task_id,
-        req.language,
-        req.framework,
-        req.bdd_content,
-        req.support_content
-    )
+    if not tasks_store.has_room():
+        raise HTTPException(status_code=429, detail="Too many tasks in flight.", headers={"Retry-After": "10"})
+
+    try:
+        position = scheduler.submit(
+            task_id,
+            req.tenant or req.project_name,
+            req.language,
+            req.framework,
+            req.bdd_content,
+            req.support_content,
+            req.stream,
+            req.fan_out
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+
+    tasks_store.create(task_id, {"status": "pending", "result": None, "submitted_at": time.time()})
+    return {"task_id": task_id, "message": "Task queued.", "queue_position": position}
+
+
+@app.post("/generate-batch")
+async def generate_batch(req: GenerateBatchRequest):
+    if not req.files:
+        raise HTTPException(status_code=400, detail="No BDD files in batch.")
+    if len(req.files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {MAX_BATCH_FILES} files.")
+    if len(req.files) > scheduler.capacity():
+        # Every file is a queued job; a batch gets no way around the queue limit or tenant fairness
+        raise HTTPException(
+            status_code=429,
+            detail=f"Generation queue has room for {max(scheduler.capacity(), 0)} more file(s); "
+                   f"this batch has {len(req.files)}.",
+            headers={"Retry-After": "10"}
+        )
+    if not tasks_store.has_room(len(req.files) + 1):
+        raise HTTPException(status_code=429, detail="Too many tasks in flight.", headers={"Retry-After": "10"})
+
+    batch_id = str(uuid.uuid4())
+    sub_tasks = {}
+    for index, bdd_file in enumerate(req.files):
+        name = bdd_file.file_name if bdd_file.file_name not in sub_tasks else f"{bdd_file.file_name} ({index})"
+        sub_tasks[name] = (str(uuid.uuid4()), bdd_file.bdd_content)
+
+    tasks_store.create(batch_id, {
+        "status": "pending",
+        "result": None,
+        "kind": "batch",
+        "language": req.language,
+        "framework": req.framework,
+        "total": len(sub_tasks),
+        "completed": 0,
+        "failed": 0,
+        "files": {name: {"task_id": task_id, "status": "pending"} for name, (task_id, _) in sub_tasks.items()},
+    })
+
+    for name, (task_id, bdd_content) in sub_tasks.items():
+        tasks_store.create(task_id, {
+            "status": "pending",
+            "result": None,
+            "batch_id": batch_id,
+            "file_name": name,
+            "submitted_at": time.time()
+        })
+        scheduler.submit(
+            task_id,
+            req.tenant or req.project_name,
+            req.language,
+            req.framework,
+            bdd_content,
+            req.support_content,
+            False,
+            False,
+            batch_id
+        )
 
-    return {"task_id": task_id, "message": "Task started."}
+    return {
+        "batch_id": batch_id,
+        "task_ids": {name: task_id for name, (task_id, _) in sub_tasks.items()},
+        "message": f"Batch of {len(sub_tasks)} file(s) queued."
+    }
 
 
 @app.get("/task-result/{task_id}")
 async def get_task_result(task_id: str):
-    if task_id not in tasks_store:
-        raise HTTPException(status_code=404, detail="Task ID not found")
-    return tasks_store[task_id]
+    return load_task(task_id)
+
+
+@app.get("/task-result/{task_id}/wait")
+async def wait_task_result(task_id: str, timeout: float = 30):
+    # Long-poll: answer as soon as the task finishes, or with the current state after `timeout`
+    queue = task_events.subscribe(task_id)
+    try:
+        task = load_task(task_id)
+        deadline = time.monotonic() + min(max(timeout, 0), LONG_POLL_MAX_SECONDS)
+        while task.get("status") not in FINISHED_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            task = load_task(task_id)
+        return task
+    finally:
+        task_events.unsubscribe(task_id, queue)
+
+
+@app.get("/task-events/{task_id}")
+async def stream_task_events(task_id: str):
+    queue = task_events.subscribe(task_id)
+    try:
+        task = load_task(task_id)
+    except HTTPException:
+        task_events.unsubscribe(task_id, queue)
+        raise
+
+    async def event_stream():
+        try:
+            yield sse_message(dict(task, type="status"))
+            if task.get("status") in FINISHED_STATUSES:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message(event)
+                if event.get("type") == "status" and event.get("status") in FINISHED_STATUSES:
+                    return
+        finally:
+            task_events.unsubscribe(task_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+def sse_message(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
 
 
 # =========================
@@ -0,0 +1,143 @@
+"""
+Fuzz and benchmark corpus for FileMapParser.
+
+    cd Files
+    python benchmarks/file_map_corpus.py --fuzz 500 --size-kb 500
+
+The fuzz pass checks that every corpus case gives the same files whether it is
+parsed in one go or fed in random chunks (as when streaming), and that the result
+matches the files that were serialised. The benchmark times a large response
+parsed in one pass against plain json.loads.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from FileMapParser import FileMapParser, extract_file_map, parse_file_map
+
+PYTHON_SNIPPET = '''import pytest
+
+
+@pytest.mark.parametrize("value", ["a", "b\\\\c", "{braces}", "quote \\" inside"])
+def test_case_{n}(browser, value):
+    data = {"key": value, "list": [1, 2, 3]}
+    assert browser.find_element("xpath", "//div[@id='x{n}']")  # comment with "quotes"
+'''
+
+
+def make_files(rng: random.Random, count: int, approx_size: int) -> dict:
+    files = {}
+    for n in range(count):
+        body = PYTHON_SNIPPET.replace("{n}", str(n))
+        repeats = max(1, approx_size // (count * len(body)))
+        files[f"tests/test_{n}_é.py"] = body * repeats + "# unicode: ✓ \U0001F600\n"
+    if rng.random() < 0.5:
+        files["pages/nested.py"] = {"content": "class Page:\n    pass\n"}
+    return files
+
+
+def corpus(rng: random.Random, approx_size: int) -> list:
+    """Returns (name, text, expected_files, complete) cases."""
+    files = make_files(rng, rng.randint(1, 6), approx_size)
+    expected = {k: v if isinstance(v, str) else v["content"] for k, v in files.items()}
+    compact = json.dumps(files)
+    pretty = json.dumps(files, indent=2, ensure_ascii=False)
+    cases = [
+        ("plain", compact, expected, True),
+        ("pretty_unicode", pretty, expected, True),
+        ("fenced", f"```json\n{pretty}\n```", expected, True),
+        ("prose_wrapped", f"Sure! Here is the {{requested}} code:\n```json\n{pretty}\n```\nLet me know.", expected, True),
+        ("trailing_text", compact + "\n\nNote: install dependencies first.", expected, True),
+        # Braces in the preamble must not be taken for the file map
+        ("prose_object", f'Use {{"x": 1}} style.\n```json\n{pretty}\n```', expected, True),
+        ("prose_quoted_word", f'Replace {{"BASE_URL"}} first. ```json {compact}```', expected, True),
+        ("empty_object_first", "{}\n" + compact, expected, True),
+        ("unfenced_example_first", f'Use {{"path": "content"}} format:\n```json\n{pretty}\n```', expected, True),
+    ]
+    # Cut inside the last value: only the members that closed before the cut are expected
+    quoted_key = json.dumps(list(files)[-1], ensure_ascii=False)
+    cut = pretty.rfind(quoted_key) + len(quoted_key) + 10
+    truncated_expected = dict(list(expected.items())[:-1])
+    cases.append(("truncated", pretty[:cut], truncated_expected, False))
+    return cases
+
+
+def feed_in_chunks(text: str, rng: random.Random) -> FileMapParser:
+    parser = FileMapParser()
+    i = 0
+    while i < len(text):
+        size = rng.choice((1, 2, 3, 7, 64, 1024, 8192))
+        parser.feed(text[i:i + size])
+        i += size
+    parser.finish()
+    return parser
+
+
+def fuzz(iterations: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for iteration in range(iterations):
+        for name, text, expected, complete in corpus(rng, rng.choice((500, 5000, 50000))):
+            whole = parse_file_map(text)
+            chunked = feed_in_chunks(text, rng)
+            ok = (
+                whole.files == expected
+                and chunked.files == expected
+                and whole.complete == complete
+                and whole.truncated == (not complete)
+            )
+            if not ok:
+                failures += 1
+                print(f"FAIL iteration={iteration} case={name} seed={seed}")
+    print(f"fuzz: {iterations} iterations, {failures} failures")
+    return failures
+
+
+def benchmark(size_kb: int, repeats: int):
+    rng = random.Random(1)
+    files = make_files(rng, 20, size_kb * 1024)
+    text = "```json\n" + json.dumps(files, indent=2) + "\n```"
+    inner = text[len("```json\n"):-len("\n```")]
+    print(f"benchmark: response of {len(text) / 1024:.0f} KB, {repeats} repeats")
+
+    def timed(label, fn):
+        best = min(_time(fn) for _ in range(repeats))
+        print(f"  {label:<28} {best * 1000:8.2f} ms  ({len(text) / 1024 / 1024 / best:6.1f} MB/s)")
+
+    timed("extract_file_map (fenced)", lambda: extract_file_map(text))
+    timed("json.loads (pre-stripped)", lambda: json.loads(inner))
+    timed("FileMapParser 1KB chunks", lambda: _feed_fixed(text, 1024))
+
+
+def _feed_fixed(text: str, size: int):
+    parser = FileMapParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    parser.finish()
+
+
+def _time(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz and benchmark FileMapParser.")
+    parser.add_argument("--fuzz", type=int, default=200, help="Fuzz iterations (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size-kb", type=int, default=500, help="Benchmark response size")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = fuzz(args.fuzz, args.seed) if args.fuzz else 0
+    benchmark(args.size_kb, args.repeats)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
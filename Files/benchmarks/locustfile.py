@@ -0,0 +1,94 @@
+"""
+Locust driver for the generation backend.
+
+    cd Files
+    LLM_PROVIDER=fake uvicorn backend:app
+    locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000 -u 50 -r 5 --headless -t 5m
+
+Besides the HTTP calls, every finished task reports its end-to-end time and the
+backend's per-stage timings as "stage" entries in the Locust statistics. A task
+still unfinished after --job-timeout seconds is reported as a failed end_to_end.
+"""
+import itertools
+import time
+
+from locust import HttpUser, task, between, events
+
+SERVER_STAGES = ("queue_wait", "prompt_build", "llm", "parse", "run")
+FEATURE_TEMPLATE = """Feature: Checkout {index}
+  Scenario: Buyer {index} pays by card
+    Given the buyer opens the store
+    When they add item {index} to the cart
+    Then the order confirmation is shown
+"""
+
+_counter = itertools.count()
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--job-timeout", type=float, default=600,
+                        help="Seconds to wait for a generation task before counting it as failed.")
+
+
+class GenerationUser(HttpUser):
+    wait_time = between(1, 3)
+
+    def report(self, name: str, seconds: float, error=None):
+        self.environment.events.request.fire(
+            request_type="stage",
+            name=name,
+            response_time=seconds * 1000,
+            response_length=0,
+            exception=error,
+            context={},
+        )
+
+    @task
+    def generate(self):
+        index = next(_counter)
+        started = time.perf_counter()
+        with self.client.post("/generate-agent-code", json={
+            "project_name": f"locust_{index}",
+            "language": "Python",
+            "framework": "Pytest",
+            "project_path": "",
+            "bdd_content": FEATURE_TEMPLATE.format(index=index),
+            "tenant": f"user_{id(self)}",
+        }, catch_response=True) as response:
+            if response.status_code == 429:
+                response.success()
+                self.report("rejected (429)", time.perf_counter() - started)
+                return
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return
+            task_id = response.json()["task_id"]
+
+        job_timeout = self.environment.parsed_options.job_timeout
+        deadline = started + job_timeout
+        while True:
+            with self.client.get(
+                f"/task-result/{task_id}/wait",
+                params={"timeout": 25},
+                name="/task-result/[id]/wait",
+                catch_response=True
+            ) as response:
+                # A pruned or unknown task answers 404 without a status; polling it again never ends
+                if response.status_code != 200:
+                    response.failure(f"HTTP {response.status_code}")
+                    self.report("end_to_end", time.perf_counter() - started, Exception(f"HTTP {response.status_code}"))
+                    return
+                result = response.json()
+            if result.get("status") in ("done", "error"):
+                break
+            if time.perf_counter() > deadline:
+                self.report("end_to_end", time.perf_counter() - started,
+                            TimeoutError(f"Task not finished after {job_timeout:g}s"))
+                return
+
+        error = None if result["status"] == "done" else Exception(str(result.get("result"))[:200])
+        self.report("end_to_end", time.perf_counter() - started, error)
+        for name in SERVER_STAGES:
+            if name in (result.get("timings") or {}):
+                self.report(name, result["timings"][name])
@@ -0,0 +1,230 @@
+"""
+End-to-end benchmark for the generation pipeline.
+
+Start the backend against the offline provider, then run this script:
+
+    cd Files
+    LLM_PROVIDER=fake FAKE_LLM_LATENCY_SECONDS=2 FAKE_LLM_TOKENS_PER_SECOND=80 uvicorn backend:app
+    python benchmarks/run_benchmark.py --jobs 200 --concurrency 20 --output bench.json
+    python benchmarks/run_benchmark.py --jobs 200 --concurrency 20 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GeneratedFiles import get_files_from_result, save_files_to_folder
+
+SERVER_STAGES = ("queue_wait", "prompt_build", "llm", "parse", "run")
+CLIENT_STAGES = ("submit", "end_to_end", "get_files", "save_files")
+FEATURE_TEMPLATE = """Feature: Checkout {index}
+  Scenario: Buyer {index} pays by card
+    Given the buyer opens the store
+    When they add item {index} to the cart
+    And they pay with a valid card
+    Then the order confirmation is shown
+"""
+
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def health(url: str) -> dict:
+    try:
+        return session().get(f"{url}/health", timeout=10).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return {}
+
+
+def run_job(index: int, args, save_root: str) -> dict:
+    bdd = FEATURE_TEMPLATE.format(index=0 if args.repeat_prompts else index)
+    payload = {
+        "project_name": f"bench_{index}",
+        "language": args.language,
+        "framework": args.framework,
+        "project_path": "",
+        "bdd_content": bdd,
+        "support_content": "",
+        "tenant": f"tenant_{index % args.tenants}",
+        "fan_out": args.fan_out,
+    }
+    timings = {}
+    started = time.perf_counter()
+    response = session().post(f"{args.url}/generate-agent-code", json=payload, timeout=30)
+    timings["submit"] = time.perf_counter() - started
+    if response.status_code != 200:
+        return {"ok": False, "error": f"HTTP {response.status_code}", "timings": timings}
+    task_id = response.json()["task_id"]
+
+    deadline = started + args.job_timeout
+    while True:
+        task = session().get(f"{args.url}/task-result/{task_id}/wait", params={"timeout": 25}, timeout=40).json()
+        if task.get("status") in ("done", "error") or time.perf_counter() > deadline:
+            break
+    timings["end_to_end"] = time.perf_counter() - started
+    timings.update(task.get("timings") or {})
+    if task.get("status") != "done":
+        return {"ok": False, "error": str(task.get("result") or task.get("status"))[:200], "timings": timings}
+
+    step = time.perf_counter()
+    files = get_files_from_result(task["result"])
+    timings["get_files"] = time.perf_counter() - step
+    step = time.perf_counter()
+    _, failed = save_files_to_folder(files, os.path.join(save_root, f"job_{index}"))
+    timings["save_files"] = time.perf_counter() - step
+    return {"ok": not failed, "error": "; ".join(failed), "timings": timings}
+
+
+def safe_run_job(index: int, args, save_root: str) -> dict:
+    # A dropped connection or a bad response is one failed sample, not the end of the benchmark
+    started = time.perf_counter()
+    try:
+        return run_job(index, args, save_root)
+    except Exception as e:
+        return {
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}"[:200],
+            "timings": {"end_to_end": time.perf_counter() - started},
+        }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(report: dict, baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline.get('revision') or 'unknown revision'}):")
+    old, new = baseline["throughput_jobs_per_min"], report["throughput_jobs_per_min"]
+    print(f"  throughput  {old:>10} -> {new:<10} jobs/min")
+    if "error_rate" in baseline:
+        print(f"  error rate  {baseline['error_rate']:>10.1%} -> {report['error_rate']:<10.1%}")
+    for name, stats in report["stages"].items():
+        before = baseline.get("stages", {}).get(name, {})
+        if stats.get("p95") is None or before.get("p95") is None:
+            continue
+        change = (stats["p95"] - before["p95"]) / before["p95"] * 100 if before["p95"] else 0
+        print(f"  {name:<12} p95 {before['p95']:>9}s -> {stats['p95']:<9}s ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /generate-agent-code end to end.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--language", default="Python")
+    parser.add_argument("--framework", default="Pytest")
+    parser.add_argument("--fan-out", action="store_true")
+    parser.add_argument("--repeat-prompts", action="store_true", help="Send identical BDD so the LLM cache is hit")
+    parser.add_argument("--job-timeout", type=float, default=600)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    before = health(args.url)
+    if not before:
+        sys.exit(f"Backend not reachable at {args.url}")
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="bench_save_") as save_root:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda i: safe_run_job(i, args, save_root), range(args.jobs)))
+    elapsed = time.perf_counter() - started
+    after = health(args.url)
+
+    completed = [r for r in results if r["ok"]]
+    errors = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    report = {
+        "label": args.label,
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "llm_provider": before.get("llm", {}).get("provider"),
+        "elapsed_seconds": round(elapsed, 3),
+        "jobs": args.jobs,
+        "completed": len(completed),
+        "failed": args.jobs - len(completed),
+        "error_rate": round((args.jobs - len(completed)) / args.jobs, 4) if args.jobs else 0,
+        "errors": errors,
+        "throughput_jobs_per_min": round(len(completed) / elapsed * 60, 2) if elapsed else 0,
+        "stages": {
+            name: summarize([r["timings"][name] for r in completed if name in r["timings"]])
+            for name in CLIENT_STAGES + SERVER_STAGES
+        },
+        "memory": {
+            "rss_bytes_before": before.get("process", {}).get("rss_bytes"),
+            "rss_bytes_after": after.get("process", {}).get("rss_bytes"),
+            "tasks_before": before.get("task_store", {}).get("tasks"),
+            "tasks_after": after.get("task_store", {}).get("tasks"),
+        },
+        "cache": after.get("cache"),
+    }
+    memory = report["memory"]
+    if memory["rss_bytes_before"] is not None and memory["rss_bytes_after"] is not None:
+        memory["rss_growth_bytes"] = memory["rss_bytes_after"] - memory["rss_bytes_before"]
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{len(completed)}/{args.jobs} jobs in {elapsed:.1f}s "
+          f"({report['throughput_jobs_per_min']} jobs/min, concurrency {args.concurrency}, "
+          f"error rate {report['error_rate']:.1%})")
+    print(f"{'stage':<12} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, stats in report["stages"].items():
+        if stats["count"]:
+            print(f"{name:<12} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9} {stats['max']:>9}")
+    if errors:
+        print("errors:", errors)
+    print(f"memory: {memory}")
+    print(f"results written to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
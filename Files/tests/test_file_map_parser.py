@@ -0,0 +1,16 @@
+from FileMapParser import extract_file_map
+from benchmarks.file_map_corpus import fuzz
+
+
+def test_corpus_parses_the_same_whole_and_chunked():
+    assert fuzz(iterations=30, seed=7) == 0
+
+
+def test_preamble_braces_are_skipped():
+    assert extract_file_map('Use {"x": 1} style.\n```json\n{"a.py": "print(1)"}\n```') == {"a.py": "print(1)"}
+    assert extract_file_map('Replace {"BASE_URL"} first. ```json {"a.py": "print(1)"}```') == {"a.py": "print(1)"}
+    assert extract_file_map('{}\n{"a.py":"x"}') == {"a.py": "x"}
+
+
+def test_fenced_object_without_files_falls_back_to_the_unfenced_one():
+    assert extract_file_map('{"a.py": "x"}\n\nConfig:\n```json\n{"retries": 3}\n```') == {"a.py": "x"}
@@ -0,0 +1,62 @@
+from IncrementalMerge import merge_generated_files, plan_incremental_content, remove_scenarios
+from ProjectWriter import write_project_files
+
+PREVIOUS = """Feature: Login
+
+  Scenario: Valid login
+    Given the login page is open
+    When I log in as "admin"
+    Then I see the dashboard
+
+  Scenario: Invalid login
+    Given the login page is open
+    When I log in as "nobody"
+    Then I see an error
+"""
+
+CURRENT = """Feature: Login
+
+  Scenario: Valid login
+    Given the login page is open
+    When I log in as "admin"
+    Then I see the dashboard
+"""
+
+
+def test_removal_only_edit_updates_feature_files(tmp_path):
+    plan = plan_incremental_content(PREVIOUS, CURRENT)
+    assert plan["content"] is None
+    assert plan["removed"] == ["Invalid login"]
+
+    (tmp_path / "features").mkdir()
+    (tmp_path / "features" / "login.feature").write_text(PREVIOUS, encoding="utf-8")
+    # Another feature reusing the scenario name keeps it
+    (tmp_path / "features" / "admin.feature").write_text(
+        "Feature: Admin\n\n  Scenario: Invalid login\n    Given something\n", encoding="utf-8"
+    )
+
+    merged, notes = remove_scenarios(str(tmp_path), PREVIOUS, plan["removed"], "login.feature")
+    assert list(merged) == ["features/login.feature"]
+    assert "Invalid login" in notes[0]
+
+    written = write_project_files(str(tmp_path), merged)
+    assert len(written["updated"]) == 1
+    text = (tmp_path / "features" / "login.feature").read_text(encoding="utf-8")
+    assert "Valid login" in text
+    assert "Invalid login" not in text
+
+
+def test_changed_step_code_is_not_lost(tmp_path):
+    (tmp_path / "steps.py").write_text(
+        "from pytest_bdd import when\n\n\n@when('I log in')\ndef step_impl(page):\n    page.click('#old')\n",
+        encoding="utf-8"
+    )
+    generated = (
+        "from pytest_bdd import when, then\n\n\n@when('I log in')\ndef step_impl(page):\n    page.click('#new')\n\n\n"
+        "@then('I see the dashboard')\ndef step_impl(page):\n    assert page.title()\n"
+    )
+
+    merged, notes = merge_generated_files(str(tmp_path), {"steps.py": generated})
+    assert "#old" in merged["steps.py"] and "I see the dashboard" in merged["steps.py"]
+    assert merged["steps.py.incremental"] == generated
+    assert "when('I log in')" in notes[0]
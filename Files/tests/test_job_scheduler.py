@@ -0,0 +1,28 @@
+import asyncio
+
+from JobScheduler import JobScheduler
+
+
+def test_failed_job_is_reported_and_worker_keeps_running():
+    done = []
+    failures = []
+
+    async def handler(job_id):
+        if job_id == "bad":
+            raise RuntimeError("boom")
+        done.append(job_id)
+
+    async def _run():
+        scheduler = JobScheduler(handler, workers=1, on_error=lambda job_id, e: failures.append((job_id, str(e))))
+        await scheduler.start()
+        scheduler.submit("bad", "tenant")
+        scheduler.submit("good", "tenant")
+        for _ in range(50):
+            if done:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+    asyncio.run(_run())
+    assert failures == [("bad", "boom")]
+    assert done == ["good"]
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from LLMClient import ResilientLLMClient, StreamInterruptedError, stream_in_thread
+from LLMProvider import FakeProvider
+
+
+def test_timeout_mid_stream_delivers_each_token_once():
+    response = "".join(f"{i:04d}" for i in range(50))
+    provider = FakeProvider(latency_seconds=0, tokens_per_second=40, response=response)
+    client = ResilientLLMClient(timeout_seconds=0.3, max_retries=3, base_delay=0)
+    received = []
+    progress = {"delivered": 0}
+
+    def _stream(emit):
+        return provider.stream([{"role": "user", "content": "p"}], "model", on_token=emit)
+
+    async def _run():
+        with pytest.raises(StreamInterruptedError):
+            await client.run(
+                lambda: stream_in_thread(_stream, received.append, progress),
+                hedge=False,
+                interrupted=lambda: progress["delivered"] > 0
+            )
+        count = len(received)
+        # The worker thread must stop instead of streaming into the void
+        await asyncio.sleep(0.3)
+        assert len(received) == count
+
+    asyncio.run(_run())
+    assert 0 < len(received) < 50
+    assert "".join(received) == response[:4 * len(received)]
+    assert progress["delivered"] == len(received)
+    assert client.counters["retries"] == 0
+
+
+def test_timeout_before_first_token_is_retried():
+    provider = FakeProvider(latency_seconds=0.2, response="abcd")
+    client = ResilientLLMClient(timeout_seconds=0.05, max_retries=1, base_delay=0)
+    progress = {"delivered": 0}
+
+    def _stream(emit):
+        return provider.stream([{"role": "user", "content": "p"}], "model", on_token=emit)
+
+    async def _run():
+        return await client.run(
+            lambda: stream_in_thread(_stream, lambda delta: None, progress),
+            hedge=False,
+            interrupted=lambda: progress["delivered"] > 0
+        )
+
+    with pytest.raises(Exception) as error:
+        asyncio.run(_run())
+    assert not isinstance(error.value, StreamInterruptedError)
+    assert client.counters["retries"] == 1
+
+
+def test_cancelled_probe_does_not_block_the_breaker():
+    client = ResilientLLMClient(timeout_seconds=5, max_retries=0)
+    client.breaker.opened_at = time.monotonic() - client.breaker.reset_seconds  # half-open
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    async def _run():
+        probe = asyncio.ensure_future(client.run(slow, hedge=False))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await client.run(ok, hedge=False)
+
+    assert asyncio.run(_run()) == "ok"
+    assert client.breaker.state == "closed"
@@ -0,0 +1,21 @@
+from LLMProvider import FakeProvider, FakeRateLimitError
+
+MESSAGES = [{"role": "user", "content": "same prompt"}]
+
+
+def outcomes(provider: FakeProvider, calls: int) -> list:
+    results = []
+    for _ in range(calls):
+        try:
+            provider.complete(MESSAGES, "model")
+            results.append(True)
+        except FakeRateLimitError:
+            results.append(False)
+    return results
+
+
+def test_injected_errors_are_transient_but_reproducible():
+    first = outcomes(FakeProvider(latency_seconds=0, error_rate=0.5, seed=3), 40)
+    second = outcomes(FakeProvider(latency_seconds=0, error_rate=0.5, seed=3), 40)
+    assert first == second
+    assert True in first and False in first
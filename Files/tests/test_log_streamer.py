@@ -0,0 +1,22 @@
+import sys
+
+from LogStreamer import LogStreamer
+
+INVALID_OUTPUT = (
+    "import sys\n"
+    "for i in range(20000):\n"
+    "    sys.stdout.buffer.write(b'line %d \\xff\\xfe\\x80 bad bytes\\n' % i)\n"
+    "sys.stdout.buffer.flush()\n"
+)
+
+
+def test_invalid_bytes_do_not_stop_the_reader(tmp_path):
+    spool = tmp_path / "output.log"
+    stream = LogStreamer([sys.executable, "-c", INVALID_OUTPUT], spool_path=str(spool), tail_lines=10).start()
+    stream._thread.join(timeout=30)
+
+    assert not stream.running
+    assert stream.returncode == 0
+    assert stream.line_count == 20000
+    assert "line 19999 �" in stream.tail(1)
+    assert spool.read_text(encoding="utf-8").count("\n") == 20000
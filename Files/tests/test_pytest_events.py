@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+SUITE = """
+import pytest
+
+
+@pytest.fixture
+def broken_teardown():
+    yield
+    raise RuntimeError("teardown failed")
+
+
+@pytest.fixture
+def broken_setup():
+    raise RuntimeError("setup failed")
+
+
+def test_passes():
+    pass
+
+
+def test_fails_then_teardown_fails(broken_teardown):
+    assert False
+
+
+def test_passes_then_teardown_fails(broken_teardown):
+    pass
+
+
+def test_setup_fails(broken_setup):
+    pass
+
+
+@pytest.mark.skip(reason="not today")
+def test_skipped():
+    pass
+"""
+
+
+def test_one_event_per_test(tmp_path):
+    (tmp_path / "test_suite.py").write_text(SUITE, encoding="utf-8")
+    events_file = tmp_path / "events.jsonl"
+    files_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, AIQA_EVENTS_FILE=str(events_file),
+               PYTHONPATH=os.pathsep.join(filter(None, [files_dir, os.environ.get("PYTHONPATH")])))
+    subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "aiqa_pytest_events", "-p", "no:cacheprovider",
+                    str(tmp_path)], cwd=tmp_path, env=env, capture_output=True)
+
+    events = [json.loads(line) for line in events_file.read_text(encoding="utf-8").splitlines()]
+    statuses = {event["name"]: event["status"] for event in events}
+    assert len(events) == len(statuses) == 5
+    assert statuses == {
+        "test_passes": "passed",
+        "test_fails_then_teardown_fails": "failed",
+        "test_passes_then_teardown_fails": "error",
+        "test_setup_fails": "error",
+        "test_skipped": "skipped",
+    }
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from TaskStore import MemoryTaskStore, SQLiteTaskStore, TaskStore, TaskStoreFullError
+
+
+def test_memory_store_never_evicts_in_flight_tasks():
+    store = MemoryTaskStore(max_items=3)
+    store.create("batch", {"status": "pending", "kind": "batch"})
+    store.create("a", {"status": "processing"})
+    store.create("b", {"status": "done"})
+    store.update("b", status="done")
+
+    assert store.has_room(1) and not store.has_room(2)
+    store.create("c", {"status": "pending"})
+    assert "batch" in store and "a" in store and "b" not in store
+    with pytest.raises(TaskStoreFullError):
+        store.create("d", {"status": "pending"})
+
+
+def test_fail_interrupted_skips_tasks_of_live_processes(tmp_path):
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    store.create("mine", {"status": "pending"})
+    store._conn.execute(
+        "INSERT INTO Tasks (task_id, status, record, owner) VALUES ('dead', 'processing', '{}', ?)",
+        (f"{os.getpid()}:previous",)
+    )
+
+    assert store.fail_interrupted("restarted") == 1
+    assert store.get("mine")["status"] == "pending"
+    assert store.get("dead")["status"] == "error"
+
+
+def test_incomplete_store_fails_at_construction():
+    class NoPurgeStore(TaskStore):
+        def create(self, task_id, record):
+            pass
+
+        def get(self, task_id):
+            return None
+
+        def update(self, task_id, **fields):
+            pass
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        NoPurgeStore()
@@ -11,6 +11,11 @@ import sys
 import os
 from pathlib import Path
 
+# Shared writer lives with the main app in Files/
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Files"))
+from ProjectWriter import write_project_files
+from ScaffoldCache import pip_install, npm_install, maven, run as run_cached
+
 # =========================
 # LOAD ENV
 # =========================
@@ -300,13 +305,13 @@ def dependency_manager(tool: str, language: str, framework: str, project_path: s
                 elif fw == "behave":
                     libs += ["behave", "allure-behave"]
 
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade"] + libs)
+                pip_install(libs)
                 return f"✅ Selenium-Python ({fw}) environment verified."
 
             elif lang == "java":
                 # Frameworks: TestNG, Cucumber (Managed via Maven)
                 if os.path.exists(os.path.join(project_path, "pom.xml")):
-                    subprocess.check_call(["mvn", "clean", "install"], cwd=project_path, shell=True)
+                    maven(["clean", "install"], project_path)
                     return f"✅ Selenium-Java ({fw}) dependencies synced via Maven."
                 return "⚠️ pom.xml not found for Java project."
 
@@ -329,24 +334,24 @@ def dependency_manager(tool: str, language: str, framework: str, project_path: s
 
             if lang in ["typescript", "javascript"]:
                 if os.path.exists(os.path.join(project_path, "package.json")):
-                    subprocess.check_call(["npm", "install"], cwd=project_path, shell=True)
-                    subprocess.check_call(["npx", "playwright", "install"], cwd=project_path, shell=True)
+                    npm_install(project_path)
+                    run_cached(["npx", "playwright", "install"], cwd=project_path)
                     return f"✅ Playwright-{lang} setup complete."
                 return "⚠️ package.json missing."
 
             elif lang == "python":
                 libs = ["playwright", "pytest-playwright"]
-                subprocess.check_call([sys.executable, "-m", "pip", "install"] + libs)
-                subprocess.check_call([sys.executable, "-m", "playwright", "install"])
+                pip_install(libs)
+                run_cached([sys.executable, "-m", "playwright", "install"])
                 return "✅ Playwright-Python setup complete."
 
             elif lang == "java":
                 if os.path.exists(os.path.join(project_path, "pom.xml")):
                     # Maven handles playwright lib, but browsers need manual command or auto-invoke
-                    subprocess.check_call(["mvn", "compile"], cwd=project_path, shell=True)
+                    maven(["compile"], project_path)
                     # Playwright Java browser install command
-                    subprocess.check_call(["mvn", "exec:java", "-e", "-Dexec.mainClass=com.microsoft.playwright.CLI",
-                                           "-Dexec.args=install"], cwd=project_path, shell=True)
+                    maven(["exec:java", "-e", "-Dexec.mainClass=com.microsoft.playwright.CLI", "-Dexec.args=install"],
+                          project_path)
                     return "✅ Playwright-Java dependencies and browsers installed."
                 return "⚠️ pom.xml missing."
 
@@ -359,6 +364,8 @@ def dependency_manager(tool: str, language: str, framework: str, project_path: s
 
         return f"❌ Configuration not supported: {tool} + {language}"
 
+    except subprocess.CalledProcessError as e:
+        return f"❌ Dependency Error: {(e.stderr or '').strip()[-2000:] or str(e)}"
     except Exception as e:
         return f"❌ Dependency Error: {str(e)}"
 
@@ -374,12 +381,12 @@ def framework_orchestrator(action: str, base_path: str, files_map_json: str = "{
         if action == "sync":
             root.mkdir(parents=True, exist_ok=True)
             files_data = json.loads(files_map_json)
-            for rel_path, content in files_data.items():
-                file_path = root / rel_path
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(content)
-            return f"✅ Framework synced at {base_path} with {len(files_data)} artifacts."
+            manifest = write_project_files(str(root), files_data)
+            if manifest["failed"]:
+                return "❌ Orchestrator Error: " + "; ".join(manifest["failed"])
+            return (f"✅ Framework synced at {base_path} with {len(files_data)} artifacts "
+                    f"({len(manifest['created'])} created, {len(manifest['updated'])} updated, "
+                    f"{len(manifest['unchanged'])} unchanged).")
     except Exception as e:
         return f"❌ Orchestrator Error: {str(e)}"
 